@@ -27,7 +27,8 @@ export async function callApi<T>(
   const controller = new AbortController();
   const timeout = setTimeout(() => controller.abort(), 10000);
 
-  const headers: HeadersInit = {};
+  // application/json first: the API only returns compressed bodies for it.
+  const headers: Record<string, string> = { Accept: "application/json" };
   const init: RequestInit = {
     method,
     headers,
@@ -53,13 +53,33 @@ export async function createGratitudeNote(input: GratitudeNoteInput) {
   return data;
 }
 
-export async function getTodayNotes(): Promise<TodayNotesResponse> {
-  const { data } = await callApi<{ items: RawNote[] }>(
-    `/gratitude-notes/today`,
-    "GET",
-  );
+type TodayNotesPage = {
+  items: RawNote[];
+  next_cursor?: string | null;
+};
+
+export async function getTodayNotes(
+  opts: { fresh?: boolean } = {},
+): Promise<TodayNotesResponse> {
+  const items: RawNote[] = [];
+  let cursor: string | null | undefined = null;
+  // The API returns the day in pages; follow next_cursor until exhausted.
+  // fresh skips the server-side feed and caches, for a reload right after our own write.
+  do {
+    const query: string = cursor
+      ? `?cursor=${encodeURIComponent(cursor)}`
+      : opts.fresh
+        ? "?fresh=1"
+        : "";
+    const { data }: { data: TodayNotesPage } = await callApi<TodayNotesPage>(
+      `/gratitude-notes/today${query}`,
+      "GET",
+    );
+    items.push(...data.items);
+    cursor = data.next_cursor;
+  } while (cursor);
   return {
-    items: data.items.map(mapNote),
+    items: items.map(mapNote),
   };
 }
 
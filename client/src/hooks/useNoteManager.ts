@@ -23,14 +23,14 @@ export function useNoteManager() {
   const shouldShowEmptyNote = !loading && notes.length >= 0 && !userHasNote;
   const addButtonDisabled = userHasNote;
 
-  async function load() {
+  async function load(opts: { fresh?: boolean } = {}) {
     if (isLoadingRef.current) return;
     isLoadingRef.current = true;
 
     try {
       setLoading(true);
       setError(null);
-      const res = await getTodayNotes();
+      const res = await getTodayNotes(opts);
       let items = res.items;
 
       const currentUserNoteId = localStorage.getItem("gratitude-user-note-id");
@@ -100,7 +100,7 @@ export function useNoteManager() {
         localStorage.removeItem("gratitude-user-note-id");
       }
       setDeletingNoteId(null);
-      load();
+      load({ fresh: true });
     } catch (e) {
       const message = e instanceof Error ? e.message : "Failed to delete note";
       setError(message);
@@ -229,7 +229,7 @@ export function GratitudeBoardPage({
               onSuccess={() => {
                 setShowForm(false);
                 setEditingNote(null);
-                load();
+                load({ fresh: true });
               }}
             />
           </div>
@@ -3,89 +3,322 @@
 Script to delete all gratitude notes from DynamoDB.
 Requires AWS credentials configured (via AWS CLI, environment variables, or IAM role).
 
+The table is read with a parallel scan (Segment/TotalSegments). Each page
+streams straight into a bounded pool of update workers, so memory stays flat
+whatever the table size. Every finished page is recorded in a checkpoint file:
+an interrupted run started again with the same arguments resumes from each
+segment's LastEvaluatedKey. --max-capacity throttles the run against the
+capacity units DynamoDB reports as consumed (ReturnConsumedCapacity).
+Failed updates are counted by error code and listed in the summary;
+--verbose also prints each one as it happens.
+
 Usage:
     python3 scripts/delete_all_notes.py
     # Or with explicit table name:
     python3 scripts/delete_all_notes.py --table-name gratitude_notes
+    # 8 scan segments, 32 update workers, at most 200 capacity units/s:
+    python3 scripts/delete_all_notes.py --segments 8 --workers 32 --max-capacity 200
+    # Print every failed note, not just the counts:
+    python3 scripts/delete_all_notes.py --verbose
 """
 
 import argparse
-import boto3
+import json
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
+from decimal import Decimal
+
+import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-def delete_all_notes(table_name: str = "gratitude_notes", region: str = "eu-west-1"):
+
+# Materialized daily feed documents (server/lambdas/notes/feed.py) share the table.
+# They are deleted outright, so the listing falls back to querying the notes.
+FEED_ID_PREFIX = "feed#"
+
+
+class CapacityLimiter:
+    """Token bucket over consumed capacity units; max_per_second <= 0 disables it."""
+
+    def __init__(self, max_per_second: float):
+        self.rate = max_per_second
+        self._tokens = max_per_second
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, units: float) -> None:
+        """Charge units already consumed and sleep while the bucket is in debt."""
+        if self.rate <= 0 or not units:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= units
+            wait_s = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait_s:
+            time.sleep(wait_s)
+
+
+class Checkpoint:
+    """Per-segment scan position, rewritten atomically after every finished page."""
+
+    def __init__(self, path: str, table_name: str, total_segments: int):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {
+            "table": table_name,
+            "total_segments": total_segments,
+            "now_iso": datetime.now(timezone.utc).isoformat(),
+            "segments": {str(s): {"last_key": None, "done": False} for s in range(total_segments)},
+            "counts": {"scanned": 0, "deleted": 0, "already_deleted": 0, "errors": 0},
+            "error_codes": {},
+        }
+        self.resumed = False
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                saved = json.load(fh)
+            if saved.get("table") != table_name or saved.get("total_segments") != total_segments:
+                raise SystemExit(
+                    f"Checkpoint {path} was written for table {saved.get('table')!r} with "
+                    f"{saved.get('total_segments')} segments; rerun with the same arguments or remove it."
+                )
+            self.state = saved
+            self.state.setdefault("error_codes", {})
+            self.resumed = True
+
+    @property
+    def now_iso(self) -> str:
+        return self.state["now_iso"]
+
+    def segment(self, segment: int) -> dict:
+        return self.state["segments"][str(segment)]
+
+    def page_done(self, segment: int, last_key, counts: dict, error_codes: dict) -> None:
+        with self._lock:
+            entry = self.segment(segment)
+            entry["last_key"] = last_key
+            entry["done"] = last_key is None
+            for name, value in counts.items():
+                self.state["counts"][name] += value
+            for code, value in error_codes.items():
+                self.state["error_codes"][code] = self.state["error_codes"].get(code, 0) + value
+            self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.state, fh, default=_json_default)
+        os.replace(tmp, self.path)
+
+    def remove(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class Progress:
+    """Single, periodically rewritten progress line with throughput."""
+
+    def __init__(self, checkpoint: Checkpoint, interval: float = 1.0):
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last = 0.0
+        self._initial = dict(checkpoint.state["counts"])
+        self._capacity = 0.0
+        self._lock = threading.Lock()
+
+    def add_capacity(self, units: float) -> None:
+        with self._lock:
+            self._capacity += units
+
+    def maybe_print(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last < self.interval:
+                return
+            self._last = now
+            capacity = self._capacity
+        counts = self.checkpoint.state["counts"]
+        elapsed = max(now - self.started, 1e-9)
+        processed = counts["scanned"] - self._initial["scanned"]
+        print(
+            f"\r  scanned {counts['scanned']:>9}  deleted {counts['deleted']:>9}  "
+            f"already deleted {counts['already_deleted']:>9}  errors {counts['errors']:>5}  "
+            f"{processed / elapsed:>8.0f} items/s  {capacity / elapsed:>7.1f} CU/s",
+            end="",
+            flush=True,
+        )
+
+
+def _consumed(response: dict) -> float:
+    return float(response.get("ConsumedCapacity", {}).get("CapacityUnits", 0) or 0)
+
+
+def delete_all_notes(
+    table_name: str = "gratitude_notes",
+    region: str = "eu-west-1",
+    *,
+    segments: int = 4,
+    workers: int = 16,
+    max_capacity: float = 0,
+    checkpoint_path: str = "",
+    page_size: int = 1000,
+    verbose: bool = False,
+):
     """Delete all gratitude notes by marking them as deleted."""
-    dynamodb = boto3.resource("dynamodb", region_name=region)
-    table = dynamodb.Table(table_name)
-    
+    config = Config(retries={"mode": "standard", "max_attempts": 10})
+    # boto3 resources are not thread-safe: every scanner and update worker builds its own.
+    local = threading.local()
+
+    def table():
+        if not hasattr(local, "table"):
+            dynamodb = boto3.session.Session().resource("dynamodb", region_name=region, config=config)
+            local.table = dynamodb.Table(table_name)
+        return local.table
+
     print(f"Connecting to DynamoDB table: {table_name} in region: {region}")
     print("")
-    
-    deleted_count = 0
-    error_count = 0
-    now_iso = datetime.now(timezone.utc).isoformat()
-    
-    try:
-        # Scan the table to get all items
-        print("Scanning table for all notes...")
-        response = table.scan()
-        items = response.get("Items", [])
-        
-        # Handle pagination
-        while "LastEvaluatedKey" in response:
-            response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-            items.extend(response.get("Items", []))
-        
-        total_items = len(items)
-        print(f"Found {total_items} note(s) in table")
-        print("")
-        
-        if total_items == 0:
-            print("No notes to delete.")
-            return
-        
-        # Delete each note
-        for item in items:
-            note_id = item.get("id", "unknown")
-            status = item.get("status", "active")
-            
-            # Skip already deleted items
-            if status == "deleted":
-                print(f"  ⊘ {note_id} - Already deleted (skipped)")
-                continue
-            
-            try:
-                table.update_item(
+
+    checkpoint = Checkpoint(checkpoint_path, table_name, segments)
+    if checkpoint.resumed:
+        pending = [s for s in range(segments) if not checkpoint.segment(s)["done"]]
+        print(f"Resuming from {checkpoint_path} ({len(pending)} of {segments} segment(s) left)")
+    limiter = CapacityLimiter(max_capacity)
+    progress = Progress(checkpoint)
+    now_iso = checkpoint.now_iso
+    # Bound the updates in flight so a fast scan cannot run ahead of the writers.
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    # Set on Ctrl-C: segments stop after their current page so the checkpoint stays consistent.
+    stop = threading.Event()
+
+    def update_one(note_id: str):
+        """None when the note was deleted, else the error code."""
+        try:
+            if note_id.startswith(FEED_ID_PREFIX):
+                response = table().delete_item(Key={"id": note_id}, ReturnConsumedCapacity="TOTAL")
+            else:
+                response = table().update_item(
                     Key={"id": note_id},
-                    UpdateExpression="SET #s = :deleted, deleted_at = :now",
-                    ExpressionAttributeNames={"#s": "status"},
-                    ExpressionAttributeValues={":deleted": "deleted", ":now": now_iso},
+                    UpdateExpression="SET #s = :deleted, deleted_at = :now ADD #rev :one",
+                    ExpressionAttributeNames={"#s": "status", "#rev": "revision"},
+                    ExpressionAttributeValues={":deleted": "deleted", ":now": now_iso, ":one": 1},
+                    ReturnConsumedCapacity="TOTAL",
                 )
-                print(f"  ✓ {note_id} - Deleted")
-                deleted_count += 1
-            except ClientError as e:
-                error_code = e.response.get("Error", {}).get("Code", "Unknown")
-                print(f"  ✗ {note_id} - Error: {error_code}")
-                error_count += 1
-        
+            units = _consumed(response)
+            progress.add_capacity(units)
+            limiter.consume(units)
+            return None
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code", "Unknown")
+            if verbose:
+                print(f"\n  ✗ {note_id} - Error: {error_code}")
+            return error_code
+        finally:
+            in_flight.release()
+
+    def scan_segment(segment: int, pool: ThreadPoolExecutor) -> None:
+        state = checkpoint.segment(segment)
+        if state["done"]:
+            return
+        kwargs = {
+            "Segment": segment,
+            "TotalSegments": segments,
+            "Limit": page_size,
+            # Only the key and status are needed, and deleted notes never leave DynamoDB.
+            "ProjectionExpression": "id, #s",
+            "FilterExpression": "attribute_not_exists(#s) OR #s <> :deleted",
+            "ExpressionAttributeNames": {"#s": "status"},
+            "ExpressionAttributeValues": {":deleted": "deleted"},
+            "ReturnConsumedCapacity": "TOTAL",
+        }
+        last_key = state["last_key"]
+        while not stop.is_set():
+            if last_key:
+                kwargs["ExclusiveStartKey"] = last_key
+            response = table().scan(**kwargs)
+            units = _consumed(response)
+            progress.add_capacity(units)
+            limiter.consume(units)
+
+            futures = []
+            for item in response.get("Items", []):
+                in_flight.acquire()
+                futures.append(pool.submit(update_one, item["id"]))
+            wait(futures)
+
+            error_codes: dict = {}
+            for future in futures:
+                code = future.result()
+                if code is not None:
+                    error_codes[code] = error_codes.get(code, 0) + 1
+            errors = sum(error_codes.values())
+            last_key = response.get("LastEvaluatedKey")
+            checkpoint.page_done(segment, last_key, {
+                "scanned": response.get("ScannedCount", 0),
+                "deleted": len(futures) - errors,
+                "already_deleted": response.get("ScannedCount", 0) - response.get("Count", 0),
+                "errors": errors,
+            }, error_codes)
+            progress.maybe_print()
+            if not last_key:
+                return
+
+    try:
+        print(f"Scanning table with {segments} segment(s) and {workers} update worker(s)...")
+        with ThreadPoolExecutor(max_workers=workers) as pool, \
+                ThreadPoolExecutor(max_workers=segments) as scanners:
+            futures = [scanners.submit(scan_segment, s, pool) for s in range(segments)]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                stop.set()
+                raise
+        progress.maybe_print(force=True)
+        print("")
+
+        counts = checkpoint.state["counts"]
         print("")
         print("==========================================")
         print("Summary:")
-        print(f"  Total notes found: {total_items}")
-        print(f"  Successfully deleted: {deleted_count}")
-        print(f"  Already deleted: {total_items - deleted_count - error_count}")
-        print(f"  Errors: {error_count}")
+        print(f"  Total notes found: {counts['scanned']}")
+        print(f"  Successfully deleted: {counts['deleted']}")
+        print(f"  Already deleted: {counts['already_deleted']}")
+        print(f"  Errors: {counts['errors']}")
+        for code, count in sorted(checkpoint.state["error_codes"].items(), key=lambda pair: -pair[1]):
+            print(f"    {code}: {count}")
+        print(f"  Elapsed: {time.monotonic() - progress.started:.1f}s")
         print("==========================================")
-        
+        if counts["errors"]:
+            print(f"Checkpoint kept at {checkpoint_path}; delete it and rerun to retry failed notes.")
+        else:
+            checkpoint.remove()
+
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun with the same arguments to resume from {checkpoint_path}.")
+        sys.exit(130)
     except ClientError as e:
         error_code = e.response.get("Error", {}).get("Code", "Unknown")
         error_message = e.response.get("Error", {}).get("Message", "Unknown error")
-        print(f"Error accessing DynamoDB: {error_code} - {error_message}")
+        print(f"\nError accessing DynamoDB: {error_code} - {error_message}")
+        print(f"Progress saved in {checkpoint_path}; rerun with the same arguments to resume.")
         sys.exit(1)
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        print(f"\nUnexpected error: {e}")
         sys.exit(1)
 
 
@@ -101,14 +334,43 @@ if __name__ == "__main__":
         default="eu-west-1",
         help="AWS region (default: eu-west-1)"
     )
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=4,
+        help="Parallel scan segments (default: 4)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Concurrent update_item workers (default: 16)"
+    )
+    parser.add_argument(
+        "--max-capacity",
+        type=float,
+        default=0,
+        help="Maximum consumed capacity units per second, reads and writes combined (default: unlimited)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file used to resume an interrupted run "
+             "(default: delete_all_notes.<table>.checkpoint.json)"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print every note that fails to update, not only the error counts"
+    )
     parser.add_argument(
         "--confirm",
         action="store_true",
         help="Skip confirmation prompt"
     )
-    
+
     args = parser.parse_args()
-    
+    checkpoint_path = args.checkpoint or f"delete_all_notes.{args.table_name}.checkpoint.json"
+
     if not args.confirm:
         print("⚠️  WARNING: This will delete ALL gratitude notes in the table!")
         print(f"   Table: {args.table_name}")
@@ -119,20 +381,13 @@ if __name__ == "__main__":
             print("Cancelled.")
             sys.exit(0)
         print("")
-    
-    delete_all_notes(args.table_name, args.region)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
+    delete_all_notes(
+        args.table_name,
+        args.region,
+        segments=args.segments,
+        workers=args.workers,
+        max_capacity=args.max_capacity,
+        checkpoint_path=checkpoint_path,
+        verbose=args.verbose,
+    )
@@ -0,0 +1,109 @@
+"""
+Local stand-in for AWS used by the benchmarks.
+
+install() registers a botocore ``before-send`` hook on the default boto3
+session, so every client created afterwards builds, serializes and signs
+requests exactly as in Lambda, but gets a canned response instead of going
+to the network. Responses can be overridden per operation.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+FAKE_ENV = {
+    "AWS_ACCESS_KEY_ID": "bench",
+    "AWS_SECRET_ACCESS_KEY": "bench",
+    "AWS_SESSION_TOKEN": "bench",
+    "AWS_DEFAULT_REGION": "eu-west-1",
+    "AWS_EC2_METADATA_DISABLED": "true",
+}
+
+_SES_SEND_EMAIL = (
+    b'<SendEmailResponse xmlns="http://ses.amazonaws.com/doc/2010-12-01/">'
+    b"<SendEmailResult><MessageId>bench</MessageId></SendEmailResult>"
+    b"</SendEmailResponse>"
+)
+
+# operation name -> parsed JSON body, raw bytes, or a callable(request) returning either.
+# Operations not listed get "{}".
+DEFAULT_RESPONSES: Dict[str, Any] = {
+    "PutEvents": {"FailedEntryCount": 0, "Entries": []},
+    "GetItem": {
+        "Item": {
+            "id": {"S": "bench"},
+            "date": {"S": "2024-01-01"},
+            "status": {"S": "active"},
+            "owner_token": {"S": "bench-token"},
+            "gratitude_text": {"S": "bench"},
+        }
+    },
+    "SendEmail": _SES_SEND_EMAIL,
+}
+
+
+def _header(request, name: str) -> str:
+    value = request.headers.get(name) or ""
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class _Raw:
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+
+    def stream(self, **_kwargs):
+        yield self._body
+
+
+class AwsStub:
+    def __init__(self, responses: Optional[Dict[str, Any]] = None) -> None:
+        self.responses: Dict[str, Any] = {**DEFAULT_RESPONSES, **(responses or {})}
+        self.calls: List[str] = []
+
+    def _before_send(self, request, **_kwargs) -> AWSResponse:
+        operation = self._operation_name(request)
+        self.calls.append(operation)
+        canned = self.responses.get(operation, {})
+        if callable(canned):
+            canned = canned(request)
+        headers = {}
+        if _header(request, "Smithy-Protocol") == "rpc-v2-cbor":
+            # An empty CBOR body decodes to an empty output shape.
+            headers["smithy-protocol"] = "rpc-v2-cbor"
+            body = b""
+        elif isinstance(canned, bytes):
+            body = canned
+        else:
+            body = json.dumps(canned).encode("utf-8")
+        return AWSResponse(request.url, 200, headers, _Raw(body))
+
+    @staticmethod
+    def _operation_name(request) -> str:
+        target = _header(request, "X-Amz-Target")
+        if target:
+            return target.rsplit(".", 1)[-1]
+        url = request.url
+        if "/operation/" in url:
+            return url.rsplit("/operation/", 1)[-1]
+        body = request.body or b""
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        for part in str(body).split("&"):
+            if part.startswith("Action="):
+                return part[len("Action="):]
+        return "Unknown"
+
+
+def install(responses: Optional[Dict[str, Any]] = None) -> AwsStub:
+    """Stub AWS for every boto3 client created after this call."""
+    for key, value in FAKE_ENV.items():
+        os.environ.setdefault(key, value)
+    boto3.setup_default_session()
+    stub = AwsStub(responses)
+    boto3.DEFAULT_SESSION.events.register("before-send", stub._before_send)
+    return stub
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Lambda handlers.
+
+Each sample runs in a fresh interpreter and reports:
+- import_ms: time to import the handler module (what Lambda's init phase pays)
+- first_call_ms: first invocation, including lazy AWS client construction
+- second_call_ms: a warm invocation, for comparison
+
+AWS is stubbed at the HTTP layer (see aws_stub.py), so clients are built,
+requests serialized and signed as in Lambda, with no network involved.
+
+Usage:
+    python server/benchmarks/cold_start.py
+    python server/benchmarks/cold_start.py --runs 10 --output cold_start.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+LAMBDA_DIR = BENCH_DIR.parent / "lambdas"
+
+def _events() -> Dict[str, Callable[[], Dict[str, Any]]]:
+    import events
+
+    return {
+        "handlers.api.post_gratitude_note": events.post_note,
+        "handlers.api.post_gratitude_notes_bulk": events.post_notes_bulk,
+        "handlers.api.delete_gratitude_note": lambda: events.delete_note("bench", "bench-token"),
+        "handlers.api.get_today_gratitude_notes": events.get_today,
+        "handlers.api.get_gratitude_note_history": lambda: events.note_history("bench", "bench-token"),
+        "handlers.api.get_gratitude_notes_range": lambda: events.notes_range("2024-01-01", "2024-01-07"),
+        "handlers.api.email_feedback": events.feedback,
+        "handlers.events.send_feedback": events.feedback_batch,
+        "handlers.events.publish_note_changes": events.note_stream_batch,
+        "handlers.events.step_prepare_event": events.note_lifecycle,
+        "handlers.events.step_record_note_event": events.record_note,
+        "handlers.events.step_archive_notes": events.archive,
+    }
+
+
+def _child(module_name: str) -> None:
+    """Measure one handler inside a fresh interpreter and print a JSON line."""
+    sys.path[:0] = [str(LAMBDA_DIR), str(BENCH_DIR)]
+
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_ms = (time.perf_counter() - started) * 1000
+
+    import aws_stub
+
+    aws_stub.install()
+    event_factory = _events()[module_name]
+
+    started = time.perf_counter()
+    first = module.handler(event_factory(), None)
+    first_call_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    module.handler(event_factory(), None)
+    second_call_ms = (time.perf_counter() - started) * 1000
+
+    status = first.get("statusCode", first.get("status")) if isinstance(first, dict) else None
+    print(json.dumps({
+        "handler": module_name,
+        "import_ms": import_ms,
+        "first_call_ms": first_call_ms,
+        "second_call_ms": second_call_ms,
+        "status": status,
+    }))
+
+
+def _sample(module_name: str) -> Dict[str, Any]:
+    import aws_stub
+
+    env = {**os.environ, **aws_stub.FAKE_ENV, "SENDER_EMAIL": "bench@example.com"}
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", module_name],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    # Handlers log to stderr; the measurement is the last stdout line.
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(runs: int) -> List[Dict[str, Any]]:
+    results = []
+    for module_name in _events():
+        samples = [_sample(module_name) for _ in range(runs)]
+        row: Dict[str, Any] = {"handler": module_name, "runs": runs, "status": samples[-1]["status"]}
+        for metric in ("import_ms", "first_call_ms", "second_call_ms"):
+            row[metric] = round(statistics.median(s[metric] for s in samples), 2)
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for Lambda handlers")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per handler (median is reported)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child)
+        return
+
+    sys.path.insert(0, str(BENCH_DIR))
+    results = run(args.runs)
+
+    print(f"{'handler':<42} {'import ms':>10} {'1st call ms':>12} {'2nd call ms':>12} {'status':>7}")
+    for row in results:
+        print(
+            f"{row['handler']:<42} {row['import_ms']:>10.2f} {row['first_call_ms']:>12.2f} "
+            f"{row['second_call_ms']:>12.2f} {str(row['status']):>7}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"python": sys.version.split()[0], "results": results}, indent=2) + "\n")
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Synthetic API Gateway (REST, proxy integration) and Step Functions events.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+
+def api_event(
+    method: str,
+    path: str,
+    *,
+    body: Optional[Dict[str, Any]] = None,
+    path_parameters: Optional[Dict[str, str]] = None,
+    query: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": method,
+        "headers": {"Content-Type": "application/json", **(headers or {})},
+        "queryStringParameters": query,
+        "pathParameters": path_parameters,
+        "requestContext": {"identity": {"sourceIp": "198.51.100.7"}, "stage": "prod"},
+        "body": json.dumps(body) if body is not None else None,
+        "isBase64Encoded": False,
+    }
+
+
+def post_note(
+    i: int = 0, *, note_id: Optional[str] = None, idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    body = {
+        "name": f"Bench User {i}",
+        "email": f"bench{i}@example.com",
+        "gratitudeText": f"Grateful for benchmark run number {i}.",
+    }
+    if note_id:
+        body["id"] = note_id
+    headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+    return api_event("POST", "/gratitude-notes", body=body, headers=headers)
+
+
+def post_notes_bulk(i: int = 0, count: int = 25) -> Dict[str, Any]:
+    notes = [
+        {
+            "name": f"Bench User {i}-{n}",
+            "email": f"bench{i}-{n}@example.com",
+            "gratitudeText": f"Grateful for benchmark run number {i}, note {n}.",
+        }
+        for n in range(count)
+    ]
+    return api_event("POST", "/gratitude-notes/bulk", body={"notes": notes})
+
+
+def delete_note(note_id: str, token: str) -> Dict[str, Any]:
+    return api_event(
+        "DELETE",
+        f"/gratitude-notes/{note_id}",
+        body={"token": token},
+        path_parameters={"id": note_id},
+    )
+
+
+def get_today(
+    query: Optional[Dict[str, str]] = None,
+    *,
+    if_none_match: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+) -> Dict[str, Any]:
+    headers = {}
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
+    if accept_encoding:
+        headers["Accept"] = "application/json"
+        headers["Accept-Encoding"] = accept_encoding
+    return api_event("GET", "/gratitude-notes/today", query=query, headers=headers)
+
+
+def notes_range(date_from: str, date_to: str, query: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return api_event("GET", "/gratitude-notes/range", query={"from": date_from, "to": date_to, **(query or {})})
+
+
+def note_history(note_id: str, token: str, query: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return api_event(
+        "GET",
+        f"/gratitude-notes/{note_id}/history",
+        path_parameters={"id": note_id},
+        query=query,
+        headers={"X-Owner-Token": token},
+    )
+
+
+def feedback(i: int = 0) -> Dict[str, Any]:
+    return api_event("POST", "/feedback", body={"feedback": f"Benchmark feedback {i}"})
+
+
+def feedback_batch(count: int = 25, start: int = 0) -> Dict[str, Any]:
+    """SQS event as delivered to SendFeedbackFn."""
+    return {
+        "Records": [
+            {
+                "messageId": f"msg-{start + n}",
+                "body": json.dumps({"feedback": f"Benchmark feedback {start + n}", "received_at": "2024-01-01 00:00:00 UTC"}),
+                "eventSource": "aws:sqs",
+            }
+            for n in range(count)
+        ]
+    }
+
+
+def note_stream_batch(count: int = 25, start: int = 0) -> Dict[str, Any]:
+    """DynamoDB stream event (new notes) as delivered to PublishNoteChangesFn."""
+    return {
+        "Records": [
+            {
+                "eventName": "INSERT",
+                "eventSource": "aws:dynamodb",
+                "dynamodb": {
+                    "SequenceNumber": str(start + n),
+                    "NewImage": {
+                        "id": {"S": f"stream-{start + n}"},
+                        "date": {"S": "2024-01-01"},
+                        "status": {"S": "active"},
+                        "gratitude_text": {"S": f"Grateful for stream record {start + n}."},
+                        "revision": {"N": "1"},
+                    },
+                },
+            }
+            for n in range(count)
+        ]
+    }
+
+
+def note_lifecycle(event_type: str = "note.created", note_id: str = "bench") -> Dict[str, Any]:
+    """EventBridge event as delivered to the PrepareEvent state."""
+    detail_type = {
+        "note.created": "gratitude.note.created",
+        "note.updated": "gratitude.note.updated",
+        "note.deleted": "gratitude.note.deleted",
+    }[event_type]
+    return {
+        "version": "0",
+        "source": "gratitude.note",
+        "detail-type": detail_type,
+        "detail": {"eventType": event_type, "noteId": note_id, "gratitudeText": "bench"},
+    }
+
+
+def record_note(event_type: str = "note.created", note_id: str = "bench") -> Dict[str, Any]:
+    """Normalized event as passed from PrepareEvent to RecordNoteEvent."""
+    return {"eventType": event_type, "noteId": note_id}
+
+
+def note_batch(size: int = 10, offset: int = 0) -> Dict[str, Any]:
+    """SQS batch of note events as delivered by the EventBridge Pipe to PrepareEvent."""
+    return {"Records": [
+        {"messageId": str(offset + n), "body": json.dumps(note_lifecycle("note.created", f"n{offset + n}"))}
+        for n in range(size)
+    ]}
+
+
+def archive(date_str: str = "2024-01-01") -> Dict[str, Any]:
+    return {"eventType": "archive.nightly", "date": date_str}
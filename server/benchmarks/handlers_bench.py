@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmark for every Lambda handler.
+
+Handlers are driven with synthetic API Gateway / Step Functions events
+(events.py). DynamoDB is replaced by InMemoryNotesStore and the other AWS
+services by the HTTP-level stub in aws_stub.py, so the numbers cover our
+code plus botocore request building, not the network.
+
+For each day size (notes in today's partition) and scenario it reports
+p50/p95/p99 latency, invocations per second and peak traced memory.
+The serialize_listing_* rows time the JSON encoding of one listing page
+with the stdlib json module and with shared.codec (orjson when installed).
+
+Usage:
+    python server/benchmarks/handlers_bench.py
+    python server/benchmarks/handlers_bench.py --sizes 10,1000 --iterations 100
+    python server/benchmarks/handlers_bench.py --output server/benchmarks/baseline.json
+    python server/benchmarks/handlers_bench.py --compare server/benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+LAMBDA_DIR = BENCH_DIR.parent / "lambdas"
+for _path in (str(LAMBDA_DIR), str(BENCH_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import aws_stub  # noqa: E402
+import events  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000)
+DEFAULT_ITERATIONS = 200
+# Archiving touches the whole partition, so it gets fewer iterations.
+ARCHIVE_ITERATIONS = 3
+MEMORY_ITERATIONS = 5
+
+
+@dataclass
+class Scenario:
+    name: str
+    handler: Callable[[Dict[str, Any], Any], Any]
+    make_event: Callable[[int], Dict[str, Any]]
+    setup: Optional[Callable[[int], None]] = None
+    iterations: Optional[int] = None
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _seed_note(store, note_id: str, date_str: str, created_at: int, *, email: Optional[str] = None) -> None:
+    store.put_item({
+        "id": note_id,
+        "name": f"User {note_id}",
+        "email": email or f"{note_id}@example.com",
+        "gratitude_text": "Grateful for a quiet morning, good coffee and kind colleagues.",
+        "status": "active",
+        "date": date_str,
+        "created_at": created_at,
+        "created_at_iso": datetime.fromtimestamp(created_at, timezone.utc).isoformat(),
+        "owner_token": f"tok-{note_id}",
+        "ttl": created_at + 7 * 24 * 3600,
+    })
+
+
+def _scenarios(store, today: str, size: int) -> List[Scenario]:
+    import handlers.api.delete_gratitude_note as delete_note
+    import handlers.api.email_feedback as email_feedback
+    import handlers.api.get_gratitude_note_history as note_history
+    import handlers.api.get_gratitude_notes_range as notes_range
+    import handlers.api.get_today_gratitude_notes as get_today
+    import handlers.api.post_gratitude_note as post_note
+    import handlers.api.post_gratitude_notes_bulk as post_notes_bulk
+    import handlers.events.publish_note_changes as publish_changes
+    import handlers.events.send_feedback as send_feedback
+    import handlers.events.step_archive_notes as step_archive
+    import handlers.events.step_prepare_event as step_prepare
+    import handlers.events.step_record_note_event as step_record
+    from notes.db import PUBLIC_ATTRIBUTES
+    from notes.feed import rebuild_feed
+    from shared import codec
+    from shared.admission import ADMISSION
+    from shared.cache import COMPRESSED_BODIES, LISTING_CACHE
+    from shared.config import LIST_DEFAULT_LIMIT
+
+    base = int(time.time()) - size
+    week_ago = (datetime.fromisoformat(today) - timedelta(days=6)).date().isoformat()
+    # A default-sized page of today's notes as the store returns it (Decimal numbers).
+    page, _ = store.query_date(today, limit=LIST_DEFAULT_LIMIT, newest_first=True, attributes=PUBLIC_ATTRIBUTES)
+    listing = {"items": page, "next_cursor": None, "watermark": base + size}
+
+    def seed_deletable(i: int) -> None:
+        _seed_note(store, f"del-{size}-{i}", today, base + size + i)
+
+    def with_feed(i: int) -> None:
+        LISTING_CACHE.clear()
+        if i == 0:
+            get_today.DAILY_FEED_ENABLED = True
+            rebuild_feed(today)
+
+    def seed_author(i: int) -> None:
+        # One author with a note on each of the last 7 days.
+        if i == 0:
+            for day in range(7):
+                _seed_note(store, f"hist-{size}-{day}", f"2024-01-{day + 1:02d}", base + day,
+                           email=f"author-{size}@example.com")
+
+    def seed_week(i: int) -> None:
+        # The six days before today get up to 1000 notes each (today is already seeded).
+        if i == 0:
+            for day in range(1, 7):
+                date_str = (datetime.fromisoformat(today) - timedelta(days=day)).date().isoformat()
+                for n in range(min(size, 1000)):
+                    _seed_note(store, f"week-{size}-{day}-{n}", date_str, base - day * 86400 + n)
+
+    def seed_archive_day(i: int) -> None:
+        for n in range(size):
+            _seed_note(store, f"arc-{size}-{i}-{n}", f"archive-{size}-{i}", base + n)
+
+    return [
+        Scenario("get_today_uncached", get_today.handler, lambda i: events.get_today(),
+                 setup=lambda i: LISTING_CACHE.clear()),
+        Scenario("get_today_cached", get_today.handler, lambda i: events.get_today()),
+        # Fresh listing, gzip-compressed for the client.
+        Scenario("get_today_uncached_gzip", get_today.handler, lambda i: events.get_today(accept_encoding="gzip"),
+                 setup=lambda i: (LISTING_CACHE.clear(), COMPRESSED_BODIES.clear())),
+        # Conditional poll with the current ETag: 304 from the warm cache.
+        Scenario("get_today_not_modified", get_today.handler,
+                 lambda i: events.get_today(if_none_match=get_today.handler(events.get_today(), None)["headers"]["ETag"])),
+        # Fresh listing from the materialized daily feed (one GetItem; days past the
+        # 400 KB item limit mark their feed incomplete and fall back to the query).
+        Scenario("get_today_feed", get_today.handler, lambda i: events.get_today(), setup=with_feed),
+        # Serialization of one listing page: the previous stdlib call vs the shared codec.
+        Scenario("serialize_listing_stdlib",
+                 lambda event, ctx: json.dumps(event, default=codec._default), lambda i: listing),
+        Scenario("serialize_listing_codec", lambda event, ctx: codec.dumps(event), lambda i: listing),
+        # Admission state is reset per call so every request takes the admitted path.
+        Scenario("post_note", post_note.handler, lambda i: events.post_note(i),
+                 setup=lambda i: ADMISSION.reset()),
+        # Client retry of one POST with the same Idempotency-Key: answered from the warm LRU.
+        Scenario("post_note_replayed", post_note.handler,
+                 lambda i: events.post_note(0, idempotency_key=f"bench-{size}")),
+        # 25 notes in one request: one batch write (compare with 25x post_note).
+        Scenario("post_notes_bulk_25", post_notes_bulk.handler, lambda i: events.post_notes_bulk(i),
+                 setup=lambda i: ADMISSION.reset()),
+        Scenario("delete_note", delete_note.handler,
+                 lambda i: events.delete_note(f"del-{size}-{i}", f"tok-del-{size}-{i}"),
+                 setup=seed_deletable),
+        # One page of an author's notes across days (gsi_email_date).
+        Scenario("get_note_history", note_history.handler,
+                 lambda i: events.note_history(f"hist-{size}-6", f"tok-hist-{size}-6"), setup=seed_author),
+        # First page of a 7-day range ending today: 7 partitions queried in parallel and merged.
+        Scenario("get_notes_range_7d", notes_range.handler,
+                 lambda i: events.notes_range(week_ago, today), setup=seed_week),
+        Scenario("email_feedback", email_feedback.handler, lambda i: events.feedback(i),
+                 setup=lambda i: ADMISSION.reset()),
+        # 25 queued submissions: one SES call each vs one digest email (the default, restored last).
+        Scenario("send_feedback_each_25", send_feedback.handler, lambda i: events.feedback_batch(25, i * 25),
+                 setup=lambda i: setattr(send_feedback, "FEEDBACK_DIGEST", False)),
+        Scenario("send_feedback_digest_25", send_feedback.handler, lambda i: events.feedback_batch(25, i * 25),
+                 setup=lambda i: setattr(send_feedback, "FEEDBACK_DIGEST", True)),
+        # 25 stream records of new notes: their events go out in 3 PutEvents, off the API path.
+        Scenario("publish_note_changes_25", publish_changes.handler, lambda i: events.note_stream_batch(25, i * 25)),
+        Scenario("step_prepare_event", step_prepare.handler,
+                 lambda i: events.note_lifecycle("note.created", f"n{i}")),
+        Scenario("step_record_note_event", step_record.handler,
+                 lambda i: events.record_note("note.created", f"n{i}")),
+        # One Prepare + Record pass over a 10-event batch (compare with 10x the single-event rows).
+        Scenario("step_note_batch_10",
+                 lambda event, ctx: step_record.handler(step_prepare.handler(event, ctx), ctx),
+                 lambda i: events.note_batch(10, i * 10)),
+        Scenario("step_archive_notes", step_archive.handler,
+                 lambda i: events.archive(f"archive-{size}-{i}"),
+                 setup=seed_archive_day, iterations=ARCHIVE_ITERATIONS),
+    ]
+
+
+def _measure(scenario: Scenario, iterations: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    for i in range(iterations):
+        if scenario.setup:
+            scenario.setup(i)
+        event = scenario.make_event(i)
+        started = time.perf_counter()
+        scenario.handler(event, None)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    # Peak memory in a separate, short pass: tracing distorts timings.
+    # Only what an invocation allocates on top of the live heap is counted.
+    peak = 0
+    tracemalloc.start()
+    for i in range(iterations, iterations + min(iterations, MEMORY_ITERATIONS)):
+        if scenario.setup:
+            scenario.setup(i)
+        event = scenario.make_event(i)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        scenario.handler(event, None)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    total_s = sum(samples) / 1000
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(samples, 50), 4),
+        "p95_ms": round(_percentile(samples, 95), 4),
+        "p99_ms": round(_percentile(samples, 99), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "ips": round(iterations / total_s, 1) if total_s else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, iterations: int = DEFAULT_ITERATIONS, only: Optional[List[str]] = None):
+    """Run the suite and return a JSON-serializable report."""
+    import os
+
+    os.environ.setdefault("SENDER_EMAIL", "bench@example.com")
+    stub = aws_stub.install()
+
+    from notes.store import InMemoryNotesStore, set_store
+    from shared.logging import logger as root_logger
+    from shared.metrics import METRICS
+
+    previous_level = root_logger.level
+    previous_writer = METRICS.writer
+    root_logger.setLevel(logging.WARNING)
+    # EMF records go straight to stdout; keep them out of the report.
+    METRICS.writer = lambda record: None
+    results = []
+    try:
+        for size in sizes:
+            store = InMemoryNotesStore()
+            set_store(store)
+            today = datetime.now(timezone.utc).date().isoformat()
+            base = int(time.time()) - size
+            for n in range(size):
+                _seed_note(store, f"seed-{size}-{n}", today, base + n)
+
+            for scenario in _scenarios(store, today, size):
+                if only and scenario.name not in only:
+                    continue
+                count = min(iterations, scenario.iterations or iterations)
+                row = {"scenario": scenario.name, "notes_per_day": size, **_measure(scenario, count)}
+                results.append(row)
+                print(
+                    f"{scenario.name:<24} {size:>7} notes  p50 {row['p50_ms']:>9.3f} ms  "
+                    f"p95 {row['p95_ms']:>9.3f} ms  p99 {row['p99_ms']:>9.3f} ms  "
+                    f"{row['ips']:>10} inv/s  peak {row['peak_kib']:>9} KiB",
+                    flush=True,
+                )
+    finally:
+        set_store(None)
+        root_logger.setLevel(previous_level)
+        METRICS.writer = previous_writer
+
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "iterations": iterations,
+            "sizes": list(sizes),
+            "aws_calls": len(stub.calls),
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold_pct: float) -> List[str]:
+    """Return a line per scenario whose p95 regressed by more than threshold_pct."""
+    previous = {(r["scenario"], r["notes_per_day"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for row in report["results"]:
+        old = previous.get((row["scenario"], row["notes_per_day"]))
+        if not old or not old["p95_ms"]:
+            continue
+        change = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        if change > threshold_pct:
+            regressions.append(
+                f"{row['scenario']} @ {row['notes_per_day']}: p95 {old['p95_ms']} -> {row['p95_ms']} ms "
+                f"(+{change:.0f}%)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Handler latency/throughput benchmark")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated notes-per-day sizes")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--output", help="write the report as JSON (e.g. the baseline)")
+    parser.add_argument("--compare", help="baseline JSON to compare p95 latencies against")
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = [s for s in args.only.split(",") if s] if args.only else None
+    report = run(sizes, args.iterations, only)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo p95 regressions above {args.threshold:.0f}% against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
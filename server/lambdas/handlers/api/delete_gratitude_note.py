@@ -1,14 +1,14 @@
-import json
 from datetime import datetime, timezone
 
-from notes.db import get_note, mark_deleted
-from shared.config import EVENT_BUS_NAME, events_client
+from notes.db import delete_note_with_token
+from notes.store import DeleteOutcome
 from shared.api_gateway import extract_path_id, json_response, load_json_body
+from shared.instrumentation import timed
+from shared.invocation import invocation
 from shared.logging import log_event
 
-EVENTS = events_client()
-
 
+@invocation
 def handler(event: dict, _context: object) -> dict:
     """Soft-delete a gratitude note by ID (requires owner token)."""
     note_id, error = extract_path_id(event)
@@ -22,56 +22,18 @@ def handler(event: dict, _context: object) -> dict:
     if not token:
         return json_response(400, {"message": "Token is required in request body."})
 
-    try:
-        item = get_note(note_id)
-    except Exception as err:  # pylint: disable=broad-except
-        log_event("delete_note_read_error", {"id": note_id, "error": str(err)})
-        return json_response(500, {"message": "Failed to load gratitude note."})
-
-    if not item or item.get("status") == "deleted":
-        return json_response(404, {"message": "Note not found."})
-
-    token_valid = token == item.get("owner_token")
-    if not token_valid:
-        return json_response(403, {"message": "Invalid token."})
-
     now_iso = datetime.now(timezone.utc).isoformat()
     try:
-        mark_deleted(note_id, now_iso=now_iso)
+        with timed("store"):
+            outcome, item = delete_note_with_token(note_id, token, now_iso=now_iso)
     except Exception as err:  # pylint: disable=broad-except
         log_event("delete_note_update_error", {"id": note_id, "error": str(err)})
         return json_response(500, {"message": "Failed to delete gratitude note."})
 
+    if outcome in (DeleteOutcome.NOT_FOUND, DeleteOutcome.ALREADY_DELETED):
+        return json_response(404, {"message": "Note not found."})
+    if outcome is DeleteOutcome.BAD_TOKEN:
+        return json_response(403, {"message": "Invalid token."})
+
     log_event("delete_note_success", {"id": note_id})
-    _publish_deleted_event(note_id)
     return json_response(200, {"id": note_id, "deleted": True})
-
-
-def _publish_deleted_event(note_id: str) -> None:
-    """
-    Publish a gratitude.note.deleted event to EventBridge.
-    This event will be used for observability.
-    """
-    detail = {
-        "eventType": "note.deleted",
-        "noteId": note_id,
-    }
-    try:
-        EVENTS.put_events(
-            Entries=[
-                {
-                    "Source": "gratitude.note",
-                    "DetailType": "gratitude.note.deleted",
-                    "Detail": json.dumps(detail),
-                    "EventBusName": EVENT_BUS_NAME,
-                }
-            ]
-        )
-        log_event("delete_note_event_emitted", {"noteId": note_id, "detailType": "gratitude.note.deleted"})
-    except Exception as err:  # pylint: disable=broad-except
-        # Log error but don't fail the delete operation
-        log_event(
-            "delete_note_event_error",
-            {"noteId": note_id, "detailType": "gratitude.note.deleted", "error": str(err)},
-        )
-
@@ -0,0 +1,82 @@
+import hmac
+from typing import Any, Dict
+
+from notes.db import InvalidCursorError, get_note, list_notes_for_email
+from shared.api_gateway import (
+    extract_date,
+    extract_limit,
+    extract_path_id,
+    get_header,
+    get_query_param,
+    json_response,
+)
+from shared.config import LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT
+from shared.invocation import invocation
+from shared.logging import log_event
+
+# The history is only for its author; shared caches must not keep it.
+HISTORY_HEADERS = {"Cache-Control": "private, no-store"}
+
+
+def _history_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    status = item.get("status")
+    if status == "deleted" and item.get("archived_at"):
+        status = "archived"
+    return {
+        "id": item.get("id"),
+        "name": item.get("name"),
+        "gratitude_text": item.get("gratitude_text", ""),
+        "date": item.get("date"),
+        "status": status,
+        "created_at": item.get("created_at_iso") or item.get("created_at"),
+    }
+
+
+@invocation
+def handler(event: dict, _context: object) -> dict:
+    """
+    List the notes of the author of note {id}, newest day first, one page at a time.
+
+    The caller proves authorship with that note's owner token (X-Owner-Token
+    header), so the email never appears in the URL. Notes are read from the
+    author's gsi_email_date partition only, bounded by ?from= / ?to=
+    (YYYY-MM-DD, inclusive); follow next_cursor for more.
+    """
+    note_id, error = extract_path_id(event)
+    if error:
+        return json_response(400, {"message": error})
+    token = (get_header(event, "X-Owner-Token") or "").strip()
+    if not token:
+        return json_response(400, {"message": "Header 'X-Owner-Token' is required."})
+    limit, error = extract_limit(event, default=LIST_DEFAULT_LIMIT, maximum=LIST_MAX_LIMIT)
+    if error:
+        return json_response(400, {"message": error})
+    date_from, error = extract_date(event, "from")
+    if error:
+        return json_response(400, {"message": error})
+    date_to, error = extract_date(event, "to")
+    if error:
+        return json_response(400, {"message": error})
+    if date_from and date_to and date_from > date_to:
+        return json_response(400, {"message": "Query parameter 'from' must not be after 'to'."})
+    cursor = get_query_param(event, "cursor")
+
+    try:
+        note = get_note(note_id)
+        if not note or not note.get("email"):
+            return json_response(404, {"message": "Note not found."})
+        if not hmac.compare_digest(str(note.get("owner_token", "")), token):
+            return json_response(403, {"message": "Invalid token."})
+
+        items, next_cursor = list_notes_for_email(
+            note["email"], date_from=date_from, date_to=date_to, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as err:
+        return json_response(400, {"message": str(err)})
+    except Exception as err:  # pylint: disable=broad-except
+        log_event("get_note_history_error", {"id": note_id, "error": str(err)})
+        return json_response(500, {"message": "Failed to load note history."})
+
+    log_event("get_note_history", {"id": note_id, "items": len(items)})
+    body = {"items": [_history_fields(it) for it in items], "next_cursor": next_cursor}
+    return json_response(200, body, HISTORY_HEADERS, event=event)
@@ -0,0 +1,76 @@
+from datetime import date
+from typing import Any, Dict, List
+
+from notes.db import InvalidCursorError, list_notes_for_range
+from shared.api_gateway import (
+    cache_control,
+    extract_date,
+    extract_limit,
+    get_query_param,
+    json_response,
+)
+from shared.config import (
+    LIST_DEFAULT_LIMIT,
+    LIST_MAX_LIMIT,
+    LISTING_MAX_AGE_SECONDS,
+    LISTING_STALE_WHILE_REVALIDATE_SECONDS,
+    RANGE_MAX_DAYS,
+)
+from shared.invocation import invocation
+from shared.logging import log_event
+
+CACHE_CONTROL = cache_control(LISTING_MAX_AGE_SECONDS, LISTING_STALE_WHILE_REVALIDATE_SECONDS)
+
+
+def _public_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": item.get("id"),
+        "name": item.get("name"),
+        "email": item.get("email"),
+        "gratitude_text": item.get("gratitude_text", ""),
+        "status": item.get("status"),
+        "date": item.get("date"),
+        "created_at": item.get("created_at_iso") or item.get("created_at"),
+    }
+
+
+@invocation
+def handler(event: dict, _context: object) -> dict:
+    """
+    List one page of active gratitude notes for the days ?from= .. ?to= (inclusive), newest first.
+
+    All day partitions are read in one parallel round per page and merged by
+    creation time; follow next_cursor (valid only for the same range) for more.
+    """
+    limit, error = extract_limit(event, default=LIST_DEFAULT_LIMIT, maximum=LIST_MAX_LIMIT)
+    if error:
+        return json_response(400, {"message": error})
+    date_from, error = extract_date(event, "from")
+    if error:
+        return json_response(400, {"message": error})
+    date_to, error = extract_date(event, "to")
+    if error:
+        return json_response(400, {"message": error})
+    if not date_from or not date_to:
+        return json_response(400, {"message": "Query parameters 'from' and 'to' are required."})
+    days = (date.fromisoformat(date_to) - date.fromisoformat(date_from)).days + 1
+    if days < 1:
+        return json_response(400, {"message": "Query parameter 'from' must not be after 'to'."})
+    if days > RANGE_MAX_DAYS:
+        return json_response(400, {"message": f"A range may span at most {RANGE_MAX_DAYS} days."})
+    cursor = get_query_param(event, "cursor")
+
+    try:
+        response_items, next_cursor = list_notes_for_range(date_from, date_to, limit=limit, cursor=cursor)
+    except InvalidCursorError as err:
+        return json_response(400, {"message": str(err)})
+    except Exception as err:  # pylint: disable=broad-except
+        log_event("get_notes_range_error", {"date_from": date_from, "date_to": date_to, "error": str(err)})
+        return json_response(500, {"message": f"Error: {str(err)}"})
+
+    items: List[Dict[str, Any]] = [
+        _public_fields(it) for it in response_items if it.get("status") != "deleted"
+    ]
+    log_event("get_notes_range", {"date_from": date_from, "date_to": date_to, "items": len(items)})
+    body = {"items": items, "next_cursor": next_cursor}
+    return json_response(200, body, {"Cache-Control": CACHE_CONTROL}, event=event)
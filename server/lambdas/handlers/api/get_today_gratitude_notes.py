@@ -1,8 +1,31 @@
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 
-from notes.db import list_notes_for_date
-from shared.api_gateway import json_response
+from notes.db import InvalidCursorError, latest_created_at, list_notes_for_date
+from notes.feed import read_feed_page
+from shared.api_gateway import (
+    cache_control,
+    compute_etag,
+    etag_matches,
+    extract_limit,
+    extract_since,
+    get_header,
+    get_query_param,
+    json_response,
+    not_modified_response,
+    raw_json_response,
+)
+from shared import codec
+from shared.cache import LISTING_CACHE
+from shared.config import (
+    DAILY_FEED_ENABLED,
+    LIST_DEFAULT_LIMIT,
+    LIST_MAX_LIMIT,
+    LISTING_MAX_AGE_SECONDS,
+    LISTING_STALE_WHILE_REVALIDATE_SECONDS,
+)
+from shared.instrumentation import timed
+from shared.invocation import invocation
 from shared.logging import log_event
 
 
@@ -17,11 +40,60 @@ def _public_fields(item: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+CACHE_CONTROL = cache_control(LISTING_MAX_AGE_SECONDS, LISTING_STALE_WHILE_REVALIDATE_SECONDS)
+
+
+def _respond(event: dict, body_json: str, etag: str) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(get_header(event, "If-None-Match"), etag):
+        return not_modified_response(headers)
+    return raw_json_response(200, body_json, headers, event=event)
+
+
+@invocation
 def handler(event: dict, _context: object) -> dict:
-    """List all active gratitude notes for today."""
+    """
+    List one page of active gratitude notes for today (follow next_cursor for more).
+
+    Pollers pass the returned watermark back as ?since= to receive only notes
+    created after it. Every listing carries an ETag (hash of the body) and a
+    Cache-Control header; a matching If-None-Match gets a 304 with no body.
+
+    With DAILY_FEED_ENABLED, the first page (no cursor, no since) is read
+    from the materialized daily feed with one GetItem when it is complete,
+    else from the gsi_date query. The feed trails writes by the note
+    workflow's delay, so a client reloading after its own write passes
+    ?fresh=1: that skips the feed and the warm-container cache.
+    """
+    limit, error = extract_limit(event, default=LIST_DEFAULT_LIMIT, maximum=LIST_MAX_LIMIT)
+    if error:
+        return json_response(400, {"message": error})
+    since, error = extract_since(event)
+    if error:
+        return json_response(400, {"message": error})
+    cursor = get_query_param(event, "cursor")
+    fresh = get_query_param(event, "fresh") in ("1", "true")
+
+    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    cache_key = (date_str, limit, cursor, since)
+    cached = None if fresh else LISTING_CACHE.get(cache_key)
+    log_event("get_today_notes_cache", {"hit": cached is not None, "fresh": fresh, **LISTING_CACHE.stats()})
+    if cached is not None:
+        return _respond(event, *cached)
+
     try:
-        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        response_items = list_notes_for_date(date_str)
+        with timed("store"):
+            page = None
+            if DAILY_FEED_ENABLED and not fresh and cursor is None and since is None:
+                page = read_feed_page(date_str, limit=limit)
+            log_event("get_today_notes_source", {"feed": page is not None})
+            if page is not None:
+                response_items, next_cursor, watermark = page
+            else:
+                response_items, next_cursor = list_notes_for_date(
+                    date_str, limit=limit, cursor=cursor, since=since
+                )
+                watermark = latest_created_at(response_items, default=since)
 
         items: List[Dict[str, Any]] = []
         for it in response_items:
@@ -29,8 +101,18 @@ def handler(event: dict, _context: object) -> dict:
                 continue
             items.append(_public_fields(it))
 
-        return json_response(200, {"items": items})
+        body = {
+            "items": items,
+            "next_cursor": next_cursor,
+            "watermark": watermark,
+        }
+        with timed("serialize"):
+            body_json = codec.dumps(body)
+            etag = compute_etag(body_json)
+        LISTING_CACHE.set(cache_key, (body_json, etag))
+        return _respond(event, body_json, etag)
+    except InvalidCursorError as err:
+        return json_response(400, {"message": str(err)})
     except Exception as err:  # pylint: disable=broad-except
         log_event("get_today_notes_error", {"error": str(err)})
         return json_response(500, {"message": f"Error: {str(err)}"})
-
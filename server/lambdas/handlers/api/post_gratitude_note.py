@@ -1,89 +1,48 @@
-import json
 from datetime import datetime, timezone
 
 from notes.db import create_or_update_note
-from shared.config import EVENT_BUS_NAME, events_client
-from shared.api_gateway import json_response, load_json_body
+from notes.validation import normalize_note_input
+from shared.admission import admit
+from shared.api_gateway import json_response, load_json_body, source_ip, too_many_requests_response
+from shared.idempotency import idempotent
+from shared.instrumentation import timed
+from shared.invocation import invocation
 from shared.logging import log_event
-import re
-
-EVENTS = events_client()
-
-
-def _publish_note_event(note: dict, event_type: str) -> None:
-    """
-    Publish a note lifecycle event (note.created or note.updated) to EventBridge.
-    This event will be used for observability and future features (e.g., streak tracking).
-    """
-    detail = {
-        "eventType": event_type,
-        "noteId": note["id"],
-        "gratitudeText": note.get("gratitude_text", ""),
-    }
-    
-    detail_type_map = {
-        "note.created": "gratitude.note.created",
-        "note.updated": "gratitude.note.updated",
-    }
-    
-    detail_type = detail_type_map.get(event_type)
-    if not detail_type:
-        log_event("post_note_event_invalid_type", {"eventType": event_type, "noteId": note["id"]})
-        return
-    
-    try:
-        EVENTS.put_events(
-            Entries=[
-                {
-                    "Source": "gratitude.note",
-                    "DetailType": detail_type,
-                    "Detail": json.dumps(detail),
-                    "EventBusName": EVENT_BUS_NAME,
-                }
-            ]
-        )
-        log_event("post_note_event_emitted", {"noteId": note["id"], "detailType": detail_type, "eventType": event_type})
-    except Exception as err:  # pylint: disable=broad-except
-        log_event(
-            "post_note_event_error",
-            {"noteId": note["id"], "detailType": detail_type, "eventType": event_type, "error": str(err)},
-        )
 
 
+@invocation
+@idempotent("post_note")
 def handler(event: dict, _context: object) -> dict:
-    """Create or update a gratitude note."""
-    body = load_json_body(event)
-
-    # Extract and validate input
-    name = body.get("name", "").strip()
-    email = body.get("email", "").strip().lower()
-    gratitude_text = body.get("gratitudeText", "").strip()
-
-    # Validate required fields
-    if not name or not email or not gratitude_text:
-        return json_response(400, {"message": "Name, email, and gratitude text are required."})
-    # Basic email format check (simple regex)
-    if not re.match(r'^[^@]+@[^@]+\.[^@]+$', email):
-        return json_response(400, {"message": "Invalid email format."})
+    """
+    Create or update a gratitude note (retries with the same Idempotency-Key replay the first response).
 
-    # Normalize payload
-    normalized = {
-        "name": name,
-        "email": email,
-        "gratitude_text": gratitude_text,
-    }
+    The note.created/note.updated event comes from the table's stream (publish_note_changes).
+    """
+    with timed("validation"):
+        body = load_json_body(event)
+        # Validate and normalize input
+        normalized, error = normalize_note_input(body)
+    if error:
+        return json_response(400, {"message": error})
+
+    # Reject clients over their rate before touching the table.
+    with timed("admission"):
+        decision = admit(ip=source_ip(event), email=normalized["email"])
+    if not decision.allowed:
+        return too_many_requests_response(decision.retry_after)
 
     now = datetime.now(timezone.utc)
     date_str = now.date().isoformat()
     note_id = body.get("id")  # Optional ID for editing
 
     try:
-        item, created = create_or_update_note(
-            normalized,
-            date_str=date_str,
-            now_iso=now.isoformat(),
-            note_id=note_id,
-        )
+        with timed("store"):
+            item, created = create_or_update_note(
+                normalized,
+                date_str=date_str,
+                now_iso=now.isoformat(),
+                note_id=note_id,
+            )
     except ValueError as err:
         # Note not found or deleted
         log_event("put_note_not_found", {"id": note_id, "error": str(err)})
@@ -92,11 +51,11 @@ def handler(event: dict, _context: object) -> dict:
         log_event("put_note_store_failed", {"error": str(err)})
         return json_response(500, {"message": "Failed to save gratitude note."})
 
-    log_event("put_note_created" if created else "put_note_replaced", {"id": item["id"]})
-    
-    # Emit appropriate event based on whether note was created or updated
-    event_type = "note.created" if created else "note.updated"
-    _publish_note_event(item, event_type)
+    if created is None:
+        # Same text as stored: nothing was written, so there is no stream event either.
+        log_event("put_note_unchanged", {"id": item["id"]})
+    else:
+        log_event("put_note_created" if created else "put_note_replaced", {"id": item["id"]})
 
     return json_response(201 if created else 200, {"id": item["id"], "owner_token": item.get("owner_token")})
 
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from notes.db import create_notes_batch
+from notes.validation import normalize_note_input
+from shared.admission import admit_notes
+from shared.api_gateway import json_response, load_json_body, source_ip, too_many_requests_response
+from shared.config import BULK_MAX_NOTES
+from shared.idempotency import idempotent
+from shared.instrumentation import timed
+from shared.invocation import invocation
+from shared.logging import log_event
+
+
+@invocation
+@idempotent("post_notes_bulk")
+def handler(event: dict, _context: object) -> dict:
+    """
+    Create many gratitude notes in one request: {"notes": [{name, email, gratitudeText}, ...]}.
+
+    Every note is validated first; the valid ones are written with BatchWriteItem.
+    results holds one entry per input note, in order: created (with id and
+    owner_token), invalid or failed. 201 when all were created, 207 otherwise.
+    The note.created events come from the table's stream (publish_note_changes).
+    """
+    body = load_json_body(event)
+    notes = body.get("notes") if isinstance(body, dict) else None
+    if not isinstance(notes, list) or not notes:
+        return json_response(400, {"message": "Body must contain a non-empty 'notes' list."})
+    if len(notes) > BULK_MAX_NOTES:
+        return json_response(400, {"message": f"At most {BULK_MAX_NOTES} notes per request."})
+
+    results: List[Dict[str, Any]] = [{} for _ in notes]
+    valid: List[Dict[str, Any]] = []
+    positions: List[int] = []
+    with timed("validation"):
+        for index, note in enumerate(notes):
+            normalized, error = normalize_note_input(note)
+            if error:
+                results[index] = {"index": index, "status": "invalid", "message": error}
+            else:
+                valid.append(normalized)
+                positions.append(index)
+    if not valid:
+        return json_response(400, {"message": "No valid notes.", "results": results})
+
+    # Every note costs the same admission token as a single POST, for the IP and for its email.
+    with timed("admission"):
+        decision = admit_notes(ip=source_ip(event), emails=[note["email"] for note in valid])
+    if not decision.allowed:
+        return too_many_requests_response(decision.retry_after)
+
+    date_str = datetime.now(timezone.utc).date().isoformat()
+    try:
+        with timed("store"):
+            written = create_notes_batch(valid, date_str=date_str)
+    except Exception as err:  # pylint: disable=broad-except
+        log_event("post_notes_bulk_failed", {"notes": len(valid), "error": str(err)})
+        return json_response(500, {"message": "Failed to save gratitude notes."})
+
+    created: List[Dict[str, Any]] = []
+    for index, (item, ok) in zip(positions, written):
+        if ok:
+            created.append(item)
+            results[index] = {
+                "index": index, "status": "created", "id": item["id"], "owner_token": item["owner_token"],
+            }
+        else:
+            results[index] = {"index": index, "status": "failed", "message": "Failed to save gratitude note."}
+
+    log_event("post_notes_bulk", {"notes": len(notes), "created": len(created), "invalid": len(notes) - len(valid)})
+
+    status_code = 201 if len(created) == len(notes) else 207
+    return json_response(status_code, {"created": len(created), "results": results})
@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from notes.store import FEED_ID_PREFIX
+from shared import codec
+from shared.event_bus import PUBLISHER
+from shared.invocation import invocation
+from shared.logging import log_event
+
+_DESERIALIZER = TypeDeserializer()
+
+# (detail type, detail) of one note lifecycle event
+NoteEvent = Tuple[str, Dict[str, Any]]
+
+
+def _image(record: Dict[str, Any], name: str) -> Dict[str, Any]:
+    raw = (record.get("dynamodb") or {}).get(name) or {}
+    return {k: _DESERIALIZER.deserialize(v) for k, v in raw.items()}
+
+
+def note_event(record: Dict[str, Any]) -> Optional[NoteEvent]:
+    """
+    The lifecycle event a gratitude_notes stream record stands for, or None.
+
+    INSERT is note.created; a MODIFY that sets status=deleted is note.deleted
+    and one that changes gratitude_text is note.updated. Feed documents, TTL
+    removals and the nightly archive (which has its own workflow) emit nothing.
+    """
+    name = record.get("eventName")
+    if name not in ("INSERT", "MODIFY"):
+        return None
+    new = _image(record, "NewImage")
+    note_id = new.get("id") or ""
+    if not note_id or note_id.startswith(FEED_ID_PREFIX) or not new.get("date"):
+        return None
+    if name == "INSERT":
+        return "gratitude.note.created", {
+            "eventType": "note.created", "noteId": note_id, "gratitudeText": new.get("gratitude_text", ""),
+        }
+
+    old = _image(record, "OldImage")
+    if new.get("status") == "deleted":
+        if old.get("status") == "deleted" or ("archived_at" in new and "archived_at" not in old):
+            return None
+        return "gratitude.note.deleted", {"eventType": "note.deleted", "noteId": note_id}
+    if new.get("gratitude_text") != old.get("gratitude_text"):
+        return "gratitude.note.updated", {
+            "eventType": "note.updated", "noteId": note_id, "gratitudeText": new.get("gratitude_text", ""),
+        }
+    return None
+
+
+@invocation
+def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
+    """
+    DynamoDB stream consumer: publish the note lifecycle events to EventBridge.
+
+    The API handlers only write the note; its events come from the table's
+    stream, so they are neither on the response path nor lost with a frozen
+    container. Events go out with PutEvents, 10 per call. When some are still
+    failing after the publisher's retries, the first record they came from is
+    returned in batchItemFailures and Lambda redelivers the batch from there.
+    """
+    records = event.get("Records") or []
+    changes: List[Tuple[str, NoteEvent]] = []
+    for record in records:
+        change = note_event(record)
+        if change is not None:
+            PUBLISHER.publish(*change)
+            changes.append((record["dynamodb"]["SequenceNumber"], change))
+
+    result = PUBLISHER.flush()
+    log_event(
+        "publish_note_changes",
+        {"records": len(records), "events": len(changes), "calls": result.calls, "failed": len(result.failed)},
+    )
+    if not result.failed:
+        return {"batchItemFailures": []}
+    failed = {(entry["DetailType"], entry["Detail"]) for entry in result.failed}
+    for sequence_number, (detail_type, detail) in changes:
+        if (detail_type, codec.dumps(detail)) in failed:
+            return {"batchItemFailures": [{"itemIdentifier": sequence_number}]}
+    return {"batchItemFailures": []}
@@ -0,0 +1,42 @@
+from typing import Any, Dict, List
+
+from shared import codec
+from shared.config import FEEDBACK_DIGEST, SENDER_EMAIL
+from shared.feedback import SENDER, Submission
+from shared.invocation import invocation
+from shared.logging import log_event
+
+
+@invocation
+def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
+    """
+    SQS worker: email a batch of queued feedback submissions to the developer.
+
+    Sends one digest for the batch when FEEDBACK_DIGEST is on, otherwise one
+    email per submission. Returns the messages to redeliver as
+    batchItemFailures (ReportBatchItemFailures); malformed messages are dropped.
+    """
+    records = event.get("Records") or []
+    if not SENDER_EMAIL:
+        log_event("send_feedback_not_configured", {"messages": len(records)})
+        return {"batchItemFailures": [{"itemIdentifier": r["messageId"]} for r in records]}
+
+    submissions: List[Submission] = []
+    for record in records:
+        try:
+            body = codec.loads(record["body"])
+            submissions.append(Submission(record["messageId"], str(body["feedback"]), str(body["received_at"])))
+        except (KeyError, TypeError, ValueError):
+            log_event("send_feedback_malformed", {"messageId": record.get("messageId")})
+
+    report = SENDER.deliver(submissions, digest=FEEDBACK_DIGEST)
+    log_event(
+        "send_feedback",
+        {
+            "messages": len(records),
+            "emails": report.emails,
+            "throttleRetries": report.throttle_retries,
+            "failed": len(report.failed),
+        },
+    )
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in report.failed]}
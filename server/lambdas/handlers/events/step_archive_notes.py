@@ -3,8 +3,10 @@ from typing import Any, Dict
 
 from zoneinfo import ZoneInfo
 
-from notes.db import archive_notes_by_date
+from notes.db import archive_notes_with_report
+from notes.feed import rebuild_feed
 from shared.config import ARCHIVE_TIMEZONE
+from shared.invocation import invocation
 from shared.logging import log_event
 
 def _archive_date() -> str:
@@ -15,11 +17,19 @@ def _archive_date() -> str:
     return datetime.now(tz).date().isoformat()
 
 
+@invocation
 def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
     target_date = event.get("date") or _archive_date()
     now_iso = datetime.now(timezone.utc).isoformat()
-    archived = archive_notes_by_date(target_date, now_iso=now_iso)
+    report = archive_notes_with_report(target_date, now_iso=now_iso)
+    # Archiving bypasses the note events, so the day's feed is rebuilt (empty) here.
+    rebuild_feed(target_date, now_iso=now_iso)
 
-    log_event("step_archive_notes", {"date": target_date, "archived": archived})
-    return {"date": target_date, "archived": archived}
+    log_event("step_archive_notes", report.to_dict())
+    return {
+        "date": target_date,
+        "archived": report.archived,
+        "pages": len(report.pages),
+        "throttleRetries": report.throttle_retries,
+    }
 
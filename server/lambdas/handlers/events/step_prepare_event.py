@@ -1,19 +1,80 @@
-import json
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
+from shared import codec
+from shared.invocation import invocation
 from shared.logging import log_event
 
+# Supported event types
+SUPPORTED_TYPES = ["archive.nightly", "note.created", "note.updated", "note.deleted"]
 
-def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
+# eventType of the envelope returned for a batch of events
+BATCH_EVENT_TYPE = "note.batch"
+
+
+@invocation
+def handler(event: Any, _context) -> Dict[str, Any]:
     """
     Step Function task that prepares events for processing.
-    
+
     Handles both archive.nightly (from Scheduler) and note.created (from EventBridge rule).
     Normalizes event payloads from different sources into a consistent format.
+
+    Batches are accepted too: a list of events, an SQS-style {"Records": [...]}
+    (or a list of SQS records, as delivered by an EventBridge Pipe) whose
+    bodies hold EventBridge events, or {"events": [...]}. They are normalized
+    in one pass into {"eventType": "note.batch", "events": [...], "errors": [...]};
+    an invalid entry is reported in errors instead of failing the batch.
     """
+    batch = _batch_entries(event)
+    if batch is not None:
+        return _prepare_batch(batch)
+
     if not isinstance(event, dict):
         raise ValueError("Event payload must be an object.")
 
+    normalized = _normalize(event)
+    log_event("step_prepare_event", {"eventType": normalized["eventType"], "normalized": normalized})
+    return normalized
+
+
+def _batch_entries(event: Any) -> Optional[List[Any]]:
+    """Return the list of raw events when event is a batch, else None."""
+    if isinstance(event, list):
+        return event
+    if isinstance(event, dict):
+        if isinstance(event.get("Records"), list):
+            return event["Records"]
+        if isinstance(event.get("events"), list):
+            return event["events"]
+    return None
+
+
+def _prepare_batch(entries: List[Any]) -> Dict[str, Any]:
+    events: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, entry in enumerate(entries):
+        try:
+            events.append(_normalize(_unwrap_record(entry)))
+        except ValueError as err:
+            errors.append({"index": index, "error": str(err)})
+
+    log_event("step_prepare_event_batch", {"received": len(entries), "prepared": len(events), "errors": len(errors)})
+    return {"eventType": BATCH_EVENT_TYPE, "events": events, "errors": errors}
+
+
+def _unwrap_record(entry: Any) -> Dict[str, Any]:
+    """Return the event carried by an SQS record (JSON body), or entry itself."""
+    if isinstance(entry, dict) and isinstance(entry.get("body"), str):
+        try:
+            entry = codec.loads(entry["body"])
+        except codec.JSONDecodeError as err:
+            raise ValueError(f"Failed to parse record body: {err}")
+    if not isinstance(entry, dict):
+        raise ValueError("Event payload must be an object.")
+    return entry
+
+
+def _normalize(event: Dict[str, Any]) -> Dict[str, Any]:
     # Handle EventBridge event structure: event comes with "detail" containing JSON string
     # OR direct input from Scheduler: event has "eventType" directly
     event_type = None
@@ -24,11 +85,11 @@ def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
         try:
             # EventBridge passes detail as JSON string, parse it
             if isinstance(event["detail"], str):
-                detail_data = json.loads(event["detail"])
+                detail_data = codec.loads(event["detail"])
             else:
                 detail_data = event["detail"]
             event_type = detail_data.get("eventType")
-        except (json.JSONDecodeError, TypeError) as err:
+        except (codec.JSONDecodeError, TypeError, AttributeError) as err:
             log_event("step_prepare_event_parse_error", {"error": str(err), "detail": str(event.get("detail"))})
             raise ValueError(f"Failed to parse event detail: {err}")
 
@@ -39,10 +100,8 @@ def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
     if not event_type:
         raise ValueError("Event must contain 'eventType' either directly or in 'detail' JSON.")
 
-    # Supported event types
-    supported_types = ["archive.nightly", "note.created", "note.updated", "note.deleted"]
-    if event_type not in supported_types:
-        raise ValueError(f"Unsupported event type: {event_type}. Supported: {supported_types}")
+    if event_type not in SUPPORTED_TYPES:
+        raise ValueError(f"Unsupported event type: {event_type}. Supported: {SUPPORTED_TYPES}")
 
     # Build normalized event
     normalized = {"eventType": event_type}
@@ -56,6 +115,4 @@ def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
         # For deleted events, only include noteId (no gratitudeText needed)
         normalized["noteId"] = detail_data.get("noteId")
 
-    log_event("step_prepare_event", {"eventType": event_type, "normalized": normalized})
     return normalized
-
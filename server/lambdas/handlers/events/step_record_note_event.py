@@ -1,11 +1,9 @@
-from typing import Any, Dict
+from collections import Counter
+from typing import Any, Dict, List
 
-import boto3
-
-from shared.config import REGION
+from shared.invocation import invocation
 from shared.logging import log_event
-
-cloudwatch = boto3.client("cloudwatch", region_name=REGION)
+from shared.metrics import put_metric
 
 # Map event types to CloudWatch metric names
 METRIC_NAME_MAP = {
@@ -15,13 +13,45 @@ METRIC_NAME_MAP = {
 }
 
 
-def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
+@invocation
+def handler(event: Any, _context) -> Dict[str, Any]:
     """
     Step Function task that records note lifecycle events to CloudWatch.
     
     Handles note.created, note.updated, and note.deleted events.
     Emits custom metrics and structured logs for observability.
+    Metrics are buffered and published when the invocation ends
+    (EMF log records by default, see shared.metrics).
+
+    A batch from PrepareEvent ({"eventType": "note.batch", "events": [...]})
+    or a plain list of events is recorded in one pass: counts are aggregated
+    per event type into one data point each, and a per-item results list is
+    returned alongside them.
     """
+    if isinstance(event, list):
+        return _record_batch(event)
+    if isinstance(event, dict) and event.get("eventType") == "note.batch":
+        return _record_batch(event.get("events") or [])
+
+    result = _check(event)
+    if result["status"] != "recorded":
+        return result
+
+    event_type = result["eventType"]
+    note_id = result["noteId"]
+    metric_name = METRIC_NAME_MAP[event_type]
+    # Only buffered here; the data point is published when the invocation ends.
+    put_metric(metric_name, 1, unit="Count", dimensions={"EventType": event_type})
+    log_event("note_event_recorded", {"noteId": note_id, "eventType": event_type, "metricName": metric_name})
+    return result
+
+
+def _check(event: Any) -> Dict[str, Any]:
+    """Validate one normalized event; returns its result ("recorded" or "skipped" with a reason)."""
+    if not isinstance(event, dict):
+        log_event("record_note_event_invalid", {"type": type(event).__name__})
+        return {"status": "skipped", "reason": "invalid_event"}
+
     event_type = event.get("eventType")
     note_id = event.get("noteId")
     
@@ -33,33 +63,19 @@ def handler(event: Dict[str, Any], _context) -> Dict[str, Any]:
         log_event("record_note_event_missing_note_id", {"event": event, "eventType": event_type})
         return {"status": "skipped", "reason": "missing_note_id"}
     
-    metric_name = METRIC_NAME_MAP.get(event_type)
-    if not metric_name:
+    if event_type not in METRIC_NAME_MAP:
         log_event("record_note_event_unsupported_type", {"eventType": event_type, "noteId": note_id})
         return {"status": "skipped", "reason": f"unsupported_event_type: {event_type}"}
 
-    try:
-        # Emit CloudWatch custom metric
-        cloudwatch.put_metric_data(
-            Namespace="DailyGratitude",
-            MetricData=[
-                {
-                    "MetricName": metric_name,
-                    "Value": 1,
-                    "Unit": "Count",
-                    "Dimensions": [
-                        {"Name": "EventType", "Value": event_type}
-                    ],
-                }
-            ],
-        )
-        
-        log_event("note_event_recorded", {"noteId": note_id, "eventType": event_type, "metricName": metric_name})
-        return {"status": "recorded", "noteId": note_id, "eventType": event_type}
-        
-    except Exception as err:  # pylint: disable=broad-except
-        log_event("record_note_event_error", {"noteId": note_id, "eventType": event_type, "error": str(err)})
-        # Return success to avoid failing the Step Functions execution
-        # The error is logged for debugging
-        return {"status": "error", "noteId": note_id, "eventType": event_type, "error": str(err)}
+    return {"status": "recorded", "noteId": note_id, "eventType": event_type}
+
+
+def _record_batch(events: List[Any]) -> Dict[str, Any]:
+    results = [_check(event) for event in events]
+    counts = Counter(r["eventType"] for r in results if r["status"] == "recorded")
+
+    for event_type, count in counts.items():
+        put_metric(METRIC_NAME_MAP[event_type], count, unit="Count", dimensions={"EventType": event_type})
 
+    log_event("note_event_batch_recorded", {"received": len(events), "counts": dict(counts)})
+    return {"status": "recorded", "eventType": "note.batch", "counts": dict(counts), "results": results}
@@ -0,0 +1,45 @@
+from typing import Any, Dict, List
+
+from notes.feed import apply_note_changes
+from shared.invocation import invocation
+from shared.logging import log_event
+
+# Event types that change what the daily feed shows
+FEED_EVENT_TYPES = ("note.created", "note.updated", "note.deleted")
+
+
+@invocation
+def handler(event: Any, _context) -> Dict[str, Any]:
+    """
+    Step Function task that keeps the daily feed documents in line with note events.
+
+    Takes the same input as RecordNoteEvent: one normalized event or a batch
+    ({"eventType": "note.batch", "events": [...]}, or a plain list). The notes
+    are re-read from the table, so the event order does not matter; all notes
+    of one date are applied to its feed in a single update.
+    """
+    if isinstance(event, list):
+        events = event
+    elif event.get("eventType") == "note.batch":
+        events = event.get("events") or []
+    else:
+        events = [event]
+
+    note_ids: List[str] = [
+        e["noteId"]
+        for e in events
+        if isinstance(e, dict) and e.get("eventType") in FEED_EVENT_TYPES and e.get("noteId")
+    ]
+    if not note_ids:
+        return {"status": "skipped", "dates": {}}
+
+    try:
+        dates = apply_note_changes(note_ids)
+    except Exception as err:  # pylint: disable=broad-except
+        # The listing falls back to the query path for a feed that is missing;
+        # a feed left behind by this failure catches up on the next event for its date.
+        log_event("update_daily_feed_error", {"notes": len(note_ids), "error": str(err)})
+        return {"status": "error", "error": str(err)}
+
+    log_event("daily_feed_updated", {"notes": len(note_ids), "dates": dates})
+    return {"status": "updated", "dates": dates}
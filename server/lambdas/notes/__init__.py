@@ -2,5 +2,10 @@
 Notes domain layer.
 
 Modules:
-- db: DynamoDB data access for gratitude notes (CRUD operations)
+- db: Data access for gratitude notes (CRUD operations)
+- store: NotesStore backends (DynamoDB and in-memory), selected by STORE_BACKEND
+- archive: Pipelined, concurrent archive engine used by the nightly archive step
+- feed: Materialized daily feed documents for the today listing
+- range: Parallel multi-day listing engine
+- validation: Input checks shared by the single and bulk note endpoints
 """
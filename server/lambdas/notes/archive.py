@@ -0,0 +1,137 @@
+"""
+Archive engine for the nightly archive step.
+
+The engine pipelines the work: while the updates for one GSI page run on a
+bounded worker pool, the next page is already being fetched. Throttled calls
+are retried with exponential backoff and counted in the report.
+"""
+from __future__ import annotations
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from botocore.exceptions import ClientError
+
+T = TypeVar("T")
+
+# (items, last_evaluated_key) for one GSI page
+Page = Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+THROTTLE_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+
+@dataclass
+class PageTiming:
+    page: int
+    items: int
+    archived: int
+    fetch_ms: float
+    update_ms: float
+
+
+@dataclass
+class ArchiveReport:
+    date: str
+    archived: int = 0
+    throttle_retries: int = 0
+    pages: List[PageTiming] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "date": self.date,
+            "archived": self.archived,
+            "throttleRetries": self.throttle_retries,
+            "pages": [asdict(p) for p in self.pages],
+        }
+
+
+def with_throttle_retry(
+    fn: Callable[[], T],
+    *,
+    max_attempts: int = 5,
+    base_delay: float = 0.05,
+) -> Tuple[T, int]:
+    """Call fn, retrying throttling errors with jittered backoff. Returns (result, retries)."""
+    retries = 0
+    while True:
+        try:
+            return fn(), retries
+        except ClientError as err:
+            code = err.response.get("Error", {}).get("Code")
+            if code not in THROTTLE_CODES or retries + 1 >= max_attempts:
+                raise
+            time.sleep(base_delay * (2 ** retries) * random.uniform(0.5, 1.5))
+            retries += 1
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def run_archive(
+    date_str: str,
+    *,
+    fetch_page: Callable[[Optional[Dict[str, Any]]], Page],
+    archive_one: Callable[[str], None],
+    max_workers: int,
+) -> ArchiveReport:
+    """
+    Archive every non-deleted note returned by fetch_page.
+
+    fetch_page(start_key) returns one page of {id, status} items plus the
+    LastEvaluatedKey; archive_one(note_id) marks a single note as archived.
+    At most two pages are held in memory at any time.
+    """
+    report = ArchiveReport(date=date_str)
+
+    def fetch(start_key: Optional[Dict[str, Any]]) -> Tuple[Page, float]:
+        started = time.perf_counter()
+        page, retries = with_throttle_retry(lambda: fetch_page(start_key))
+        report.throttle_retries += retries
+        return page, _elapsed_ms(started)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        current: Optional[Tuple[Page, float]] = fetch(None)
+        page_no = 0
+        while current is not None:
+            (items, next_key), fetch_ms = current
+            page_no += 1
+
+            started = time.perf_counter()
+            futures = [
+                pool.submit(with_throttle_retry, lambda note_id=item["id"]: archive_one(note_id))
+                for item in items
+                if item.get("status") != "deleted"
+            ]
+
+            # Overlap the next page read with this page's updates.
+            current = fetch(next_key) if next_key else None
+
+            try:
+                for future in futures:
+                    _, retries = future.result()
+                    report.throttle_retries += retries
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+            report.archived += len(futures)
+            report.pages.append(
+                PageTiming(
+                    page=page_no,
+                    items=len(items),
+                    archived=len(futures),
+                    fetch_ms=fetch_ms,
+                    update_ms=_elapsed_ms(started),
+                )
+            )
+
+    return report
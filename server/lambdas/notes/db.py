@@ -1,21 +1,130 @@
 """
-Data access for notes (DynamoDB).
+Data access for notes.
+
+Domain operations on top of the configured NotesStore (see notes.store).
 """
+import base64
+import random
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from botocore.exceptions import ClientError
-from boto3.dynamodb.conditions import Key
 
-from shared.config import notes_table
+from notes.archive import THROTTLE_CODES, ArchiveReport, run_archive
+from notes.range import date_span, fetch_range_page
+from notes.store import (
+    BATCH_WRITE_MAX_ITEMS,
+    FEED_ID_PREFIX,
+    REVISION_ATTRIBUTE,
+    DeleteOutcome,
+    NoteAlreadyExistsError,
+    UpdateOutcome,
+    get_store,
+)
+from shared import codec
+from shared.config import ARCHIVE_MAX_WORKERS, BULK_WRITE_MAX_ATTEMPTS, RANGE_MAX_WORKERS
 from shared.logging import log_event
 
-TABLE = notes_table()
+# Attributes the public listing needs; owner_token and ttl are never read.
+PUBLIC_ATTRIBUTES = ("id", "name", "email", "gratitude_text", "status", "created_at", "created_at_iso")
+
+# Attributes a multi-day listing needs: the public ones plus the day.
+RANGE_ATTRIBUTES = PUBLIC_ATTRIBUTES + ("date",)
+
+# Attributes an author's history needs: the public ones plus the day and how a note ended.
+HISTORY_ATTRIBUTES = PUBLIC_ATTRIBUTES + ("date", "archived_at", "deleted_at")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(last_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Turn a LastEvaluatedKey into an opaque, URL-safe cursor."""
+    if not last_key:
+        return None
+    raw = codec.dumps(last_key, sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_key(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return codec.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as err:
+        raise InvalidCursorError("Invalid cursor.") from err
 
 
-class NoteAlreadyExistsError(Exception):
-    """Raised when attempting to create a note that already exists."""
+def decode_cursor(cursor: str, *, date_str: str) -> Dict[str, Any]:
+    """Turn a cursor back into an ExclusiveStartKey for the gsi_date partition of date_str."""
+    key = _decode_key(cursor)
+    if (
+        not isinstance(key, dict)
+        or set(key) != {"id", "date", "created_at"}
+        or not isinstance(key["id"], str)
+        or not isinstance(key["created_at"], int)
+        or key["date"] != date_str
+    ):
+        raise InvalidCursorError("Invalid cursor.")
+    return key
+
+
+def decode_email_cursor(cursor: str, *, email: str) -> Dict[str, Any]:
+    """Turn a cursor back into an ExclusiveStartKey for the gsi_email_date partition of email."""
+    key = _decode_key(cursor)
+    if (
+        not isinstance(key, dict)
+        or set(key) != {"id", "email", "date"}
+        or not isinstance(key["id"], str)
+        or not isinstance(key["date"], str)
+        or key["email"] != email
+    ):
+        raise InvalidCursorError("Invalid cursor.")
+    return key
+
+
+def _encode_range_cursor(date_from: str, date_to: str, positions: Dict[str, Any]) -> Optional[str]:
+    """Cursor for the open partitions of a range: {date: [created_at, id]}, null before the first page."""
+    if not positions:
+        return None
+    open_dates = {
+        d: [key["created_at"], key["id"]] if key else None
+        for d, key in positions.items()
+    }
+    return encode_cursor({"from": date_from, "to": date_to, "open": open_dates})
+
+
+def _decode_range_cursor(cursor: str, *, date_from: str, date_to: str) -> Dict[str, Any]:
+    """Turn a range cursor back into {date: ExclusiveStartKey or None} for the same range."""
+    state = _decode_key(cursor)
+    if (
+        not isinstance(state, dict)
+        or set(state) != {"from", "to", "open"}
+        or (state["from"], state["to"]) != (date_from, date_to)
+        or not isinstance(state["open"], dict)
+    ):
+        raise InvalidCursorError("Invalid cursor.")
+    span = set(date_span(date_from, date_to))
+    positions: Dict[str, Any] = {}
+    # Newest date first, as date_span orders them.
+    for d in sorted(state["open"], reverse=True):
+        value = state["open"][d]
+        if d not in span:
+            raise InvalidCursorError("Invalid cursor.")
+        if value is None:
+            positions[d] = None
+        elif (
+            isinstance(value, list)
+            and len(value) == 2
+            and isinstance(value[0], int)
+            and isinstance(value[1], str)
+        ):
+            positions[d] = {"id": value[1], "date": d, "created_at": value[0]}
+        else:
+            raise InvalidCursorError("Invalid cursor.")
+    return positions
 
 
 def _build_note_item(normalized: Dict[str, Any], date_str: str) -> Dict[str, Any]:
@@ -36,6 +145,7 @@ def _build_note_item(normalized: Dict[str, Any], date_str: str) -> Dict[str, Any
         "created_at_iso": now.isoformat(),
         "owner_token": owner_token,
         "ttl": ttl,
+        REVISION_ATTRIBUTE: 1,
     }
 
 
@@ -45,12 +155,14 @@ def create_or_update_note(
     date_str: str,
     now_iso: Optional[str] = None,
     note_id: Optional[str] = None,
-) -> Tuple[Dict[str, Any], bool]:
+) -> Tuple[Dict[str, Any], Optional[bool]]:
     """
     Single entry point for the POST note handler.
 
-    Returns (note_item, created_bool).
-    - If note_id is provided: updates that note by ID (fails if not found or deleted).
+    Returns (note_item, created): True for a new note, False for an update,
+    None when the text was unchanged and nothing was written.
+    - If note_id is provided: updates that note by ID in one conditional write
+      (fails if not found or deleted; unchanged text is not written again).
     - If note_id is not provided: creates a new note.
 
     This function exists mainly to provide a single seam for unit tests
@@ -61,15 +173,13 @@ def create_or_update_note(
     # If ID provided, update by ID
     if note_id:
         log_event("create_or_update_note_update_by_id", {"note_id": note_id})
-        existing = get_note(note_id)
-        if not existing:
+        outcome, item = update_note_text(note_id, normalized["gratitude_text"], now_iso=now_iso)
+        if outcome is UpdateOutcome.NOT_FOUND:
             raise ValueError(f"Note {note_id} not found")
-        if existing.get("status") == "deleted":
+        if outcome is UpdateOutcome.DELETED:
             raise ValueError(f"Note {note_id} is deleted and cannot be updated")
-        update_note_text(note_id, normalized["gratitude_text"], now_iso=now_iso)
-        merged = {**existing, "gratitude_text": normalized["gratitude_text"]}
-        log_event("create_or_update_note_updated", {"note_id": note_id})
-        return merged, False
+        log_event("create_or_update_note_updated", {"note_id": note_id, "outcome": outcome.value})
+        return item, (None if outcome is UpdateOutcome.UNCHANGED else False)
 
     # No ID provided: create new note
     log_event("create_or_update_note_create_new", {"email": normalized["email"], "date": date_str})
@@ -80,29 +190,79 @@ def create_or_update_note(
 
 
 def put_note(item: Dict[str, Any]) -> None:
-    """Insert a new note into DynamoDB. Raises NoteAlreadyExistsError if ID exists."""
+    """Insert a new note. Raises NoteAlreadyExistsError if ID exists."""
     try:
-        TABLE.put_item(
-            Item=item,
-            ConditionExpression="attribute_not_exists(id)",
-        )
-    except ClientError as err:
-        code = err.response["Error"].get("Code")
-        if code == "ConditionalCheckFailedException":
-            raise NoteAlreadyExistsError(item["id"]) from err
-        log_event("put_note_dynamo_error", {"id": item.get("id"), "code": code})
+        get_store().put_item(item)
+    except NoteAlreadyExistsError:
+        raise
+    except Exception as err:  # pylint: disable=broad-except
+        log_event("put_note_dynamo_error", {"id": item.get("id"), "error": str(err)})
         raise
 
 
-def update_note_text(note_id: str, gratitude_text: str, *, now_iso: Optional[str] = None) -> None:
-    """Overwrite gratitude_text for an existing note (used for 'replace instead of 409')."""
+def create_notes_batch(
+    normalized_notes: List[Dict[str, Any]],
+    *,
+    date_str: str,
+    max_attempts: int = BULK_WRITE_MAX_ATTEMPTS,
+    base_delay: float = 0.05,
+) -> List[Tuple[Dict[str, Any], bool]]:
+    """
+    Create many notes with BatchWriteItem, BATCH_WRITE_MAX_ITEMS per call.
+
+    Items DynamoDB leaves unprocessed, and throttled calls, are retried with
+    jittered exponential backoff up to max_attempts per chunk. Returns one
+    (note_item, written) pair per input, in input order; a chunk that fails
+    for another reason is reported as not written and the rest go on.
+    """
+    items = [_build_note_item(normalized, date_str) for normalized in normalized_notes]
+    store = get_store()
+    failed: set = set()
+    calls = retries = 0
+    for start in range(0, len(items), BATCH_WRITE_MAX_ITEMS):
+        pending = items[start:start + BATCH_WRITE_MAX_ITEMS]
+        attempt = 0
+        while pending:
+            attempt += 1
+            calls += 1
+            try:
+                pending = store.batch_put(pending)
+            except Exception as err:  # pylint: disable=broad-except
+                code = err.response.get("Error", {}).get("Code") if isinstance(err, ClientError) else None
+                if code not in THROTTLE_CODES:
+                    log_event("create_notes_batch_error", {"notes": len(pending), "error": str(err)})
+                    break
+            if pending and attempt >= max_attempts:
+                break
+            if pending:
+                retries += 1
+                time.sleep(base_delay * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+        failed.update(item["id"] for item in pending)
+
+    log_event(
+        "create_notes_batch",
+        {"notes": len(items), "written": len(items) - len(failed), "calls": calls, "retries": retries},
+    )
+    return [(item, item["id"] not in failed) for item in items]
+
+
+def update_note_text(
+    note_id: str, gratitude_text: str, *, now_iso: Optional[str] = None
+) -> Tuple[UpdateOutcome, Optional[Dict[str, Any]]]:
+    """
+    Overwrite gratitude_text for an existing note (used for 'replace instead of 409').
+
+    One conditional UpdateItem: the note must exist and not be deleted, and
+    identical text is not rewritten. Returns (outcome, item) from the store.
+    """
+    if note_id.startswith(FEED_ID_PREFIX):
+        return UpdateOutcome.NOT_FOUND, None
     now_iso = now_iso or datetime.now(timezone.utc).isoformat()
     try:
-        TABLE.update_item(
-            Key={"id": note_id},
-            UpdateExpression="SET gratitude_text = :text, updated_at_iso = :now, #s = :active",
-            ExpressionAttributeNames={"#s": "status"},
-            ExpressionAttributeValues={":text": gratitude_text, ":now": now_iso, ":active": "active"},
+        return get_store().update_active(
+            note_id,
+            {"gratitude_text": gratitude_text, "updated_at_iso": now_iso, "status": "active"},
+            unless_equal=("gratitude_text",),
         )
     except Exception as err:  # pylint: disable=broad-except
         log_event("update_note_text_error", {"id": note_id, "error": str(err)})
@@ -111,40 +271,169 @@ def update_note_text(note_id: str, gratitude_text: str, *, now_iso: Optional[str
 
 def get_note(note_id: str) -> Optional[Dict[str, Any]]:
     """Fetch a single note by ID. Returns None if not found."""
+    if note_id.startswith(FEED_ID_PREFIX):
+        return None
     try:
-        res = TABLE.get_item(Key={"id": note_id})
-        return res.get("Item")
+        return get_store().get_item(note_id)
     except Exception as err:  # pylint: disable=broad-except
         log_event("get_note_dynamo_error", {"id": note_id, "error": str(err)})
         raise
 
 
-def list_notes_for_date(date_str: str) -> List[Dict[str, Any]]:
-    """Query all notes for a given date (YYYY-MM-DD) via GSI."""
+def list_notes_for_date(
+    date_str: str,
+    *,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    since: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Query one page of notes for a given date (YYYY-MM-DD) via GSI, newest first.
+
+    Only PUBLIC_ATTRIBUTES are read. With since (a created_at epoch watermark)
+    only notes created strictly after it are read, using a range condition on
+    the GSI sort key. Returns (items, next_cursor); next_cursor is None once
+    the partition is exhausted. Raises InvalidCursorError for a malformed
+    cursor or one issued for a different date.
+    """
+    start_key = decode_cursor(cursor, date_str=date_str) if cursor else None
     try:
-        res = TABLE.query(
-            IndexName="gsi_date",
-            KeyConditionExpression=Key("date").eq(date_str),
-            ScanIndexForward=False,
+        items, last_key = get_store().query_date(
+            date_str,
+            limit=limit,
+            start_key=start_key,
+            since=since,
+            newest_first=True,
+            attributes=PUBLIC_ATTRIBUTES,
         )
-        return res.get("Items", [])
     except Exception as err:  # pylint: disable=broad-except
         log_event("list_notes_for_date_error", {"date": date_str, "error": str(err)})
         raise
+    return items, encode_cursor(last_key)
+
+
+def list_notes_for_range(
+    date_from: str,
+    date_to: str,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    max_workers: int = RANGE_MAX_WORKERS,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Read one page of notes across the dates date_from..date_to (inclusive), newest first.
+
+    The date partitions are queried concurrently and k-way merged by
+    created_at (see notes.range). Returns (items, next_cursor); the cursor
+    carries each open partition's position and only fits the same range.
+    Raises InvalidCursorError for a malformed or foreign cursor.
+    """
+    if cursor:
+        positions = _decode_range_cursor(cursor, date_from=date_from, date_to=date_to)
+    else:
+        positions = dict.fromkeys(date_span(date_from, date_to))
+    store = get_store()
+    try:
+        items, remaining = fetch_range_page(
+            positions,
+            limit=limit,
+            fetch_page=lambda d, start_key, page_limit: store.query_date(
+                d, limit=page_limit, start_key=start_key, newest_first=True, attributes=RANGE_ATTRIBUTES
+            ),
+            max_workers=max_workers,
+        )
+    except Exception as err:  # pylint: disable=broad-except
+        log_event("list_notes_for_range_error", {"date_from": date_from, "date_to": date_to, "error": str(err)})
+        raise
+    return items, _encode_range_cursor(date_from, date_to, remaining)
+
+
+def list_notes_for_email(
+    email: str,
+    *,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    attributes: Tuple[str, ...] = HISTORY_ATTRIBUTES,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Query one page of an author's notes via gsi_email_date, newest day first.
+
+    date_from/date_to (YYYY-MM-DD, inclusive) become a key condition on the
+    index sort key, so only that author's partition and range are read.
+    Returns (items, next_cursor); raises InvalidCursorError for a malformed
+    cursor or one issued for another email.
+    """
+    start_key = decode_email_cursor(cursor, email=email) if cursor else None
+    try:
+        items, last_key = get_store().query_email(
+            email,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            start_key=start_key,
+            newest_first=True,
+            attributes=attributes,
+        )
+    except Exception as err:  # pylint: disable=broad-except
+        log_event("list_notes_for_email_error", {"error": str(err)})
+        raise
+    return items, encode_cursor(last_key)
+
+
+def latest_created_at(items: List[Dict[str, Any]], default: Optional[int] = None) -> Optional[int]:
+    """Return the newest created_at (epoch seconds) in items, or default when there are none."""
+    stamps = [int(it["created_at"]) for it in items if it.get("created_at") is not None]
+    return max(stamps, default=default)
+
+
+def delete_note_with_token(
+    note_id: str, token: str, *, now_iso: Optional[str] = None
+) -> Tuple[DeleteOutcome, Optional[Dict[str, Any]]]:
+    """
+    Soft-delete a note if token is its owner_token, in one conditional write.
+
+    Returns (outcome, item); outcome tells not found, already deleted and bad
+    token apart so the handler can answer 404/403 without reading first.
+    """
+    if note_id.startswith(FEED_ID_PREFIX):
+        return DeleteOutcome.NOT_FOUND, None
+    now_iso = now_iso or datetime.now(timezone.utc).isoformat()
+    try:
+        return get_store().delete_with_token(note_id, token, {"status": "deleted", "deleted_at": now_iso})
+    except Exception as err:  # pylint: disable=broad-except
+        log_event("delete_note_with_token_error", {"id": note_id, "error": str(err)})
+        raise
 
 
-def mark_deleted(note_id: str, *, now_iso: Optional[str] = None) -> None:
-    """Soft-delete a note by setting status='deleted' and deleted_at timestamp."""
+def archive_notes_with_report(
+    date_str: str,
+    *,
+    now_iso: Optional[str] = None,
+    max_workers: int = ARCHIVE_MAX_WORKERS,
+) -> ArchiveReport:
+    """
+    Mark all notes for a given date as deleted and set archived_at.
+
+    Returns an ArchiveReport with the archived count, per-page timings and
+    the number of throttle retries.
+    """
     now_iso = now_iso or datetime.now(timezone.utc).isoformat()
+    store = get_store()
     try:
-        TABLE.update_item(
-            Key={"id": note_id},
-            UpdateExpression="SET #s = :deleted, deleted_at = :now",
-            ExpressionAttributeNames={"#s": "status"},
-            ExpressionAttributeValues={":deleted": "deleted", ":now": now_iso},
+        return run_archive(
+            date_str,
+            fetch_page=lambda start_key: store.query_date(
+                date_str, start_key=start_key, attributes=("id", "status")
+            ),
+            archive_one=lambda note_id: store.update_fields(
+                note_id, {"status": "deleted", "archived_at": now_iso}
+            ),
+            max_workers=max_workers,
         )
     except Exception as err:  # pylint: disable=broad-except
-        log_event("mark_deleted_error", {"id": note_id, "error": str(err)})
+        log_event("archive_notes_error", {"date": date_str, "error": str(err)})
         raise
 
 
@@ -155,31 +444,4 @@ def archive_notes_by_date(date_str: str, *, now_iso: Optional[str] = None) -> in
     Returns number of notes archived.
     This is the persistence seam for the archive step handler.
     """
-    now_iso = now_iso or datetime.now(timezone.utc).isoformat()
-    archived = 0
-
-    exclusive_start_key = None
-    while True:
-        query_kwargs = {
-            "IndexName": "gsi_date",
-            "KeyConditionExpression": Key("date").eq(date_str),
-        }
-        if exclusive_start_key:
-            query_kwargs["ExclusiveStartKey"] = exclusive_start_key
-        response = TABLE.query(**query_kwargs)
-        for item in response.get("Items", []):
-            if item.get("status") == "deleted":
-                continue
-            TABLE.update_item(
-                Key={"id": item["id"]},
-                UpdateExpression="SET #s = :deleted, archived_at = :now",
-                ExpressionAttributeNames={"#s": "status"},
-                ExpressionAttributeValues={":deleted": "deleted", ":now": now_iso},
-            )
-            archived += 1
-        exclusive_start_key = response.get("LastEvaluatedKey")
-        if not exclusive_start_key:
-            break
-
-    return archived
-
+    return archive_notes_with_report(date_str, now_iso=now_iso).archived
@@ -0,0 +1,174 @@
+"""
+Materialized daily feed.
+
+One document per date in the notes table, id "feed#<date>", holding the
+public fields of every note of that day in a "notes" map keyed by note id;
+a deleted note is a tombstone {"revision": n, "deleted": true}. It has no
+date/created_at/email attributes, so it never shows up in the GSIs. The note
+lifecycle workflow keeps it current (step_update_daily_feed): each event
+re-reads the note and writes its entry with the note's revision. Executions
+run concurrently, so an entry is only replaced by one of the same or a newer
+revision; an execution that read the note before a later change cannot undo
+that change.
+
+A missing document is rebuilt from the gsi_date query. One that would
+exceed the item size limit is stored as complete=false, and readers fall back
+to the query path for that day.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from notes.db import PUBLIC_ATTRIBUTES, encode_cursor, latest_created_at
+from notes.store import FEED_ID_PREFIX, REVISION_ATTRIBUTE, FeedUpdate, get_store
+from shared.logging import log_event
+
+# Feeds are only read for "today"; a rebuilt feed outlives its day a little for late events.
+FEED_TTL_DAYS = 2
+
+# What a feed entry is built from.
+FEED_ATTRIBUTES = PUBLIC_ATTRIBUTES + (REVISION_ATTRIBUTE,)
+
+
+def feed_id(date_str: str) -> str:
+    return f"{FEED_ID_PREFIX}{date_str}"
+
+
+def is_feed_id(item_id: str) -> bool:
+    return item_id.startswith(FEED_ID_PREFIX)
+
+
+def _feed_entry(item: Dict[str, Any]) -> Dict[str, Any]:
+    revision = int(item.get(REVISION_ATTRIBUTE, 0))
+    if item.get("status") == "deleted":
+        return {REVISION_ATTRIBUTE: revision, "deleted": True}
+    entry = {k: item[k] for k in PUBLIC_ATTRIBUTES if k in item}
+    entry[REVISION_ATTRIBUTE] = revision
+    return entry
+
+
+def _feed_ttl() -> int:
+    return int((datetime.now(timezone.utc) + timedelta(days=FEED_TTL_DAYS)).timestamp())
+
+
+def rebuild_feed(date_str: str, *, now_iso: Optional[str] = None, if_absent: bool = False) -> bool:
+    """
+    Rebuild the feed for date_str from the gsi_date query. Returns whether it is complete.
+
+    With if_absent a feed written meanwhile (by a concurrent rebuild) is kept
+    and counts as complete; the caller applies its entries on top of it.
+    """
+    now_iso = now_iso or datetime.now(timezone.utc).isoformat()
+    store = get_store()
+    notes: Dict[str, Dict[str, Any]] = {}
+    start_key = None
+    while True:
+        items, start_key = store.query_date(date_str, start_key=start_key, attributes=FEED_ATTRIBUTES)
+        for item in items:
+            notes[item["id"]] = _feed_entry(item)
+        if not start_key:
+            break
+
+    document = {
+        "id": feed_id(date_str),
+        "feed_date": date_str,
+        "notes": notes,
+        "complete": True,
+        "version": 1,
+        "rebuilt_at": now_iso,
+        "ttl": _feed_ttl(),
+    }
+    outcome = store.put_feed(document, if_absent=if_absent)
+    if outcome is FeedUpdate.EXISTS:
+        return True
+    if outcome is FeedUpdate.APPLIED:
+        log_event("daily_feed_rebuilt", {"date": date_str, "notes": len(notes)})
+        return True
+    store.put_feed({
+        "id": feed_id(date_str),
+        "feed_date": date_str,
+        "notes": {},
+        "complete": False,
+        "oversized": True,
+        "version": 1,
+        "rebuilt_at": now_iso,
+        "ttl": _feed_ttl(),
+    })
+    log_event("daily_feed_oversized", {"date": date_str, "notes": len(notes)})
+    return False
+
+
+def apply_note_changes(note_ids: Iterable[str]) -> Dict[str, str]:
+    """
+    Bring the feed entries of note_ids in line with the stored notes.
+
+    Notes are read strongly consistent and grouped by date; each feed gets one
+    update, in which entries older than the stored ones are skipped. A missing
+    feed is rebuilt and an oversized one is left to the query path. Returns
+    {date: "applied" | "rebuilt" | "oversized"}.
+    """
+    store = get_store()
+    entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for note_id in dict.fromkeys(note_ids):
+        if not note_id or is_feed_id(note_id):
+            continue
+        item = store.get_item(note_id, consistent=True)
+        if not item or not item.get("date"):
+            continue
+        entries.setdefault(item["date"], {})[note_id] = _feed_entry(item)
+
+    results: Dict[str, str] = {}
+    for date_str in sorted(entries):
+        document = store.get_item(feed_id(date_str))
+        if document and document.get("oversized"):
+            results[date_str] = "oversized"
+            continue
+        result = "applied"
+        outcome = store.update_feed(feed_id(date_str), entries[date_str])
+        if outcome is FeedUpdate.MISSING:
+            if not rebuild_feed(date_str, if_absent=True):
+                results[date_str] = "oversized"
+                continue
+            # The index the rebuild read may trail the notes read above; apply them on top.
+            result = "rebuilt"
+            outcome = store.update_feed(feed_id(date_str), entries[date_str])
+        if outcome is FeedUpdate.APPLIED:
+            results[date_str] = result
+        elif outcome is FeedUpdate.MISSING:
+            results[date_str] = "oversized"  # marked by a concurrent execution
+        else:
+            rebuild_feed(date_str)  # stores the oversized marker
+            results[date_str] = "oversized"
+    return results
+
+
+def read_feed_page(
+    date_str: str, *, limit: int
+) -> Optional[Tuple[List[Dict[str, Any]], Optional[str], Optional[int]]]:
+    """
+    First listing page for date_str from the feed: (items newest first, next_cursor, watermark).
+
+    None when there is no complete feed; the caller falls back to the query.
+    next_cursor continues on the query path, like a cursor from list_notes_for_date.
+    """
+    document = get_store().get_item(feed_id(date_str))
+    if not document or document.get("complete") is not True:
+        return None
+    # Same order as the gsi_date query: created_at, then id, descending.
+    notes = sorted(
+        (
+            {k: entry[k] for k in PUBLIC_ATTRIBUTES if k in entry}
+            for entry in (document.get("notes") or {}).values()
+            if not entry.get("deleted")
+        ),
+        key=lambda n: (int(n.get("created_at", 0)), n.get("id", "")),
+        reverse=True,
+    )
+    page = notes[:limit]
+    next_cursor = None
+    if len(notes) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor({"id": last["id"], "date": date_str, "created_at": int(last["created_at"])})
+    return page, next_cursor, latest_created_at(page)
@@ -0,0 +1,141 @@
+"""
+Multi-day listing engine: one newest-first page across a range of dates.
+
+Every date is its own gsi_date partition. A page starts by querying each open
+partition concurrently (bounded pool) for its share of `limit` notes from its
+saved position, then merges them by (created_at, id), newest first. When a
+partition runs out of fetched notes before the page is full, the merge cannot
+tell what comes next, so that partition (and any other in the same state) is
+queried again for only what the page still needs. Fetched notes the page does
+not take are the only ones read twice; there are at most a share per partition.
+
+A partition's next position is the key of the last note taken from it, or its
+LastEvaluatedKey when everything fetched was taken; it is closed once DynamoDB
+reports no more pages.
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# (items, last_evaluated_key) for one GSI page
+Page = Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# ExclusiveStartKey of an open partition; None before its first page
+Position = Optional[Dict[str, Any]]
+
+# max_workers -> pool; a handful of sizes at most
+_POOLS: Dict[int, ThreadPoolExecutor] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _pool(max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide pool of this size, kept across warm invocations instead of spawning threads per request."""
+    pool = _POOLS.get(max_workers)
+    if pool is None:
+        with _POOL_LOCK:
+            pool = _POOLS.get(max_workers)
+            if pool is None:
+                pool = _POOLS[max_workers] = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="range"
+                )
+    return pool
+
+
+def date_span(date_from: str, date_to: str) -> List[str]:
+    """Inclusive list of YYYY-MM-DD dates from date_to back to date_from (newest first)."""
+    start, end = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    return [(end - timedelta(days=n)).isoformat() for n in range((end - start).days + 1)]
+
+
+def _order_key(item: Dict[str, Any]) -> Tuple[int, str]:
+    return int(item.get("created_at", 0)), item.get("id", "")
+
+
+class _Partition:
+    """Merge state of one date: notes fetched but not yet taken, and where to read next."""
+
+    __slots__ = ("date", "origin", "start", "pending", "more", "last_taken")
+
+    def __init__(self, date_str: str, start: Position) -> None:
+        self.date = date_str
+        self.origin = start
+        self.start = start
+        self.pending: Deque[Dict[str, Any]] = deque()
+        self.more = True
+        self.last_taken: Optional[Dict[str, Any]] = None
+
+    def add(self, page: Page) -> None:
+        items, last_key = page
+        self.pending.extend(items)
+        self.start = last_key
+        self.more = bool(last_key)
+
+    def resume_at(self) -> Position:
+        """Start key of the next page: right after the last note taken, else where this one started."""
+        if not self.pending:
+            return self.start
+        if self.last_taken is None:
+            return self.origin
+        return {"id": self.last_taken["id"], "date": self.date, "created_at": self.last_taken["created_at"]}
+
+
+def _fetch(
+    wanted: Dict[str, int],
+    partitions: Dict[str, _Partition],
+    fetch_page: Callable[[str, Position, int], Page],
+    max_workers: int,
+) -> None:
+    """Query each wanted partition for its count, concurrently when there is more than one."""
+    dates = list(wanted)
+    if len(wanted) == 1:
+        pages = [fetch_page(d, partitions[d].start, wanted[d]) for d in dates]
+    else:
+        pages = list(_pool(max_workers).map(lambda d: fetch_page(d, partitions[d].start, wanted[d]), dates))
+    for d, page in zip(dates, pages):
+        partitions[d].add(page)
+
+
+def _share(need: int, ways: int) -> int:
+    return max(1, -(-need // ways))
+
+
+def fetch_range_page(
+    positions: Dict[str, Position],
+    *,
+    limit: int,
+    fetch_page: Callable[[str, Position, int], Page],
+    max_workers: int,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Position]]:
+    """
+    Read one merged page from the open partitions in positions ({date: start key}).
+
+    fetch_page(date, start_key, limit) returns one newest-first partition page.
+    Returns (items, positions of the partitions still open afterwards).
+    """
+    if not positions:
+        return [], {}
+    partitions = {d: _Partition(d, start) for d, start in positions.items()}
+    page: List[Dict[str, Any]] = []
+    wanted = dict.fromkeys(partitions, _share(limit, len(partitions)))
+    while wanted:
+        _fetch(wanted, partitions, fetch_page, max_workers)
+        wanted = {}
+        while len(page) < limit:
+            starved = [d for d, p in partitions.items() if not p.pending and p.more]
+            if starved:
+                # Its next note may be the newest; read what the page still needs, split across them.
+                wanted = dict.fromkeys(starved, _share(limit - len(page), len(starved)))
+                break
+            ready = [p for p in partitions.values() if p.pending]
+            if not ready:
+                break
+            newest = max(ready, key=lambda p: _order_key(p.pending[0]))
+            newest.last_taken = newest.pending.popleft()
+            page.append(newest.last_taken)
+
+    remaining = {d: p.resume_at() for d, p in partitions.items() if p.pending or p.more}
+    return page, remaining
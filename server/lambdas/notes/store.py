@@ -0,0 +1,800 @@
+"""
+Storage backends for notes.
+
+NotesStore is the persistence seam used by notes.db. Two implementations:
+- DynamoNotesStore: the gratitude_notes table (production)
+- InMemoryNotesStore: a thread-safe emulation of the same table for tests,
+  local runs and benchmarks. It mirrors the behaviour the code relies on:
+  the gsi_date/gsi_email_date indexes, attribute_not_exists(id) on put,
+  Limit/1 MB pagination with LastEvaluatedKey, Decimal numbers and TTL expiry.
+
+The backend is chosen by STORE_BACKEND in shared.config.
+"""
+from __future__ import annotations
+
+import bisect
+import enum
+import threading
+import time
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from botocore.exceptions import ClientError
+from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
+
+from shared.config import STORE_BACKEND, notes_table
+
+# (items, last_evaluated_key)
+QueryPage = Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# DynamoDB stops a Query page at 1 MB of items read, before any projection.
+MAX_PAGE_BYTES = 1024 * 1024
+
+# DynamoDB rejects items larger than 400 KB.
+MAX_ITEM_BYTES = 400 * 1024
+
+# DynamoDB accepts at most 25 put/delete requests per BatchWriteItem call.
+BATCH_WRITE_MAX_ITEMS = 25
+
+# Ids of the materialized daily feed documents that share the table (notes.feed).
+FEED_ID_PREFIX = "feed#"
+
+# Every write to a note adds 1 to this attribute (new notes start at 1), so
+# copies of a note elsewhere (the daily feed) can tell which one is newer.
+REVISION_ATTRIBUTE = "revision"
+
+
+class NoteAlreadyExistsError(Exception):
+    """Raised when attempting to create a note that already exists."""
+
+
+class UpdateOutcome(enum.Enum):
+    """Result of NotesStore.update_active."""
+
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    NOT_FOUND = "not_found"
+    DELETED = "deleted"
+
+
+class FeedUpdate(enum.Enum):
+    """Result of NotesStore.put_feed/update_feed."""
+
+    APPLIED = "applied"
+    MISSING = "missing"
+    EXISTS = "exists"
+    TOO_LARGE = "too_large"
+
+
+class DeleteOutcome(enum.Enum):
+    """Result of NotesStore.delete_with_token."""
+
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+    ALREADY_DELETED = "already_deleted"
+    BAD_TOKEN = "bad_token"
+
+
+class NotesStore(ABC):
+    """Persistence operations for note items (plain dicts, numbers as Decimal)."""
+
+    @abstractmethod
+    def put_item(self, item: Dict[str, Any]) -> None:
+        """Insert item; raises NoteAlreadyExistsError if its id exists."""
+
+    @abstractmethod
+    def batch_put(self, items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write up to BATCH_WRITE_MAX_ITEMS new items in one BatchWriteItem call.
+
+        Batch puts are unconditional, so ids must be fresh. Returns the items
+        DynamoDB left unprocessed (throttling); the caller retries those.
+        """
+
+    @abstractmethod
+    def get_item(self, note_id: str, *, consistent: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the item with this id, or None (consistent: a strongly consistent read)."""
+
+    @abstractmethod
+    def update_fields(self, note_id: str, values: Dict[str, Any]) -> None:
+        """
+        SET the given attributes on the item and bump its revision
+        (creating it if missing, like UpdateItem).
+        """
+
+    @abstractmethod
+    def update_active(
+        self,
+        note_id: str,
+        values: Dict[str, Any],
+        *,
+        unless_equal: Sequence[str] = (),
+    ) -> Tuple[UpdateOutcome, Optional[Dict[str, Any]]]:
+        """
+        SET values on an existing, non-deleted item and bump its revision in
+        one conditional write.
+
+        When every attribute named in unless_equal already holds its new value
+        nothing is written and the stored item comes back as UNCHANGED.
+        Returns (outcome, item): the item after the write for UPDATED, as
+        stored for UNCHANGED/DELETED, None for NOT_FOUND.
+        """
+
+    @abstractmethod
+    def delete_with_token(
+        self,
+        note_id: str,
+        owner_token: str,
+        values: Dict[str, Any],
+    ) -> Tuple[DeleteOutcome, Optional[Dict[str, Any]]]:
+        """
+        Soft-delete in one conditional write: SET values (status=deleted, ...)
+        and bump the revision only if the item exists, is not deleted and
+        owner_token matches.
+
+        Returns (outcome, item): the item after the write for DELETED, as
+        stored for ALREADY_DELETED/BAD_TOKEN, None for NOT_FOUND.
+        """
+
+    @abstractmethod
+    def put_feed(self, item: Dict[str, Any], *, if_absent: bool = False) -> FeedUpdate:
+        """
+        Write a daily feed document (see notes.feed).
+
+        APPLIED, or TOO_LARGE (nothing written) when the item exceeds the item
+        size limit. With if_absent an existing document is left alone: EXISTS.
+        """
+
+    @abstractmethod
+    def update_feed(self, feed_id: str, entries: Dict[str, Dict[str, Any]]) -> FeedUpdate:
+        """
+        Write entries into a complete feed document's notes map and bump its version.
+
+        Every entry carries the revision of its note and replaces the stored
+        entry only if that one is not newer, so a stale write never undoes a
+        later change; APPLIED also when some or all entries were stale.
+        MISSING when the document does not exist or is not complete; TOO_LARGE
+        when the result would exceed the item size limit (nothing is written).
+        """
+
+    @abstractmethod
+    def query_date(
+        self,
+        date_str: str,
+        *,
+        limit: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        since: Optional[int] = None,
+        newest_first: bool = False,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> QueryPage:
+        """Read one gsi_date page for date_str, optionally only created_at > since."""
+
+    @abstractmethod
+    def query_email(
+        self,
+        email: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        newest_first: bool = False,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> QueryPage:
+        """Read one gsi_email_date page for email, optionally bounded by inclusive dates."""
+
+
+def _projection(attributes: Sequence[str]) -> Dict[str, Any]:
+    """Build ProjectionExpression kwargs, aliasing every name (several are reserved words)."""
+    names = {f"#p{i}": attr for i, attr in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+
+
+class DynamoNotesStore(NotesStore):
+    def __init__(self, table_factory: Callable[[], Any] = notes_table) -> None:
+        self._table = table_factory
+
+    def put_item(self, item: Dict[str, Any]) -> None:
+        try:
+            self._table().put_item(
+                Item=item,
+                ConditionExpression="attribute_not_exists(id)",
+            )
+        except ClientError as err:
+            if err.response["Error"].get("Code") == "ConditionalCheckFailedException":
+                raise NoteAlreadyExistsError(item["id"]) from err
+            raise
+
+    def batch_put(self, items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not items:
+            return []
+        table = self._table()
+        response = table.meta.client.batch_write_item(
+            RequestItems={table.name: [{"PutRequest": {"Item": item}} for item in items]}
+        )
+        unprocessed = response.get("UnprocessedItems", {}).get(table.name, [])
+        return [request["PutRequest"]["Item"] for request in unprocessed]
+
+    def get_item(self, note_id: str, *, consistent: bool = False) -> Optional[Dict[str, Any]]:
+        return self._table().get_item(Key={"id": note_id}, ConsistentRead=consistent).get("Item")
+
+    def update_fields(self, note_id: str, values: Dict[str, Any]) -> None:
+        names = {f"#f{i}": name for i, name in enumerate(values)}
+        attr_values = {f":v{i}": value for i, value in enumerate(values.values())}
+        names["#rev"] = REVISION_ATTRIBUTE
+        attr_values[":one"] = 1
+        table = self._table()
+        # The low-level client is thread-safe; the Table resource is not.
+        table.meta.client.update_item(
+            TableName=table.name,
+            Key={"id": note_id},
+            UpdateExpression=_set_and_bump(len(values)),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=attr_values,
+        )
+
+    def update_active(
+        self,
+        note_id: str,
+        values: Dict[str, Any],
+        *,
+        unless_equal: Sequence[str] = (),
+    ) -> Tuple[UpdateOutcome, Optional[Dict[str, Any]]]:
+        names = {f"#f{i}": name for i, name in enumerate(values)}
+        aliases = {name: alias for alias, name in names.items()}
+        names.update({"#status": "status", "#rev": REVISION_ATTRIBUTE})
+        attr_values = {f":v{i}": value for i, value in enumerate(values.values())}
+        attr_values.update({":deleted": "deleted", ":one": 1})
+        condition = "attribute_exists(id) AND #status <> :deleted"
+        if unless_equal:
+            placeholders = {name: f":v{i}" for i, name in enumerate(values)}
+            changed = " OR ".join(
+                f"attribute_not_exists({aliases[name]}) OR {aliases[name]} <> {placeholders[name]}"
+                for name in unless_equal
+            )
+            condition += f" AND ({changed})"
+        table = self._table()
+        try:
+            res = table.meta.client.update_item(
+                TableName=table.name,
+                Key={"id": note_id},
+                UpdateExpression=_set_and_bump(len(values)),
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=attr_values,
+                ReturnValues="ALL_NEW",
+                ReturnValuesOnConditionCheckFailure="ALL_OLD",
+            )
+        except ClientError as err:
+            if err.response["Error"].get("Code") != "ConditionalCheckFailedException":
+                raise
+            old = _old_item(err)
+            return _failed_outcome(old), old
+        return UpdateOutcome.UPDATED, res.get("Attributes")
+
+    def delete_with_token(
+        self,
+        note_id: str,
+        owner_token: str,
+        values: Dict[str, Any],
+    ) -> Tuple[DeleteOutcome, Optional[Dict[str, Any]]]:
+        names = {f"#f{i}": name for i, name in enumerate(values)}
+        names.update({"#status": "status", "#token": "owner_token", "#rev": REVISION_ATTRIBUTE})
+        attr_values = {f":v{i}": value for i, value in enumerate(values.values())}
+        attr_values.update({":deleted": "deleted", ":token": owner_token, ":one": 1})
+        table = self._table()
+        try:
+            res = table.meta.client.update_item(
+                TableName=table.name,
+                Key={"id": note_id},
+                UpdateExpression=_set_and_bump(len(values)),
+                ConditionExpression="attribute_exists(id) AND #status <> :deleted AND #token = :token",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=attr_values,
+                ReturnValues="ALL_NEW",
+                ReturnValuesOnConditionCheckFailure="ALL_OLD",
+            )
+        except ClientError as err:
+            if err.response["Error"].get("Code") != "ConditionalCheckFailedException":
+                raise
+            old = _old_item(err)
+            return _failed_delete_outcome(old), old
+        return DeleteOutcome.DELETED, res.get("Attributes")
+
+    def put_feed(self, item: Dict[str, Any], *, if_absent: bool = False) -> FeedUpdate:
+        condition = {"ConditionExpression": "attribute_not_exists(id)"} if if_absent else {}
+        try:
+            self._table().put_item(Item=item, **condition)
+        except ClientError as err:
+            if err.response["Error"].get("Code") == "ConditionalCheckFailedException":
+                return FeedUpdate.EXISTS
+            if _is_item_too_large(err):
+                return FeedUpdate.TOO_LARGE
+            raise
+        return FeedUpdate.APPLIED
+
+    def update_feed(self, feed_id: str, entries: Dict[str, Dict[str, Any]]) -> FeedUpdate:
+        table = self._table()
+        while entries:
+            names: Dict[str, str] = {
+                "#notes": "notes", "#complete": "complete", "#version": "version", "#rev": REVISION_ATTRIBUTE,
+            }
+            values: Dict[str, Any] = {":true": True, ":one": 1}
+            sets, guards = [], []
+            for i, (note_id, entry) in enumerate(entries.items()):
+                names[f"#e{i}"] = note_id
+                values[f":e{i}"] = entry
+                values[f":r{i}"] = entry[REVISION_ATTRIBUTE]
+                sets.append(f"#notes.#e{i} = :e{i}")
+                guards.append(f"(attribute_not_exists(#notes.#e{i}.#rev) OR #notes.#e{i}.#rev <= :r{i})")
+            try:
+                table.meta.client.update_item(
+                    TableName=table.name,
+                    Key={"id": feed_id},
+                    UpdateExpression="SET " + ", ".join(sets) + " ADD #version :one",
+                    ConditionExpression=" AND ".join(["attribute_exists(id)", "#complete = :true", *guards]),
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values,
+                    ReturnValuesOnConditionCheckFailure="ALL_OLD",
+                )
+            except ClientError as err:
+                if _is_item_too_large(err):
+                    return FeedUpdate.TOO_LARGE
+                if err.response["Error"].get("Code") != "ConditionalCheckFailedException":
+                    raise
+                old = _old_item(err)
+                if old is None or old.get("complete") is not True:
+                    return FeedUpdate.MISSING
+                # Some stored entries are newer: drop ours for those and write the rest.
+                entries = _not_older(entries, old.get("notes") or {})
+                continue
+            break
+        return FeedUpdate.APPLIED
+
+    def query_date(
+        self,
+        date_str: str,
+        *,
+        limit: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        since: Optional[int] = None,
+        newest_first: bool = False,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> QueryPage:
+        key_condition = Key("date").eq(date_str)
+        if since is not None:
+            key_condition = key_condition & Key("created_at").gt(since)
+        query_kwargs: Dict[str, Any] = {
+            "IndexName": "gsi_date",
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": not newest_first,
+        }
+        return self._query(query_kwargs, limit=limit, start_key=start_key, attributes=attributes)
+
+    def query_email(
+        self,
+        email: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        newest_first: bool = False,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> QueryPage:
+        key_condition = Key("email").eq(email)
+        if date_from and date_to:
+            key_condition = key_condition & Key("date").between(date_from, date_to)
+        elif date_from:
+            key_condition = key_condition & Key("date").gte(date_from)
+        elif date_to:
+            key_condition = key_condition & Key("date").lte(date_to)
+        query_kwargs: Dict[str, Any] = {
+            "IndexName": "gsi_email_date",
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": not newest_first,
+        }
+        return self._query(query_kwargs, limit=limit, start_key=start_key, attributes=attributes)
+
+    def _query(
+        self,
+        query_kwargs: Dict[str, Any],
+        *,
+        limit: Optional[int],
+        start_key: Optional[Dict[str, Any]],
+        attributes: Optional[Sequence[str]],
+    ) -> QueryPage:
+        if attributes:
+            query_kwargs.update(_projection(attributes))
+        if limit:
+            query_kwargs["Limit"] = limit
+        if start_key:
+            query_kwargs["ExclusiveStartKey"] = start_key
+        table = self._table()
+        # notes.range queries partitions from a shared pool; the client is thread-safe, the Table is not.
+        res = table.meta.client.query(TableName=table.name, **query_kwargs)
+        return res.get("Items", []), res.get("LastEvaluatedKey")
+
+
+_DESERIALIZER = TypeDeserializer()
+
+
+def _set_and_bump(count: int) -> str:
+    """UpdateExpression that SETs #f0..#f{count-1} to :v0.. and adds :one to the revision."""
+    return "SET " + ", ".join(f"#f{i} = :v{i}" for i in range(count)) + " ADD #rev :one"
+
+
+def _revision(item: Optional[Dict[str, Any]]) -> Decimal:
+    return Decimal((item or {}).get(REVISION_ATTRIBUTE, 0))
+
+
+def _bumped(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {**item, REVISION_ATTRIBUTE: _revision(item) + 1}
+
+
+def _not_older(entries: Dict[str, Dict[str, Any]], stored: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """The feed entries whose stored counterpart (if any) has no newer revision."""
+    return {
+        note_id: entry
+        for note_id, entry in entries.items()
+        if note_id not in stored or _revision(stored[note_id]) <= _revision(entry)
+    }
+
+
+def _is_item_too_large(err: ClientError) -> bool:
+    error = err.response["Error"]
+    return error.get("Code") == "ValidationException" and "size" in error.get("Message", "").lower()
+
+
+def _old_item(err: ClientError) -> Optional[Dict[str, Any]]:
+    """The ALL_OLD item of a failed condition (error responses bypass the resource's type transformation)."""
+    raw = err.response.get("Item")
+    return {k: _DESERIALIZER.deserialize(v) for k, v in raw.items()} if raw else None
+
+
+def _failed_delete_outcome(old: Optional[Dict[str, Any]]) -> DeleteOutcome:
+    """Classify a failed delete_with_token condition from the item as stored."""
+    if old is None:
+        return DeleteOutcome.NOT_FOUND
+    if old.get("status") == "deleted":
+        return DeleteOutcome.ALREADY_DELETED
+    return DeleteOutcome.BAD_TOKEN
+
+
+def _failed_outcome(old: Optional[Dict[str, Any]]) -> UpdateOutcome:
+    """Classify a failed update_active condition from the item as stored."""
+    if old is None:
+        return UpdateOutcome.NOT_FOUND
+    if old.get("status") == "deleted":
+        return UpdateOutcome.DELETED
+    return UpdateOutcome.UNCHANGED
+
+
+def _to_dynamo(value: Any) -> Any:
+    """Normalize a value the way boto3's serializer round-trips it."""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, bytes, Decimal)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, dict):
+        return {k: _to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_dynamo(v) for v in value]
+    if isinstance(value, set):
+        return {_to_dynamo(v) for v in value}
+    raise TypeError(f"Unsupported type {type(value).__name__}")
+
+
+def _value_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, Decimal):
+        return 21
+    if isinstance(value, dict):
+        return 3 + _item_size(value)
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(1 + _value_size(v) for v in value)
+    return len(repr(value))
+
+
+def _item_size(item: Dict[str, Any]) -> int:
+    """Approximate DynamoDB item size: attribute names plus values (maps and lists nested)."""
+    return sum(len(name) + _value_size(value) for name, value in item.items())
+
+
+class InMemoryNotesStore(NotesStore):
+    """
+    Thread-safe in-memory emulation of the gratitude_notes table.
+
+    Expired items (ttl in the past) are removed by sweep_expired(), which put
+    and update run at most once per ttl_sweep_seconds; like DynamoDB TTL,
+    expiry is eventual rather than exact.
+    """
+
+    def __init__(
+        self,
+        *,
+        clock: Callable[[], float] = time.time,
+        max_page_bytes: int = MAX_PAGE_BYTES,
+        ttl_sweep_seconds: float = 60.0,
+    ) -> None:
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._sizes: Dict[str, int] = {}
+        # Index partitions hold sorted (sort_key, id) tuples.
+        self._by_date: Dict[str, List[Tuple[Decimal, str]]] = {}
+        self._by_email: Dict[str, List[Tuple[str, str]]] = {}
+        self._lock = threading.RLock()
+        self._clock = clock
+        self._max_page_bytes = max_page_bytes
+        self._ttl_sweep_seconds = ttl_sweep_seconds
+        self._last_sweep = clock()
+
+    # --- index maintenance ---
+
+    @staticmethod
+    def _date_entry(item: Dict[str, Any]) -> Optional[Tuple[Decimal, str]]:
+        if isinstance(item.get("date"), str) and isinstance(item.get("created_at"), Decimal):
+            return item["created_at"], item["id"]
+        return None
+
+    @staticmethod
+    def _email_entry(item: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        if isinstance(item.get("email"), str) and isinstance(item.get("date"), str):
+            return item["date"], item["id"]
+        return None
+
+    def _unindex(self, item: Dict[str, Any]) -> None:
+        entry = self._date_entry(item)
+        if entry:
+            partition = self._by_date[item["date"]]
+            partition.pop(bisect.bisect_left(partition, entry))
+        entry = self._email_entry(item)
+        if entry:
+            partition = self._by_email[item["email"]]
+            partition.pop(bisect.bisect_left(partition, entry))
+
+    def _index(self, item: Dict[str, Any]) -> None:
+        entry = self._date_entry(item)
+        if entry:
+            bisect.insort(self._by_date.setdefault(item["date"], []), entry)
+        entry = self._email_entry(item)
+        if entry:
+            bisect.insort(self._by_email.setdefault(item["email"], []), entry)
+
+    def _store(self, item: Dict[str, Any]) -> None:
+        previous = self._items.get(item["id"])
+        if previous is not None:
+            self._unindex(previous)
+        self._items[item["id"]] = item
+        self._sizes[item["id"]] = _item_size(item)
+        self._index(item)
+
+    def _delete(self, note_id: str) -> None:
+        item = self._items.pop(note_id)
+        self._sizes.pop(note_id, None)
+        self._unindex(item)
+
+    def _maybe_sweep(self) -> None:
+        if self._clock() - self._last_sweep >= self._ttl_sweep_seconds:
+            self.sweep_expired()
+
+    def sweep_expired(self) -> int:
+        """Delete items whose ttl has passed. Returns the number removed."""
+        with self._lock:
+            now = self._clock()
+            self._last_sweep = now
+            expired = [
+                note_id
+                for note_id, item in self._items.items()
+                if isinstance(item.get("ttl"), Decimal) and item["ttl"] < now
+            ]
+            for note_id in expired:
+                self._delete(note_id)
+            return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # --- NotesStore ---
+
+    def put_item(self, item: Dict[str, Any]) -> None:
+        stored = _to_dynamo(item)
+        with self._lock:
+            self._maybe_sweep()
+            if stored["id"] in self._items:
+                raise NoteAlreadyExistsError(stored["id"])
+            self._store(stored)
+
+    def batch_put(self, items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if len(items) > BATCH_WRITE_MAX_ITEMS:
+            raise ValueError(f"BatchWriteItem accepts at most {BATCH_WRITE_MAX_ITEMS} items")
+        stored = [_to_dynamo(item) for item in items]
+        with self._lock:
+            self._maybe_sweep()
+            for item in stored:
+                self._store(item)
+        return []
+
+    def get_item(self, note_id: str, *, consistent: bool = False) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(note_id)
+            return dict(item) if item is not None else None
+
+    def update_fields(self, note_id: str, values: Dict[str, Any]) -> None:
+        with self._lock:
+            self._maybe_sweep()
+            current = self._items.get(note_id, {"id": note_id})
+            self._store(_bumped({**current, **_to_dynamo(values)}))
+
+    def update_active(
+        self,
+        note_id: str,
+        values: Dict[str, Any],
+        *,
+        unless_equal: Sequence[str] = (),
+    ) -> Tuple[UpdateOutcome, Optional[Dict[str, Any]]]:
+        stored = _to_dynamo(values)
+        with self._lock:
+            self._maybe_sweep()
+            current = self._items.get(note_id)
+            if current is None:
+                return UpdateOutcome.NOT_FOUND, None
+            if current.get("status") == "deleted":
+                return UpdateOutcome.DELETED, dict(current)
+            if unless_equal and all(name in current and current[name] == stored[name] for name in unless_equal):
+                return UpdateOutcome.UNCHANGED, dict(current)
+            updated = _bumped({**current, **stored})
+            self._store(updated)
+            return UpdateOutcome.UPDATED, dict(updated)
+
+    def delete_with_token(
+        self,
+        note_id: str,
+        owner_token: str,
+        values: Dict[str, Any],
+    ) -> Tuple[DeleteOutcome, Optional[Dict[str, Any]]]:
+        stored = _to_dynamo(values)
+        with self._lock:
+            self._maybe_sweep()
+            current = self._items.get(note_id)
+            if current is None or current.get("status") == "deleted" or current.get("owner_token") != owner_token:
+                old = dict(current) if current is not None else None
+                return _failed_delete_outcome(old), old
+            updated = _bumped({**current, **stored})
+            self._store(updated)
+            return DeleteOutcome.DELETED, dict(updated)
+
+    def put_feed(self, item: Dict[str, Any], *, if_absent: bool = False) -> FeedUpdate:
+        stored = _to_dynamo(item)
+        if _item_size(stored) > MAX_ITEM_BYTES:
+            return FeedUpdate.TOO_LARGE
+        with self._lock:
+            if if_absent and stored["id"] in self._items:
+                return FeedUpdate.EXISTS
+            self._store(stored)
+        return FeedUpdate.APPLIED
+
+    def update_feed(self, feed_id: str, entries: Dict[str, Dict[str, Any]]) -> FeedUpdate:
+        with self._lock:
+            current = self._items.get(feed_id)
+            if current is None or current.get("complete") is not True:
+                return FeedUpdate.MISSING
+            fresh = _not_older(_to_dynamo(entries), current.get("notes", {}))
+            if not fresh:
+                return FeedUpdate.APPLIED
+            notes = {**current.get("notes", {}), **fresh}
+            updated = {**current, "notes": notes, "version": current.get("version", Decimal(0)) + 1}
+            if _item_size(updated) > MAX_ITEM_BYTES:
+                return FeedUpdate.TOO_LARGE
+            self._store(updated)
+            return FeedUpdate.APPLIED
+
+    def query_date(
+        self,
+        date_str: str,
+        *,
+        limit: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        since: Optional[int] = None,
+        newest_first: bool = False,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> QueryPage:
+        with self._lock:
+            partition = self._by_date.get(date_str, [])
+            lo, hi = 0, len(partition)
+            if since is not None:
+                lo = bisect.bisect_right(partition, (Decimal(since), "\uffff"))
+            if start_key:
+                position = (Decimal(start_key["created_at"]), start_key["id"])
+                if newest_first:
+                    hi = min(hi, bisect.bisect_left(partition, position))
+                else:
+                    lo = max(lo, bisect.bisect_right(partition, position))
+            order = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+            return self._page(
+                (partition[i][1] for i in order), limit, attributes, ("id", "date", "created_at")
+            )
+
+    def query_email(
+        self,
+        email: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: Optional[int] = None,
+        start_key: Optional[Dict[str, Any]] = None,
+        newest_first: bool = False,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> QueryPage:
+        with self._lock:
+            partition = self._by_email.get(email, [])
+            lo, hi = 0, len(partition)
+            if date_from:
+                lo = bisect.bisect_left(partition, (date_from, ""))
+            if date_to:
+                hi = bisect.bisect_right(partition, (date_to, "\uffff"))
+            if start_key:
+                position = (start_key["date"], start_key["id"])
+                if newest_first:
+                    hi = min(hi, bisect.bisect_left(partition, position))
+                else:
+                    lo = max(lo, bisect.bisect_right(partition, position))
+            order = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+            return self._page(
+                (partition[i][1] for i in order), limit, attributes, ("id", "email", "date")
+            )
+
+    def _page(
+        self,
+        note_ids: Iterator[str],
+        limit: Optional[int],
+        attributes: Optional[Sequence[str]],
+        key_attributes: Tuple[str, ...],
+    ) -> QueryPage:
+        """Collect one page; like DynamoDB, a page cut by Limit or size carries a LastEvaluatedKey."""
+        items: List[Dict[str, Any]] = []
+        read_bytes = 0
+        last: Optional[Dict[str, Any]] = None
+        for note_id in note_ids:
+            item = self._items[note_id]
+            read_bytes += self._sizes[note_id]
+            items.append({k: item[k] for k in attributes if k in item} if attributes else dict(item))
+            last = item
+            if (limit and len(items) >= limit) or read_bytes >= self._max_page_bytes:
+                return items, {k: last[k] for k in key_attributes}
+        return items, None
+
+
+_STORE: Optional[NotesStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> NotesStore:
+    """Return the process-wide store for STORE_BACKEND ("dynamodb" or "memory")."""
+    global _STORE  # pylint: disable=global-statement
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                if STORE_BACKEND == "memory":
+                    _STORE = InMemoryNotesStore()
+                elif STORE_BACKEND == "dynamodb":
+                    _STORE = DynamoNotesStore()
+                else:
+                    raise ValueError(f"Unsupported STORE_BACKEND: {STORE_BACKEND}")
+    return _STORE
+
+
+def set_store(store: Optional[NotesStore]) -> None:
+    """Install a store (tests, benchmarks); None resets to the configured backend."""
+    global _STORE  # pylint: disable=global-statement
+    _STORE = store
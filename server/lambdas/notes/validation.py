@@ -0,0 +1,23 @@
+"""
+Input checks for note writes, shared by the single and bulk POST handlers.
+"""
+import re
+from typing import Any, Dict, Optional, Tuple
+
+# Basic email format check (simple regex)
+_EMAIL_RE = re.compile(r"^[^@]+@[^@]+\.[^@]+$")
+
+
+def normalize_note_input(body: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Validate one request note. Returns (normalized fields, "") or (None, error message)."""
+    if not isinstance(body, dict):
+        return None, "Each note must be a JSON object."
+    name = str(body.get("name") or "").strip()
+    email = str(body.get("email") or "").strip().lower()
+    gratitude_text = str(body.get("gratitudeText") or "").strip()
+
+    if not name or not email or not gratitude_text:
+        return None, "Name, email, and gratitude text are required."
+    if not _EMAIL_RE.match(email):
+        return None, "Invalid email format."
+    return {"name": name, "email": email, "gratitude_text": gratitude_text}, ""
@@ -5,5 +5,10 @@ Modules:
 - config: Environment variables and AWS client factories
 - api_gateway: JSON response helpers and request parsing
 - logging: Structured logging with PII redaction
+- codec: JSON encoding/decoding (orjson when available, Decimal-aware)
 - email: SES email sending utilities
+- cache: Warm-container TTL/LRU cache for read responses
+- event_bus: Buffered, batched EventBridge publisher
+- invocation: End-of-invocation hooks for buffered work
+- metrics: Per-invocation CloudWatch metrics (EMF log records or PutMetricData)
 """
@@ -0,0 +1,283 @@
+"""
+Admission control for the write handlers.
+
+Each request is checked per scope (source IP, email) before any expensive
+work runs, in two stages:
+
+1. In-container: a token bucket per key (capacity = limit, refilled at
+   limit per window) and a cache of keys already rejected for the current
+   window. Bursts and clients retrying after a rejection are turned away
+   here without a DynamoDB call.
+2. Shared: an atomic per-window counter in the control table, so the limit
+   holds across containers. A container reserves ADMISSION_LEASE_TOKENS of
+   the window's limit at a time (one conditional UpdateItem ADD) and admits
+   from that lease locally; only every lease-th request of a key touches
+   the table. Near the limit the lease shrinks to a single token. Tokens a
+   container leased but did not use lapse with the window, so a key spread
+   over many containers may get somewhat less than its limit, never more.
+
+A request that writes several notes (the bulk endpoint) costs one token per
+note, in the IP scope and in the scope of each email it writes for. When one
+scope rejects it, the tokens already taken from the others are handed back to
+their buckets and leases, so a rejected request has spent nothing.
+
+Keys are hashed, so no email or IP reaches the table. Errors from the
+counter store admit the request (fail open): an outage of the limiter must
+not take the write path down with it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from shared.config import (
+    ADMISSION_CACHE_MAX_ENTRIES,
+    ADMISSION_EMAIL_LIMIT,
+    ADMISSION_ENABLED,
+    ADMISSION_IP_LIMIT,
+    ADMISSION_LEASE_TOKENS,
+    ADMISSION_WINDOW_SECONDS,
+    STORE_BACKEND,
+    control_table,
+)
+from shared.logging import log_event
+
+# Counter items outlive their window a little so a late increment still finds them.
+COUNTER_TTL_GRACE_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class Rule:
+    limit: int
+    window_seconds: int
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    retry_after: int = 0
+    scope: Optional[str] = None
+
+
+ADMIT = Decision(True)
+# Admitted without the shared counter (its store failed): nothing to give back on a refund.
+_UNCOUNTED = Decision(True)
+
+
+class WindowCounters(ABC):
+    """Per-window request counters shared by all containers."""
+
+    @abstractmethod
+    def reserve(self, key: str, amount: int, limit: int, expires_at: int, *, minimum: int = 1) -> int:
+        """
+        Count amount requests for key if that stays within limit, else minimum.
+
+        Returns how many were counted: amount, minimum, or 0 when neither fits.
+        """
+
+
+class DynamoWindowCounters(WindowCounters):
+    def __init__(self, table_factory: Callable[[], Any] = control_table) -> None:
+        self._table = table_factory
+
+    def reserve(self, key: str, amount: int, limit: int, expires_at: int, *, minimum: int = 1) -> int:
+        for count in (amount, minimum) if amount > minimum else (minimum,):
+            try:
+                self._table().update_item(
+                    Key={"id": key},
+                    UpdateExpression="ADD #n :n SET #ttl = if_not_exists(#ttl, :ttl)",
+                    ConditionExpression="attribute_not_exists(#n) OR #n <= :room",
+                    ExpressionAttributeNames={"#n": "count", "#ttl": "ttl"},
+                    ExpressionAttributeValues={":n": count, ":room": limit - count, ":ttl": expires_at},
+                )
+            except ClientError as err:
+                if err.response["Error"].get("Code") == "ConditionalCheckFailedException":
+                    continue
+                raise
+            return count
+        return 0
+
+
+class InMemoryWindowCounters(WindowCounters):
+    """Single-process counters for tests, local runs and benchmarks."""
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, amount: int, limit: int, expires_at: int, *, minimum: int = 1) -> int:
+        with self._lock:
+            count = self._counts.get(key, 0)
+            for granted in (amount, minimum):
+                if count + granted <= limit:
+                    self._counts[key] = count + granted
+                    return granted
+            return 0
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        rules: Dict[str, Rule],
+        *,
+        counters: WindowCounters,
+        max_entries: int = ADMISSION_CACHE_MAX_ENTRIES,
+        lease_tokens: int = ADMISSION_LEASE_TOKENS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.rules = rules
+        self.counters = counters
+        self.max_entries = max_entries
+        self.lease_tokens = max(1, lease_tokens)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (scope, digest) -> (tokens, updated_at)
+        self._buckets: "OrderedDict[Tuple[str, str], Tuple[float, float]]" = OrderedDict()
+        # (scope, digest) -> rejected until (end of the counter window)
+        self._denied: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        # (scope, digest) -> (window start, shared-counter tokens leased and not yet used)
+        self._leases: "OrderedDict[Tuple[str, str], Tuple[int, int]]" = OrderedDict()
+
+    def check(self, **keys: Optional[str]) -> Decision:
+        """Admit or reject one request identified per scope, e.g. check(ip=..., email=...)."""
+        return self.charge((scope, value, 1) for scope, value in keys.items())
+
+    def charge(self, charges: Iterable[Tuple[str, Optional[str], int]]) -> Decision:
+        """
+        Admit or reject one request that costs `cost` tokens of each (scope, value, cost) it names.
+
+        All or nothing: a rejection refunds what the earlier scopes had taken.
+        """
+        now = self._clock()
+        taken = []
+        for scope, value, cost in charges:
+            rule = self.rules.get(scope)
+            if not value or rule is None or rule.limit <= 0 or cost <= 0:
+                continue
+            local_key = (scope, _digest(value))
+            decision = self._check_one(scope, local_key[1], rule, now, cost)
+            if not decision.allowed:
+                log_event("admission_rejected", {"scope": scope, "cost": cost, "retry_after": decision.retry_after})
+                self._refund(taken, now)
+                return decision
+            taken.append((local_key, rule, cost, decision is not _UNCOUNTED))
+        return ADMIT
+
+    def _refund(self, taken: Iterable[Tuple[Tuple[str, str], Rule, int, bool]], now: float) -> None:
+        """Give back the bucket tokens, and the leased counter tokens, of scopes a rejected request had passed."""
+        with self._lock:
+            for local_key, rule, cost, counted in taken:
+                tokens, updated = self._buckets.get(local_key, (float(rule.limit), now))
+                self._remember(self._buckets, local_key, (min(float(rule.limit), tokens + cost), updated))
+                if counted:
+                    # The shared counter keeps them reserved; this container's lease gets to use them again.
+                    window_start = int(now // rule.window_seconds) * rule.window_seconds
+                    lease_window, leased = self._leases.get(local_key, (window_start, 0))
+                    if lease_window == window_start:
+                        self._remember(self._leases, local_key, (window_start, leased + cost))
+
+    def _check_one(self, scope: str, digest: str, rule: Rule, now: float, cost: int = 1) -> Decision:
+        local_key = (scope, digest)
+        rate = rule.limit / rule.window_seconds
+        window_start = int(now // rule.window_seconds) * rule.window_seconds
+        window_end = window_start + rule.window_seconds
+        if cost > rule.limit:
+            # More than a whole window allows: no wait makes this request admissible.
+            return Decision(False, rule.window_seconds, scope)
+        with self._lock:
+            denied_until = self._denied.get(local_key)
+            if denied_until is not None:
+                if denied_until > now:
+                    return Decision(False, math.ceil(denied_until - now), scope)
+                del self._denied[local_key]
+
+            tokens, updated = self._buckets.get(local_key, (float(rule.limit), now))
+            tokens = min(float(rule.limit), tokens + (now - updated) * rate)
+            if tokens < cost:
+                self._remember(self._buckets, local_key, (tokens, now))
+                return Decision(False, math.ceil((cost - tokens) / rate), scope)
+            self._remember(self._buckets, local_key, (tokens - cost, now))
+
+            lease_window, leased = self._leases.get(local_key, (window_start, 0))
+            if lease_window != window_start:
+                leased = 0
+            if leased >= cost:
+                self._remember(self._leases, local_key, (window_start, leased - cost))
+                return ADMIT
+
+        counter_key = f"admission#{scope}#{digest}#{window_start}"
+        needed = cost - leased
+        try:
+            granted = self.counters.reserve(
+                counter_key,
+                min(max(self.lease_tokens, needed), rule.limit),
+                rule.limit,
+                window_end + COUNTER_TTL_GRACE_SECONDS,
+                minimum=needed,
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            log_event("admission_counter_error", {"scope": scope, "error": str(err)})
+            return _UNCOUNTED
+        with self._lock:
+            if granted:
+                self._remember(self._leases, local_key, (window_start, granted - needed))
+                return ADMIT
+            if needed == 1:
+                # Not even one token left in the shared counter: retries wait for the next window here.
+                self._remember(self._denied, local_key, float(window_end))
+        return Decision(False, max(1, math.ceil(window_end - now)), scope)
+
+    def _remember(self, cache: "OrderedDict", key: Tuple[str, str], value: Any) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def reset(self) -> None:
+        """Forget the in-container state (tests, benchmarks)."""
+        with self._lock:
+            self._buckets.clear()
+            self._denied.clear()
+            self._leases.clear()
+
+
+def _default_counters() -> WindowCounters:
+    return InMemoryWindowCounters() if STORE_BACKEND == "memory" else DynamoWindowCounters()
+
+
+ADMISSION = AdmissionController(
+    {
+        "ip": Rule(ADMISSION_IP_LIMIT, ADMISSION_WINDOW_SECONDS),
+        "email": Rule(ADMISSION_EMAIL_LIMIT, ADMISSION_WINDOW_SECONDS),
+    },
+    counters=_default_counters(),
+)
+
+
+def admit(*, ip: Optional[str] = None, email: Optional[str] = None) -> Decision:
+    """Check a request against the shared controller (always admits when ADMISSION_ENABLED is off)."""
+    if not ADMISSION_ENABLED:
+        return ADMIT
+    return ADMISSION.check(ip=ip, email=email)
+
+
+def admit_notes(*, ip: Optional[str], emails: Iterable[str]) -> Decision:
+    """Check a request writing one note per entry of emails: one token per note for the IP and for each email."""
+    if not ADMISSION_ENABLED:
+        return ADMIT
+    per_email = Counter(emails)
+    # Emails first, so the IP is only charged once they all pass (a rejection refunds them anyway).
+    return ADMISSION.charge([*(("email", e, n) for e, n in per_email.items()), ("ip", ip, sum(per_email.values()))])
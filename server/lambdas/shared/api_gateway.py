@@ -1,33 +1,215 @@
 """
 HTTP helpers: CORS headers and JSON responses.
+
+Responses built with the request event are compressed when the client
+accepts it and the body is at least COMPRESSION_MIN_BYTES: brotli if the
+module is bundled, otherwise gzip. They are returned base64-encoded with
+isBase64Encoded set. API Gateway decodes them only when the request's first
+Accept type is one of the API's BinaryMediaTypes, which lists just
+BINARY_MEDIA_TYPE, so other requests get the plain body.
 """
-import json
+import base64
+import gzip
+import hashlib
 import os
-from typing import Any, Dict, Tuple
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from shared import codec
+from shared.cache import COMPRESSED_BODIES
+from shared.config import COMPRESSION_MIN_BYTES
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the build
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# The one entry of the API's BinaryMediaTypes (infra/template.yaml).
+BINARY_MEDIA_TYPE = "application/json"
 
 # Get allowed origin from environment variable with fallback for local dev
 ALLOWED_ORIGIN = os.environ.get("ALLOWED_ORIGIN", "http://localhost:5173")
 
 HEADERS = {
     "Access-Control-Allow-Origin": ALLOWED_ORIGIN,  # Specific domain only
-    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Headers": "Content-Type,If-None-Match,X-Owner-Token,Idempotency-Key",
+    "Access-Control-Expose-Headers": "ETag,Retry-After,Idempotent-Replayed",
     "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE",
     "Access-Control-Allow-Credentials": "true",  # Enable for future auth improvements
 }
 
 
-def json_response(status_code: int, body: Any) -> Dict[str, Any]:
-    return {
+def json_response(
+    status_code: int,
+    body: Any,
+    headers: Optional[Dict[str, str]] = None,
+    *,
+    event: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    return raw_json_response(status_code, codec.dumps(body), headers, event=event)
+
+
+def raw_json_response(
+    status_code: int,
+    body_json: str,
+    headers: Optional[Dict[str, str]] = None,
+    *,
+    event: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build a response from an already serialized JSON body (e.g. a cached one).
+
+    Pass the request event to negotiate compression from its Accept-Encoding.
+    """
+    response = {
         "statusCode": status_code,
-        "headers": HEADERS,
-        "body": json.dumps(body),
+        "headers": {**HEADERS, **headers} if headers else HEADERS,
+        "body": body_json,
     }
+    if event is not None:
+        return compress_response(event, response)
+    return response
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header (q=0 excludes a coding)."""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def accepts_binary(event) -> bool:
+    """Whether API Gateway will decode a base64 response: the first Accept type is BINARY_MEDIA_TYPE."""
+    first = (get_header(event, "Accept") or "").split(",", 1)[0]
+    return first.split(";", 1)[0].strip().lower() == BINARY_MEDIA_TYPE
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(event, response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compress response["body"] for the request's Accept-Encoding when large enough
+    and API Gateway will decode it (see accepts_binary).
+
+    A strong ETag becomes weak on the compressed variant (same content,
+    different bytes); compressed bodies are memoized per ETag and coding.
+    """
+    body = response.get("body") or ""
+    if response.get("isBase64Encoded") or len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    headers = {**response["headers"], "Vary": "Accept, Accept-Encoding"}
+    encoding = negotiate_encoding(get_header(event, "Accept-Encoding"))
+    if encoding is None or not accepts_binary(event):
+        return {**response, "headers": headers}
+
+    etag = headers.get("ETag")
+    memo_key = (etag, encoding) if etag else None
+    encoded = COMPRESSED_BODIES.get(memo_key) if memo_key else None
+    if encoded is None:
+        encoded = base64.b64encode(_compress(body.encode("utf-8"), encoding)).decode("ascii")
+        if memo_key:
+            COMPRESSED_BODIES.set(memo_key, encoded)
+    headers["Content-Encoding"] = encoding
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+    return {**response, "headers": headers, "body": encoded, "isBase64Encoded": True}
+
+
+def not_modified_response(headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """304 with no body; headers should repeat ETag and Cache-Control."""
+    return {
+        "statusCode": 304,
+        "headers": {**HEADERS, **headers} if headers else HEADERS,
+        "body": "",
+    }
+
+
+def too_many_requests_response(retry_after: int) -> Dict[str, Any]:
+    """429 telling the client how many seconds to wait before retrying."""
+    return json_response(
+        429,
+        {"message": "Too many requests; retry later.", "retry_after": retry_after},
+        {"Retry-After": str(retry_after)},
+    )
+
+
+def source_ip(event) -> Optional[str]:
+    """Client address as seen by API Gateway (REST requestContext.identity)."""
+    identity = (event.get("requestContext") or {}).get("identity") or {}
+    value = identity.get("sourceIp")
+    return value if isinstance(value, str) and value else None
+
+
+def get_header(event, name: str) -> Optional[str]:
+    """Case-insensitive request header lookup."""
+    headers = event.get("headers") or {}
+    value = headers.get(name)
+    if value is None:
+        wanted = name.lower()
+        value = next((v for k, v in headers.items() if k.lower() == wanted), None)
+    return value if isinstance(value, str) else None
+
+
+def compute_etag(body_json: str) -> str:
+    """Strong ETag for a serialized body (quoted, per RFC 9110)."""
+    return '"' + hashlib.sha256(body_json.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison: weak comparison, comma-separated list or '*'."""
+    if not if_none_match:
+        return False
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def cache_control(max_age: int, stale_while_revalidate: int) -> str:
+    if max_age <= 0:
+        return "no-cache"
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate > 0:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
 
 
 def load_json_body(event) -> Dict[str, Any]:
+    body = event.get("body") or "{}"
     try:
-        return json.loads(event.get("body") or "{}")
-    except json.JSONDecodeError:
+        if event.get("isBase64Encoded"):
+            # BinaryMediaTypes makes API Gateway base64-encode request bodies too.
+            body = base64.b64decode(body)
+        return codec.loads(body)
+    except ValueError:  # invalid JSON (codec.JSONDecodeError) or base64
         return {}
 
 
@@ -43,3 +225,41 @@ def extract_path_id(event) -> Tuple[str, str]:
         return "", "Path parameter 'id' is too long."
     return note_id, ""
 
+
+def get_query_param(event, name: str) -> Optional[str]:
+    value = (event.get("queryStringParameters") or {}).get(name)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip()
+
+
+def extract_limit(event, *, default: int, maximum: int) -> Tuple[int, str]:
+    value = get_query_param(event, "limit")
+    if value is None:
+        return default, ""
+    if not value.isdigit() or int(value) < 1:
+        return 0, "Query parameter 'limit' must be a positive integer."
+    return min(int(value), maximum), ""
+
+
+def extract_since(event) -> Tuple[Optional[int], str]:
+    value = get_query_param(event, "since")
+    if value is None:
+        return None, ""
+    if not value.isdigit():
+        return None, "Query parameter 'since' must be a created_at epoch timestamp."
+    return int(value), ""
+
+
+def extract_date(event, name: str) -> Tuple[Optional[str], str]:
+    """Read an optional YYYY-MM-DD query parameter."""
+    value = get_query_param(event, name)
+    if value is None:
+        return None, ""
+    try:
+        if len(value) != 10:
+            raise ValueError(value)
+        date.fromisoformat(value)
+    except ValueError:
+        return None, f"Query parameter '{name}' must be a date (YYYY-MM-DD)."
+    return value, ""
@@ -0,0 +1,79 @@
+"""
+Warm-container response cache.
+
+Lambda keeps module state between invocations of a warm container, so a small
+in-process cache lets repeated reads skip DynamoDB. Entries expire after a
+short TTL and the least recently used entry is evicted once the cache is full.
+
+There is no invalidation: each API route is its own function, so a write
+never runs in the container that serves the listing. Readers see it once the
+TTL expires, and the client's reload after its own write passes fresh=1,
+which skips the cache.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from shared.config import LISTING_CACHE_MAX_ENTRIES, LISTING_CACHE_TTL_SECONDS
+
+
+class TTLCache:
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+# Serialized GET /gratitude-notes/today bodies, keyed by (date, *query variant).
+LISTING_CACHE = TTLCache(ttl_seconds=LISTING_CACHE_TTL_SECONDS, max_entries=LISTING_CACHE_MAX_ENTRIES)
+
+
+# Compressed response bodies keyed by (ETag, content-coding). ETags are content
+# hashes, so entries never go stale; the TTL only bounds how long they are kept.
+COMPRESSED_BODIES = TTLCache(ttl_seconds=300, max_entries=LISTING_CACHE_MAX_ENTRIES)
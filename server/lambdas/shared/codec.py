@@ -0,0 +1,59 @@
+"""
+JSON encoding/decoding used by everything that serializes.
+
+orjson is used when it is installed (and JSON_CODEC is not "stdlib"); the
+stdlib json module is the fallback. Both backends produce compact output and
+encode DynamoDB Decimal values natively: integral ones (created_at, ttl) as
+ints, the rest as floats.
+"""
+
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from typing import Any, Union
+
+from shared.config import JSON_CODEC
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the build
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so callers catch one type for both backends.
+JSONDecodeError = json.JSONDecodeError
+
+BACKEND = "orjson" if orjson is not None and JSON_CODEC != "stdlib" else "stdlib"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        if value.is_finite() and value == value.to_integral_value():
+            return int(value)
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(value: Any, sort_keys: bool = False) -> str:
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys)
+
+
+def _orjson_dumps(value: Any, sort_keys: bool = False) -> str:
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return orjson.dumps(value, default=_default, option=option).decode("utf-8")
+
+
+def dumps(value: Any, *, sort_keys: bool = False) -> str:
+    """Serialize value to a compact JSON string."""
+    return _DUMPS(value, sort_keys)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Parse a JSON document; raises JSONDecodeError on invalid input."""
+    return _LOADS(data)
+
+
+_DUMPS = _orjson_dumps if BACKEND == "orjson" else _stdlib_dumps
+_LOADS = orjson.loads if BACKEND == "orjson" else json.loads
@@ -22,14 +22,87 @@ REGION: str = os.environ.get("REGION") or os.environ.get("AWS_REGION", "eu-west-
 # DynamoDB
 NOTES_TABLE: str = os.environ.get("NOTES_TABLE", "gratitude_notes")
 
+# Control records (admission-control counters), kept apart from the notes
+CONTROL_TABLE: str = os.environ.get("CONTROL_TABLE", "gratitude_control")
+
+# Notes storage backend: "dynamodb" (deployed) or "memory" (tests, local runs, benchmarks)
+STORE_BACKEND: str = os.environ.get("STORE_BACKEND", "dynamodb").lower()
+
+# Listing page size for GET /gratitude-notes/today (clients follow next_cursor for more)
+LIST_DEFAULT_LIMIT: int = int(os.environ.get("LIST_DEFAULT_LIMIT", "100"))
+LIST_MAX_LIMIT: int = int(os.environ.get("LIST_MAX_LIMIT", "500"))
+
+# GET /gratitude-notes/range: longest range in days, and date partitions queried concurrently
+# (botocore's default pool holds 10 connections)
+RANGE_MAX_DAYS: int = int(os.environ.get("RANGE_MAX_DAYS", "31"))
+RANGE_MAX_WORKERS: int = int(os.environ.get("RANGE_MAX_WORKERS", "8"))
+
+# POST /gratitude-notes/bulk: notes per request, and BatchWriteItem attempts per 25-note chunk.
+# Each note costs one admission token, so keep BULK_MAX_NOTES at or below ADMISSION_IP_LIMIT.
+BULK_MAX_NOTES: int = int(os.environ.get("BULK_MAX_NOTES", "25"))
+BULK_WRITE_MAX_ATTEMPTS: int = int(os.environ.get("BULK_WRITE_MAX_ATTEMPTS", "5"))
+
+# Warm-container cache for the today listing (0 disables it)
+LISTING_CACHE_TTL_SECONDS: float = float(os.environ.get("LISTING_CACHE_TTL_SECONDS", "5"))
+LISTING_CACHE_MAX_ENTRIES: int = int(os.environ.get("LISTING_CACHE_MAX_ENTRIES", "64"))
+
+# Cache-Control for the listings. The default max-age 0 sends no-cache: browsers/CDNs revalidate
+# with the ETag (a 304 when nothing changed) instead of serving a list older than the client's own write.
+LISTING_MAX_AGE_SECONDS: int = int(os.environ.get("LISTING_MAX_AGE_SECONDS", "0"))
+LISTING_STALE_WHILE_REVALIDATE_SECONDS: int = int(os.environ.get("LISTING_STALE_WHILE_REVALIDATE_SECONDS", "30"))
+
+# Serve the first page of the today listing from the materialized daily feed (notes.feed).
+# Off by default: the feed trails writes by the Pipe batching window plus the workflow run.
+DAILY_FEED_ENABLED: bool = os.environ.get("DAILY_FEED_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# JSON codec backend: "auto" uses orjson when it is installed, "stdlib" forces the json module
+JSON_CODEC: str = os.environ.get("JSON_CODEC", "auto").lower()
+
+# Logging: logger level, per-event level overrides ("event=LEVEL,..."), sampling of
+# sub-WARNING events per invocation (0..1), and one summary record per invocation
+LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_EVENT_LEVELS: str = os.environ.get("LOG_EVENT_LEVELS", "")
+LOG_SAMPLE_RATE: float = float(os.environ.get("LOG_SAMPLE_RATE", "1"))
+LOG_ROLLUP: bool = os.environ.get("LOG_ROLLUP", "false").lower() in ("1", "true", "yes")
+
+# Per-invocation timing of AWS calls and handler sections, logged as one invocation_timing record
+TIMING_ENABLED: bool = os.environ.get("TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Response compression (gzip, or brotli when bundled) for bodies of at least this many bytes
+COMPRESSION_MIN_BYTES: int = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+
+# Admission control for the write handlers: requests per window per source IP and per email
+ADMISSION_ENABLED: bool = os.environ.get("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+ADMISSION_WINDOW_SECONDS: int = int(os.environ.get("ADMISSION_WINDOW_SECONDS", "60"))
+ADMISSION_IP_LIMIT: int = int(os.environ.get("ADMISSION_IP_LIMIT", "30"))
+ADMISSION_EMAIL_LIMIT: int = int(os.environ.get("ADMISSION_EMAIL_LIMIT", "10"))
+ADMISSION_CACHE_MAX_ENTRIES: int = int(os.environ.get("ADMISSION_CACHE_MAX_ENTRIES", "1024"))
+ADMISSION_LEASE_TOKENS: int = int(os.environ.get("ADMISSION_LEASE_TOKENS", "5"))
+
+# Idempotency-Key on POST /gratitude-notes: how long a first response is replayed, how long
+# an unfinished claim blocks retries (longer than the function timeout), warm-container LRU size
+IDEMPOTENCY_TTL_SECONDS: int = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_LOCK_SECONDS: int = int(os.environ.get("IDEMPOTENCY_LOCK_SECONDS", "30"))
+IDEMPOTENCY_CACHE_MAX_ENTRIES: int = int(os.environ.get("IDEMPOTENCY_CACHE_MAX_ENTRIES", "256"))
+
 # Email / URLs
 SENDER_EMAIL: str = os.environ.get("SENDER_EMAIL", "")
 CLIENT_BASE_URL: str = os.environ.get("CLIENT_BASE_URL", "")
 PUBLIC_BASE_URL: str = os.environ.get("PUBLIC_BASE_URL", "https://example.com")
 
+# Feedback delivery: the SQS queue POST /feedback writes to, whether the worker sends one
+# digest email per batch (otherwise one email per submission), and SES attempts per email
+FEEDBACK_QUEUE_URL: str = os.environ.get("FEEDBACK_QUEUE_URL", "")
+FEEDBACK_DIGEST: bool = os.environ.get("FEEDBACK_DIGEST", "true").lower() in ("1", "true", "yes")
+FEEDBACK_SEND_MAX_ATTEMPTS: int = int(os.environ.get("FEEDBACK_SEND_MAX_ATTEMPTS", "4"))
+
 # EventBridge
 EVENT_BUS_NAME: str = os.environ.get("EVENT_BUS_NAME", "default")
 
+# CloudWatch metrics: "emf" writes Embedded Metric Format records to the log; "api" calls PutMetricData
+METRICS_MODE: str = os.environ.get("METRICS_MODE", "emf").lower()
+METRICS_NAMESPACE: str = os.environ.get("METRICS_NAMESPACE", "DailyGratitude")
+
 # Networking links
 LINKEDIN_URL: str = os.environ.get("LINKEDIN_URL", "https://linkedin.com/in/yourprofile")
 GITHUB_URL: str = os.environ.get("GITHUB_URL", "https://github.com/yourusername")
@@ -38,25 +111,57 @@ CV_URL: str = os.environ.get("CV_URL", "")
 # Archival (nightly deletion) timezone. Use an IANA tz name, e.g. "Europe/London".
 ARCHIVE_TIMEZONE: str = os.environ.get("ARCHIVE_TIMEZONE", "UTC")
 
+# Concurrent update_item calls per archive run (botocore's default pool holds 10 connections).
+ARCHIVE_MAX_WORKERS: int = int(os.environ.get("ARCHIVE_MAX_WORKERS", "8"))
+
 
 # --- AWS clients/resources ---
+#
+# Every accessor is lazy and memoized: nothing is built at import time, so a
+# cold start only pays for the clients its code path actually uses.
+
+
+def _created(client):
+    """Hook a new client's botocore events for shared.instrumentation when TIMING_ENABLED is on."""
+    if TIMING_ENABLED:
+        from shared.instrumentation import instrument_client  # pylint: disable=import-outside-toplevel
+
+        instrument_client(client)
+    return client
+
 
 @lru_cache(maxsize=1)
 def dynamodb_resource():
-    return boto3.resource("dynamodb", region_name=REGION)
+    resource = boto3.resource("dynamodb", region_name=REGION)
+    _created(resource.meta.client)
+    return resource
 
 
 @lru_cache(maxsize=1)
 def ses_client():
-    return boto3.client("ses", region_name=REGION)
+    return _created(boto3.client("ses", region_name=REGION))
+
+
+@lru_cache(maxsize=1)
+def sqs_client():
+    return _created(boto3.client("sqs", region_name=REGION))
 
 
 @lru_cache(maxsize=1)
 def events_client():
-    return boto3.client("events", region_name=REGION)
+    return _created(boto3.client("events", region_name=REGION))
+
+
+@lru_cache(maxsize=1)
+def cloudwatch_client():
+    return _created(boto3.client("cloudwatch", region_name=REGION))
 
 
+@lru_cache(maxsize=1)
 def notes_table():
     return dynamodb_resource().Table(NOTES_TABLE)
 
 
+@lru_cache(maxsize=1)
+def control_table():
+    return dynamodb_resource().Table(CONTROL_TABLE)
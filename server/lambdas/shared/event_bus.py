@@ -0,0 +1,120 @@
+"""
+Buffered EventBridge publisher.
+
+The gratitude_notes stream consumer (handlers.events.publish_note_changes)
+queues events on PUBLISHER and flushes it inline: entries are sent with
+PutEvents in batches of up to 10, only the entries EventBridge reports as
+failed are retried, and the FlushResult lists those still failing so the
+consumer can have Lambda redeliver them. The API handlers publish nothing,
+so no API response waits for EventBridge. Anything left in the buffer is
+sent at the end of the invocation (see shared.invocation).
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from shared import codec
+from shared.config import EVENT_BUS_NAME, events_client
+from shared.invocation import on_invocation_end
+from shared.logging import log_event
+
+MAX_ENTRIES_PER_CALL = 10
+
+
+@dataclass
+class FlushResult:
+    sent: int = 0
+    calls: int = 0
+    retried: int = 0
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class EventPublisher:
+    def __init__(
+        self,
+        *,
+        client_factory: Callable[[], Any] = events_client,
+        bus_name: str = EVENT_BUS_NAME,
+        max_attempts: int = 3,
+        base_delay: float = 0.05,
+    ) -> None:
+        self._client = client_factory
+        self.bus_name = bus_name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+    def publish(self, detail_type: str, detail: Dict[str, Any], *, source: str = "gratitude.note") -> None:
+        entry = {
+            "Source": source,
+            "DetailType": detail_type,
+            "Detail": codec.dumps(detail),
+            "EventBusName": self.bus_name,
+        }
+        with self._lock:
+            self._buffer.append(entry)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> FlushResult:
+        """Send everything buffered so far (including entries queued while sending)."""
+        result = FlushResult()
+        with self._send_lock:
+            while True:
+                with self._lock:
+                    batch, self._buffer = self._buffer[:MAX_ENTRIES_PER_CALL], self._buffer[MAX_ENTRIES_PER_CALL:]
+                if not batch:
+                    break
+                self._send(batch, result)
+        if result.failed:
+            log_event(
+                "event_publish_failed",
+                {"failed": len(result.failed), "errors": sorted({e.get("ErrorCode", "") for e in result.failed})},
+            )
+        return result
+
+    def _send(self, entries: List[Dict[str, Any]], result: FlushResult) -> None:
+        attempt = 0
+        while entries:
+            attempt += 1
+            try:
+                response = self._client().put_events(Entries=entries)
+                result.calls += 1
+            except Exception as err:  # pylint: disable=broad-except
+                if attempt >= self.max_attempts:
+                    result.failed.extend({**e, "ErrorCode": type(err).__name__} for e in entries)
+                    return
+                self._backoff(attempt)
+                continue
+
+            statuses = response.get("Entries", [])
+            retry: List[Dict[str, Any]] = []
+            if response.get("FailedEntryCount", 0):
+                for entry, status in zip(entries, statuses):
+                    if status.get("ErrorCode"):
+                        retry.append({**entry, "ErrorCode": status["ErrorCode"]})
+            result.sent += len(entries) - len(retry)
+            if not retry:
+                return
+            if attempt >= self.max_attempts:
+                result.failed.extend(retry)
+                return
+            result.retried += len(retry)
+            entries = [{k: v for k, v in e.items() if k != "ErrorCode"} for e in retry]
+            self._backoff(attempt)
+
+    def _backoff(self, attempt: int) -> None:
+        time.sleep(self.base_delay * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+
+PUBLISHER = EventPublisher()
+on_invocation_end(PUBLISHER.flush, order=10)
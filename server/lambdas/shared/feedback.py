@@ -0,0 +1,187 @@
+"""
+Asynchronous feedback delivery.
+
+POST /feedback only validates a submission and enqueues it; the API answers
+202 as soon as the queue has it. SendFeedbackFn consumes the queue in
+batches (SQS batch size and batching window) and sends either one digest
+email per batch or one email per submission. SES throttling is retried with
+jittered exponential backoff. Submissions that still fail are reported as
+batch item failures, and SQS redelivers them after the visibility timeout.
+
+The queue is SQS in deployments. With STORE_BACKEND=memory it is an
+in-process list that produces SQS-shaped records (tests, local runs,
+benchmarks).
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence
+
+from botocore.exceptions import ClientError
+
+from shared import codec
+from shared.config import (
+    FEEDBACK_QUEUE_URL,
+    FEEDBACK_SEND_MAX_ATTEMPTS,
+    SENDER_EMAIL,
+    STORE_BACKEND,
+    ses_client,
+    sqs_client,
+)
+from shared.email_templates import build_feedback_digest_html, build_feedback_email_html
+from shared.logging import log_event
+
+SUBJECT = "New Feedback - Gratitude Board"
+
+# SES answers "Throttling" when the account's send rate is exceeded.
+THROTTLE_CODES = {"Throttling", "ThrottlingException", "TooManyRequestsException"}
+
+
+class FeedbackQueue(ABC):
+    @abstractmethod
+    def enqueue(self, submission: Dict[str, Any]) -> None:
+        """Hand one submission ({"feedback", "received_at"}) to the sender."""
+
+
+class SqsFeedbackQueue(FeedbackQueue):
+    def __init__(
+        self,
+        *,
+        client_factory: Callable[[], Any] = sqs_client,
+        queue_url: str = FEEDBACK_QUEUE_URL,
+    ) -> None:
+        self._client = client_factory
+        self.queue_url = queue_url
+
+    def enqueue(self, submission: Dict[str, Any]) -> None:
+        self._client().send_message(QueueUrl=self.queue_url, MessageBody=codec.dumps(submission))
+
+
+class InMemoryFeedbackQueue(FeedbackQueue):
+    """Single-process queue for tests, local runs and benchmarks."""
+
+    def __init__(self) -> None:
+        self._messages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, submission: Dict[str, Any]) -> None:
+        with self._lock:
+            self._messages.append({"messageId": uuid.uuid4().hex, "body": codec.dumps(submission)})
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take every queued message as SQS event records."""
+        with self._lock:
+            messages, self._messages = self._messages, []
+        return messages
+
+
+def _default_queue() -> FeedbackQueue:
+    return InMemoryFeedbackQueue() if STORE_BACKEND == "memory" else SqsFeedbackQueue()
+
+
+QUEUE: FeedbackQueue = _default_queue()
+
+
+def enqueue_feedback(feedback_text: str, received_at: str) -> None:
+    QUEUE.enqueue({"feedback": feedback_text, "received_at": received_at})
+
+
+@dataclass
+class Submission:
+    message_id: str
+    feedback: str
+    received_at: str
+
+
+@dataclass
+class DeliveryReport:
+    emails: int = 0
+    throttle_retries: int = 0
+    failed: List[str] = field(default_factory=list)
+
+
+def _send_email(html: str, text: str) -> None:
+    ses_client().send_email(
+        Source=SENDER_EMAIL,
+        Destination={"ToAddresses": [SENDER_EMAIL]},
+        ReplyToAddresses=[SENDER_EMAIL],
+        Message={
+            "Subject": {"Data": SUBJECT, "Charset": "UTF-8"},
+            "Body": {
+                "Html": {"Data": html, "Charset": "UTF-8"},
+                "Text": {"Data": text, "Charset": "UTF-8"},
+            },
+        },
+    )
+
+
+def _text_body(submissions: Sequence[Submission]) -> str:
+    parts = [f"{s.feedback}\n\nReceived at: {s.received_at}" for s in submissions]
+    return f"{SUBJECT}\n\n" + "\n\n---\n\n".join(parts)
+
+
+class FeedbackSender:
+    def __init__(
+        self,
+        *,
+        send: Callable[[str, str], None] = _send_email,
+        max_attempts: int = FEEDBACK_SEND_MAX_ATTEMPTS,
+        base_delay: float = 0.2,
+    ) -> None:
+        self._send = send
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+
+    def deliver(self, submissions: Sequence[Submission], *, digest: bool) -> DeliveryReport:
+        """
+        Email submissions (one digest, or one email each) and report the ids not delivered.
+
+        After an email that stays throttled, the remaining submissions are not
+        attempted: they go back to the queue with it instead of pressing SES further.
+        """
+        report = DeliveryReport()
+        if not submissions:
+            return report
+        if digest and len(submissions) > 1:
+            groups = [list(submissions)]
+            html = build_feedback_digest_html([(s.feedback, s.received_at) for s in submissions])
+            bodies = [(html, _text_body(submissions))]
+        else:
+            groups = [[s] for s in submissions]
+            bodies = [
+                (build_feedback_email_html(feedback_text=s.feedback, timestamp=s.received_at), _text_body([s]))
+                for s in submissions
+            ]
+
+        for index, (group, (html, text)) in enumerate(zip(groups, bodies)):
+            if not self._send_with_backoff(html, text, report):
+                report.failed.extend(s.message_id for g in groups[index:] for s in g)
+                break
+            report.emails += 1
+        return report
+
+    def _send_with_backoff(self, html: str, text: str, report: DeliveryReport) -> bool:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self._send(html, text)
+                return True
+            except ClientError as err:
+                code = err.response.get("Error", {}).get("Code")
+                if code not in THROTTLE_CODES or attempt >= self.max_attempts:
+                    log_event("feedback_send_error", {"code": code, "attempts": attempt})
+                    return False
+            except Exception as err:  # pylint: disable=broad-except
+                log_event("feedback_send_error", {"error": str(err), "attempts": attempt})
+                return False
+            report.throttle_retries += 1
+            time.sleep(self.base_delay * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+        return False
+
+
+SENDER = FeedbackSender()
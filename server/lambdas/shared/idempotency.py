@@ -0,0 +1,245 @@
+"""
+Idempotency-Key support for API handlers.
+
+A request carrying an Idempotency-Key header first claims the key with one
+conditional put in the control table. The claim stores a fingerprint of the
+body. When the handler succeeds (2xx), its response is stored on the record
+for IDEMPOTENCY_TTL_SECONDS, and a retry with the same key gets that stored
+response back without running the handler again, owner_token included, so a
+client whose first attempt timed out can still edit its note. The failed
+conditional put returns the existing record
+(ReturnValuesOnConditionCheckFailure), so a retry costs one write attempt and
+no read. A warm-container LRU answers repeat keys without touching the table.
+
+- Same key with a different body: 422.
+- Same key while the first request is still running: 409 with Retry-After.
+- A failed first attempt (non-2xx) releases the key, so the client can retry.
+- A claim left behind by a crashed invocation lapses after
+  IDEMPOTENCY_LOCK_SECONDS.
+- An expired record is claimable at once, before DynamoDB's TTL sweep
+  removes it.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+from shared import codec
+from shared.api_gateway import get_header, json_response, load_json_body, raw_json_response
+from shared.cache import TTLCache
+from shared.config import (
+    IDEMPOTENCY_CACHE_MAX_ENTRIES,
+    IDEMPOTENCY_LOCK_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+    STORE_BACKEND,
+    control_table,
+)
+from shared.logging import log_event
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+PENDING = "pending"
+COMPLETED = "completed"
+
+# Warm containers keep completed responses no longer than this, nor longer than the table does.
+LOCAL_TTL_SECONDS = min(300, IDEMPOTENCY_TTL_SECONDS)
+
+_DESERIALIZER = TypeDeserializer()
+
+
+class IdempotencyStore(ABC):
+    @abstractmethod
+    def claim(self, record_id: str, fingerprint: str, *, now: int) -> Optional[Dict[str, Any]]:
+        """Claim record_id; None when claimed, else the existing record (claimed or completed)."""
+
+    @abstractmethod
+    def complete(self, record_id: str, fingerprint: str, status_code: int, body: str, *, now: int) -> None:
+        """Store the response of a claimed request."""
+
+    @abstractmethod
+    def release(self, record_id: str) -> None:
+        """Drop a claim whose request failed, so the key can be retried."""
+
+
+class DynamoIdempotencyStore(IdempotencyStore):
+    def __init__(self, table_factory: Callable[[], Any] = control_table) -> None:
+        self._table = table_factory
+
+    def claim(self, record_id: str, fingerprint: str, *, now: int) -> Optional[Dict[str, Any]]:
+        try:
+            self._table().put_item(
+                Item={
+                    "id": record_id,
+                    "state": PENDING,
+                    "fingerprint": fingerprint,
+                    "locked_until": now + IDEMPOTENCY_LOCK_SECONDS,
+                    "ttl": now + IDEMPOTENCY_TTL_SECONDS,
+                },
+                # A pending claim past its lock belongs to an invocation that died; an
+                # expired record may linger for a while before TTL deletion removes it.
+                ConditionExpression=(
+                    "attribute_not_exists(id) OR #ttl < :now OR (#state = :pending AND #locked < :now)"
+                ),
+                ExpressionAttributeNames={"#state": "state", "#locked": "locked_until", "#ttl": "ttl"},
+                ExpressionAttributeValues={":pending": PENDING, ":now": now},
+                ReturnValuesOnConditionCheckFailure="ALL_OLD",
+            )
+        except ClientError as err:
+            if err.response["Error"].get("Code") != "ConditionalCheckFailedException":
+                raise
+            # Error responses bypass the resource's type transformation.
+            raw = err.response.get("Item") or {}
+            return {k: _DESERIALIZER.deserialize(v) for k, v in raw.items()}
+        return None
+
+    def complete(self, record_id: str, fingerprint: str, status_code: int, body: str, *, now: int) -> None:
+        self._table().put_item(Item={
+            "id": record_id,
+            "state": COMPLETED,
+            "fingerprint": fingerprint,
+            "status_code": status_code,
+            "body": body,
+            "ttl": now + IDEMPOTENCY_TTL_SECONDS,
+        })
+
+    def release(self, record_id: str) -> None:
+        self._table().delete_item(Key={"id": record_id})
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Single-process records for tests, local runs and benchmarks."""
+
+    def __init__(self) -> None:
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, record_id: str, fingerprint: str, *, now: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            current = self._records.get(record_id)
+            if current and current["ttl"] >= now:
+                if current["state"] == COMPLETED or current["locked_until"] >= now:
+                    return dict(current)
+            self._records[record_id] = {
+                "id": record_id,
+                "state": PENDING,
+                "fingerprint": fingerprint,
+                "locked_until": now + IDEMPOTENCY_LOCK_SECONDS,
+                "ttl": now + IDEMPOTENCY_TTL_SECONDS,
+            }
+            return None
+
+    def complete(self, record_id: str, fingerprint: str, status_code: int, body: str, *, now: int) -> None:
+        with self._lock:
+            self._records[record_id] = {
+                "id": record_id,
+                "state": COMPLETED,
+                "fingerprint": fingerprint,
+                "status_code": status_code,
+                "body": body,
+                "ttl": now + IDEMPOTENCY_TTL_SECONDS,
+            }
+
+    def release(self, record_id: str) -> None:
+        with self._lock:
+            self._records.pop(record_id, None)
+
+
+def _default_store() -> IdempotencyStore:
+    return InMemoryIdempotencyStore() if STORE_BACKEND == "memory" else DynamoIdempotencyStore()
+
+
+STORE: IdempotencyStore = _default_store()
+
+# (scope, key digest) -> completed record
+RESPONSES = TTLCache(ttl_seconds=LOCAL_TTL_SECONDS, max_entries=IDEMPOTENCY_CACHE_MAX_ENTRIES)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def body_fingerprint(event: Dict[str, Any]) -> str:
+    """Hash of the parsed JSON body, so formatting and key order do not matter."""
+    return _digest(codec.dumps(load_json_body(event), sort_keys=True))
+
+
+def _replay(event: Dict[str, Any], record: Dict[str, Any], fingerprint: str) -> Dict[str, Any]:
+    if record.get("fingerprint") != fingerprint:
+        return json_response(422, {"message": f"{HEADER} was already used with a different request body."})
+    if record.get("state") != COMPLETED:
+        return json_response(
+            409,
+            {"message": f"A request with this {HEADER} is still in progress."},
+            {"Retry-After": "1"},
+        )
+    return raw_json_response(
+        int(record["status_code"]), record["body"], {"Idempotent-Replayed": "true"}, event=event
+    )
+
+
+def idempotent(scope: str) -> Callable:
+    """
+    Decorator for an API handler: honour the Idempotency-Key header (requests without it run as before).
+
+    scope separates the keys of different endpoints.
+    """
+
+    def decorator(handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            key = (get_header(event, HEADER) or "").strip()
+            if not key:
+                return handler(event, context)
+            if len(key) > MAX_KEY_LENGTH:
+                return json_response(400, {"message": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."})
+
+            cache_key = (scope, _digest(key))
+            fingerprint = body_fingerprint(event)
+            cached = RESPONSES.get(cache_key)
+            if cached is not None:
+                return _replay(event, cached, fingerprint)
+
+            record_id = f"idem#{scope}#{cache_key[1]}"
+            now = int(time.time())
+            try:
+                existing = STORE.claim(record_id, fingerprint, now=now)
+            except Exception as err:  # pylint: disable=broad-except
+                # Without the table the key cannot be honoured; run the request rather than fail it.
+                log_event("idempotency_store_error", {"scope": scope, "error": str(err)})
+                return handler(event, context)
+            if existing is not None:
+                log_event("idempotency_replay", {"scope": scope, "state": existing.get("state")})
+                if existing.get("state") == COMPLETED:
+                    RESPONSES.set(cache_key, existing)
+                return _replay(event, existing, fingerprint)
+
+            response = handler(event, context)
+            status_code = response.get("statusCode", 500)
+            try:
+                if 200 <= status_code < 300 and not response.get("isBase64Encoded"):
+                    body = response.get("body", "")
+                    STORE.complete(record_id, fingerprint, status_code, body, now=now)
+                    RESPONSES.set(cache_key, {
+                        "state": COMPLETED,
+                        "fingerprint": fingerprint,
+                        "status_code": status_code,
+                        "body": body,
+                    })
+                else:
+                    STORE.release(record_id)
+            except Exception as err:  # pylint: disable=broad-except
+                log_event("idempotency_store_error", {"scope": scope, "error": str(err)})
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,150 @@
+"""
+Per-invocation timing of AWS calls and handler sections.
+
+With TIMING_ENABLED on, every client built by shared.config gets botocore
+before-call/after-call handlers that time each AWS operation, retries
+included. Handlers wrap their hot sections in ``with timed("store"):``.
+When the invocation ends, one compact record is logged:
+
+    {"action": "invocation_timing", "total_ms": 41.2,
+     "aws": {"dynamodb.Query": [2, 30.5, 18.1]},    # count, total ms, max ms
+     "sections": {"validation": 0.1, "store": 31.0, "serialize": 0.4}}
+
+Time that no AWS operation accounts for is spent in Python.
+
+With timing off, no botocore handlers or invocation hooks are registered.
+timed() then returns one shared no-op context manager, so a section costs a
+function call and a flag check.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from typing import Any, ContextManager, Dict, List, Optional
+
+from shared.config import TIMING_ENABLED
+from shared.invocation import on_invocation_end, on_invocation_start
+from shared.logging import log_event
+
+_NOOP: ContextManager[None] = contextlib.nullcontext()
+
+_CONTEXT_KEY = "timing_started"
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class TimingRecorder:
+    """Accumulates the timings of the current invocation (AWS calls may come from worker threads)."""
+
+    def __init__(self, *, enabled: bool = TIMING_ENABLED) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        # "service.Operation" -> [count, total seconds, max seconds]
+        self._aws: Dict[str, List[float]] = {}
+        self._sections: Dict[str, float] = {}
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._started = time.perf_counter()
+            self._aws.clear()
+            self._sections.clear()
+
+    def record_call(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._aws.get(operation)
+            if entry is None:
+                self._aws[operation] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def record_section(self, section: str, seconds: float) -> None:
+        with self._lock:
+            self._sections[section] = self._sections.get(section, 0.0) + seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The current invocation's timings, in milliseconds, and reset them."""
+        with self._lock:
+            record: Dict[str, Any] = {}
+            if self._started is not None:
+                record["total_ms"] = _ms(time.perf_counter() - self._started)
+            record["aws"] = {op: [int(n), _ms(total), _ms(peak)] for op, (n, total, peak) in self._aws.items()}
+            record["sections"] = {name: _ms(seconds) for name, seconds in self._sections.items()}
+            self._started = None
+            self._aws.clear()
+            self._sections.clear()
+        return record
+
+    def flush(self) -> None:
+        if not self.enabled:
+            return
+        record = self.snapshot()
+        if record["aws"] or record["sections"] or "total_ms" in record:
+            log_event("invocation_timing", record)
+
+
+RECORDER = TimingRecorder()
+
+
+class _Section:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *_exc: Any) -> None:
+        RECORDER.record_section(self.name, time.perf_counter() - self.started)
+
+
+def timed(section: str) -> ContextManager[None]:
+    """Time a handler section (validation, admission, store, ...) into this invocation's record."""
+    if not RECORDER.enabled:
+        return _NOOP
+    return _Section(section)
+
+
+def _before_call(context: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> None:
+    if context is not None:
+        context[_CONTEXT_KEY] = time.perf_counter()
+
+
+def _after_call(event_name: str = "", context: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> None:
+    started = context.pop(_CONTEXT_KEY, None) if context is not None else None
+    if started is None or not RECORDER.enabled:
+        return
+    # "after-call.dynamodb.Query" / "after-call-error.dynamodb.Query" -> "dynamodb.Query"
+    RECORDER.record_call(event_name.split(".", 1)[-1], time.perf_counter() - started)
+
+
+def instrument_client(client: Any) -> Any:
+    """Time every API call of a botocore client (registering twice is a no-op)."""
+    events = client.meta.events
+    events.register("before-call", _before_call, unique_id="instrumentation-before-call")
+    events.register("after-call", _after_call, unique_id="instrumentation-after-call")
+    # Connection errors and the like skip after-call.
+    events.register("after-call-error", _after_call, unique_id="instrumentation-after-call-error")
+    return client
+
+
+def enable() -> None:
+    """Turn timing on for this process (TIMING_ENABLED does this at import)."""
+    RECORDER.enabled = True
+    on_invocation_start(RECORDER.start)
+    # After the event publisher and metrics flush (their AWS calls count), before the log rollup.
+    on_invocation_end(RECORDER.flush, order=90)
+
+
+if TIMING_ENABLED:
+    enable()
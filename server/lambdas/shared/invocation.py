@@ -0,0 +1,70 @@
+"""
+Per-invocation lifecycle hooks.
+
+Modules that buffer work during an invocation (events, metrics, logs)
+register a hook with on_invocation_end(); handlers decorated with
+@invocation run every hook after the handler body, in ascending order.
+Hooks registered with on_invocation_start() run before the body (e.g. to
+start a timer). A failing hook is logged and never changes the handler's
+response.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+from typing import Any, Callable, List, Tuple
+
+_logger = logging.getLogger(__name__)
+
+_START_HOOKS: List[Tuple[int, Callable[[], None]]] = []
+_END_HOOKS: List[Tuple[int, Callable[[], None]]] = []
+
+
+def _register(hooks: List[Tuple[int, Callable[[], None]]], hook: Callable[[], None], order: int) -> None:
+    if all(existing is not hook for _, existing in hooks):
+        hooks.append((order, hook))
+        hooks.sort(key=lambda entry: entry[0])
+
+
+def _run(hooks: List[Tuple[int, Callable[[], None]]], kind: str) -> None:
+    for _, hook in list(hooks):
+        try:
+            hook()
+        except Exception:  # pylint: disable=broad-except
+            _logger.exception("invocation %s hook %s failed", kind, getattr(hook, "__qualname__", hook))
+
+
+def on_invocation_start(hook: Callable[[], None], *, order: int = 50) -> Callable[[], None]:
+    """Register hook to run before every @invocation handler (lower order runs first)."""
+    _register(_START_HOOKS, hook, order)
+    return hook
+
+
+def on_invocation_end(hook: Callable[[], None], *, order: int = 50) -> Callable[[], None]:
+    """Register hook to run after every @invocation handler (lower order runs first)."""
+    _register(_END_HOOKS, hook, order)
+    return hook
+
+
+def run_start_hooks() -> None:
+    _run(_START_HOOKS, "start")
+
+
+def run_end_hooks() -> None:
+    _run(_END_HOOKS, "end")
+
+
+def invocation(handler: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """Decorate a Lambda handler so end-of-invocation hooks run after it."""
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if _START_HOOKS:
+            run_start_hooks()
+        try:
+            return handler(event, context)
+        finally:
+            run_end_hooks()
+
+    return wrapper
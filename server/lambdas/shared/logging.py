@@ -4,18 +4,31 @@ Logger setup + minimal structured logging helpers.
 Rules:
 - Log only what's needed (errors + key events)
 - Do not log secrets/PII (email addresses, tokens)
+
+Every event has a level: *_error events log at ERROR, chatty success-path
+events at DEBUG (DEFAULT_EVENT_LEVELS), everything else at INFO;
+LOG_EVENT_LEVELS overrides single events. A disabled event returns before
+any scrubbing or serialization. Events below WARNING are sampled per
+invocation at LOG_SAMPLE_RATE, and with LOG_ROLLUP the events of one
+invocation are written as a single invocation_summary record when it ends.
 """
 
 from __future__ import annotations
 
-import json
 import logging
-from typing import Any, Dict
+import random
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared import codec
+from shared.config import LOG_EVENT_LEVELS, LOG_LEVEL, LOG_ROLLUP, LOG_SAMPLE_RATE
+from shared.invocation import on_invocation_end
 
 logger = logging.getLogger()
 if not logger.handlers:
     logger.addHandler(logging.StreamHandler())
-logger.setLevel(logging.INFO)
+logger.setLevel(LOG_LEVEL)
 
 
 _REDACT_KEYS = {
@@ -28,6 +41,51 @@ _REDACT_KEYS = {
     "cookie",
 }
 
+# Success-path events that fire on every request; enable with LOG_LEVEL=DEBUG
+# or per event via LOG_EVENT_LEVELS.
+DEFAULT_EVENT_LEVELS: Dict[str, int] = {
+    "create_or_update_note_create_new": logging.DEBUG,
+    "create_or_update_note_update_by_id": logging.DEBUG,
+    "create_or_update_note_created": logging.DEBUG,
+    "create_or_update_note_updated": logging.DEBUG,
+    "get_today_notes_cache": logging.DEBUG,
+    "get_today_notes_source": logging.DEBUG,
+    "get_note_history": logging.DEBUG,
+    "get_notes_range": logging.DEBUG,
+    "step_prepare_event": logging.DEBUG,
+}
+
+# A rollup buffer this large is written out early rather than growing further.
+ROLLUP_MAX_EVENTS = 200
+
+
+def _parse_levels(spec: str) -> Dict[str, int]:
+    """Parse "event=LEVEL,event=LEVEL" (unknown level names are ignored)."""
+    levels: Dict[str, int] = {}
+    for part in spec.split(","):
+        action, _, name = part.partition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if action.strip() and isinstance(level, int):
+            levels[action.strip()] = level
+    return levels
+
+
+class _State:
+    def __init__(self) -> None:
+        self.event_levels: Dict[str, int] = {**DEFAULT_EVENT_LEVELS, **_parse_levels(LOG_EVENT_LEVELS)}
+        self.sample_rate = LOG_SAMPLE_RATE
+        self.sampled = True
+        self.rollup = LOG_ROLLUP
+        self.buffer: List[Tuple[int, Dict[str, Any]]] = []
+        self.lock = threading.Lock()
+
+    def resample(self) -> None:
+        self.sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+
+
+_state = _State()
+_state.resample()
+
 
 def _scrub(value: Any) -> Any:
     if isinstance(value, dict):
@@ -43,9 +101,67 @@ def _scrub(value: Any) -> Any:
     return value
 
 
-def log_event(action: str, data: Dict[str, Any] | None = None) -> None:
+def event_level(action: str) -> int:
+    level = _state.event_levels.get(action)
+    if level is None:
+        level = logging.ERROR if action.endswith("_error") else logging.INFO
+    return level
+
+
+def log_event(action: str, data: Dict[str, Any] | None = None, *, level: Optional[int] = None) -> None:
+    if level is None:
+        level = event_level(action)
+    if not logger.isEnabledFor(level):
+        return
+    if level < logging.WARNING and not _state.sampled:
+        return
+
     payload: Dict[str, Any] = {"action": action}
     if data:
         payload.update(_scrub(data))
-    logger.info(json.dumps(payload))
+    if level < logging.WARNING and _state.sample_rate < 1:
+        payload["sample_rate"] = _state.sample_rate
+
+    if _state.rollup:
+        with _state.lock:
+            _state.buffer.append((level, payload))
+            full = len(_state.buffer) >= ROLLUP_MAX_EVENTS
+        if full:
+            flush_rollup()
+        return
+    logger.log(level, codec.dumps(payload))
+
+
+def flush_rollup() -> None:
+    """Write the buffered events as one invocation_summary record at their highest level."""
+    with _state.lock:
+        events, _state.buffer = _state.buffer, []
+    if not events:
+        return
+    level = max(lvl for lvl, _ in events)
+    logger.log(level, codec.dumps({
+        "action": "invocation_summary",
+        "count": len(events),
+        "events": [payload for _, payload in events],
+    }))
+
+
+def _end_invocation() -> None:
+    flush_rollup()
+    _state.resample()
+
+
+# Last, so events logged by other end hooks are part of the summary.
+on_invocation_end(_end_invocation, order=100)
+
+
+def emit_json(payload: Dict[str, Any]) -> None:
+    """
+    Write payload as a single bare JSON line to stdout.
 
+    Used for CloudWatch Embedded Metric Format records: the Lambda log handler
+    prefixes each record with level/timestamp/request id, and CloudWatch only
+    extracts metrics from lines that are pure JSON. Callers must not pass PII.
+    """
+    sys.stdout.write(codec.dumps(payload) + "\n")
+    sys.stdout.flush()
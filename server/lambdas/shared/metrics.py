@@ -0,0 +1,136 @@
+"""
+Custom CloudWatch metrics, aggregated per invocation.
+
+put_metric() adds to an in-memory buffer keyed by dimension set; the buffer
+is flushed once at the end of the invocation (see shared.invocation).
+
+METRICS_MODE selects the sink:
+- "emf" (default): one Embedded Metric Format record per dimension set is
+  written to the log and CloudWatch extracts the metrics, with no API calls
+- "api": PutMetricData, one call per 1000 aggregated data points
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from shared.config import METRICS_MODE, METRICS_NAMESPACE, cloudwatch_client
+from shared.invocation import on_invocation_end
+from shared.logging import emit_json, log_event
+
+MAX_DATA_PER_CALL = 1000
+
+DimensionKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsBuffer:
+    def __init__(
+        self,
+        namespace: str = METRICS_NAMESPACE,
+        *,
+        mode: str = METRICS_MODE,
+        client_factory: Callable[[], Any] = cloudwatch_client,
+        writer: Callable[[Dict[str, Any]], None] = emit_json,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.namespace = namespace
+        self.mode = mode
+        self._client = client_factory
+        self.writer = writer
+        self._clock = clock
+        self._lock = threading.Lock()
+        # dimensions -> metric name -> [value, unit]
+        self._values: Dict[DimensionKey, Dict[str, List[Any]]] = {}
+
+    def put(
+        self,
+        name: str,
+        value: float = 1,
+        *,
+        unit: str = "Count",
+        dimensions: Optional[Dict[str, str]] = None,
+    ) -> None:
+        key: DimensionKey = tuple(sorted((dimensions or {}).items()))
+        with self._lock:
+            metrics = self._values.setdefault(key, {})
+            if name in metrics:
+                metrics[name][0] += value
+            else:
+                metrics[name] = [value, unit]
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(metrics) for metrics in self._values.values())
+
+    def flush(self) -> int:
+        """Publish and clear the buffer; returns the number of aggregated data points."""
+        with self._lock:
+            values, self._values = self._values, {}
+        if not values:
+            return 0
+        if self.mode == "api":
+            return self._put_metric_data(values)
+        return self._emit_emf(values)
+
+    def _emit_emf(self, values: Dict[DimensionKey, Dict[str, List[Any]]]) -> int:
+        timestamp = int(self._clock() * 1000)
+        count = 0
+        for key, metrics in values.items():
+            record: Dict[str, Any] = {
+                "_aws": {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": self.namespace,
+                            "Dimensions": [[name for name, _ in key]],
+                            "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()],
+                        }
+                    ],
+                },
+                **dict(key),
+            }
+            for name, (value, _) in metrics.items():
+                record[name] = value
+            self.writer(record)
+            count += len(metrics)
+        return count
+
+    def _put_metric_data(self, values: Dict[DimensionKey, Dict[str, List[Any]]]) -> int:
+        data = [
+            {
+                "MetricName": name,
+                "Value": value,
+                "Unit": unit,
+                "Dimensions": [{"Name": k, "Value": v} for k, v in key],
+            }
+            for key, metrics in values.items()
+            for name, (value, unit) in metrics.items()
+        ]
+        for start in range(0, len(data), MAX_DATA_PER_CALL):
+            chunk = data[start:start + MAX_DATA_PER_CALL]
+            try:
+                self._client().put_metric_data(Namespace=self.namespace, MetricData=chunk)
+            except Exception as err:  # pylint: disable=broad-except
+                log_event("metrics_put_error", {"metrics": len(chunk), "error": str(err)})
+        return len(data)
+
+
+METRICS = MetricsBuffer()
+on_invocation_end(METRICS.flush, order=20)
+
+
+def put_metric(
+    name: str,
+    value: float = 1,
+    *,
+    unit: str = "Count",
+    dimensions: Optional[Dict[str, str]] = None,
+) -> None:
+    """Add a data point to the shared buffer (published at the end of the invocation)."""
+    METRICS.put(name, value, unit=unit, dimensions=dimensions)
+
+
+def flush_metrics() -> int:
+    return METRICS.flush()
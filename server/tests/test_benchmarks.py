@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+# Make the benchmark scripts importable (they add lambdas/ to sys.path themselves)
+BENCH_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+if str(BENCH_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCH_DIR))
+
+import handlers_bench  # noqa: E402
+
+
+def test_handler_benchmark_smoke():
+    """Run every scenario once at the smallest size so the suite doesn't rot."""
+    report = handlers_bench.run(sizes=[10], iterations=2)
+    scenarios = {row["scenario"] for row in report["results"]}
+    assert {"get_today_uncached", "post_note", "delete_note", "email_feedback",
+            "step_prepare_event", "step_record_note_event", "step_archive_notes"} <= scenarios
+    assert all(row["p50_ms"] > 0 for row in report["results"])
+
+
+def test_compare_flags_p95_regressions():
+    baseline = {"results": [{"scenario": "post_note", "notes_per_day": 10, "p95_ms": 1.0}]}
+    report = {"results": [{"scenario": "post_note", "notes_per_day": 10, "p95_ms": 2.0}]}
+    assert len(handlers_bench.compare(report, baseline, threshold_pct=25)) == 1
+    assert handlers_bench.compare(baseline, baseline, threshold_pct=25) == []
@@ -0,0 +1,139 @@
+import json
+import sys
+from pathlib import Path
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+import handlers.events.publish_note_changes as publish_changes  # noqa: E402
+import handlers.events.step_prepare_event as step_prepare  # noqa: E402
+import handlers.events.step_record_note_event as step_record  # noqa: E402
+from shared import metrics  # noqa: E402
+from shared.event_bus import EventPublisher  # noqa: E402
+
+
+def _eventbridge(event_type, note_id):
+    return {
+        "source": "gratitude.note",
+        "detail-type": f"gratitude.{event_type}",
+        "detail": {"eventType": event_type, "noteId": note_id},
+    }
+
+
+def test_prepare_single_event_is_unchanged():
+    assert step_prepare.handler(_eventbridge("note.deleted", "n1"), None) == {
+        "eventType": "note.deleted",
+        "noteId": "n1",
+    }
+
+
+def test_prepare_sqs_batch_reports_bad_entries():
+    records = [
+        {"messageId": "1", "body": json.dumps(_eventbridge("note.created", "a"))},
+        {"messageId": "2", "body": "not json"},
+        {"messageId": "3", "body": json.dumps(_eventbridge("note.updated", "b"))},
+        {"messageId": "4", "body": json.dumps({"eventType": "note.exploded"})},
+    ]
+
+    result = step_prepare.handler({"Records": records}, None)
+
+    assert result["eventType"] == "note.batch"
+    assert [e["noteId"] for e in result["events"]] == ["a", "b"]
+    assert [e["index"] for e in result["errors"]] == [1, 3]
+
+
+def test_record_batch_aggregates_counts(monkeypatch):
+    records = []
+    monkeypatch.setattr(metrics.METRICS, "mode", "emf")
+    monkeypatch.setattr(metrics.METRICS, "writer", records.append)
+    batch = step_prepare.handler(
+        [_eventbridge("note.created", f"c{i}") for i in range(3)] + [_eventbridge("note.deleted", "d1")],
+        None,
+    )
+    batch["events"].append({"eventType": "note.created"})
+
+    result = step_record.handler(batch, None)
+
+    assert result["counts"] == {"note.created": 3, "note.deleted": 1}
+    assert [r["status"] for r in result["results"]] == ["recorded"] * 4 + ["skipped"]
+    assert sorted((r["EventType"], r.get("NoteCreated", r.get("NoteDeleted"))) for r in records) == [
+        ("note.created", 3),
+        ("note.deleted", 1),
+    ]
+
+
+def test_record_skips_a_payload_that_is_not_an_object():
+    assert step_record.handler("note.created", None) == {"status": "skipped", "reason": "invalid_event"}
+
+
+def _image(**attrs):
+    return {k: {"N": str(v)} if isinstance(v, int) else {"S": v} for k, v in attrs.items()}
+
+
+def _stream_record(seq, name, new=None, old=None):
+    change = {"SequenceNumber": seq}
+    if new is not None:
+        change["NewImage"] = _image(**new)
+    if old is not None:
+        change["OldImage"] = _image(**old)
+    return {"eventName": name, "dynamodb": change}
+
+
+NOTE = {"id": "n1", "date": "2024-01-01", "status": "active", "gratitude_text": "hi", "revision": 1}
+
+
+def test_stream_records_map_to_lifecycle_events():
+    edited = {**NOTE, "gratitude_text": "edited", "revision": 2}
+    deleted = {**NOTE, "status": "deleted", "deleted_at": "t", "revision": 2}
+    archived = {**NOTE, "status": "deleted", "archived_at": "t", "revision": 2}
+
+    assert publish_changes.note_event(_stream_record("1", "INSERT", NOTE)) == (
+        "gratitude.note.created", {"eventType": "note.created", "noteId": "n1", "gratitudeText": "hi"},
+    )
+    assert publish_changes.note_event(_stream_record("2", "MODIFY", edited, NOTE))[1]["eventType"] == "note.updated"
+    assert publish_changes.note_event(_stream_record("3", "MODIFY", deleted, NOTE))[1] == {
+        "eventType": "note.deleted", "noteId": "n1",
+    }
+    # The nightly archive, feed documents, repeated deletes and TTL removals publish nothing.
+    assert publish_changes.note_event(_stream_record("4", "MODIFY", archived, NOTE)) is None
+    assert publish_changes.note_event(_stream_record("5", "INSERT", {"id": "feed#2024-01-01"})) is None
+    assert publish_changes.note_event(_stream_record("6", "MODIFY", deleted, deleted)) is None
+    assert publish_changes.note_event(_stream_record("7", "REMOVE", old=NOTE)) is None
+
+
+class _FailingEvents:
+    """PutEvents that rejects every entry for note n2."""
+
+    def __init__(self):
+        self.calls = []
+
+    def put_events(self, Entries):
+        self.calls.append(len(Entries))
+        statuses = [
+            {"ErrorCode": "InternalFailure"} if json.loads(e["Detail"])["noteId"] == "n2" else {"EventId": "e"}
+            for e in Entries
+        ]
+        return {"FailedEntryCount": sum("ErrorCode" in s for s in statuses), "Entries": statuses}
+
+
+def test_stream_batch_is_redelivered_from_the_first_failed_record(monkeypatch):
+    events = _FailingEvents()
+    monkeypatch.setattr(
+        publish_changes, "PUBLISHER", EventPublisher(client_factory=lambda: events, max_attempts=2, base_delay=0)
+    )
+    records = [
+        _stream_record("100", "INSERT", NOTE),
+        _stream_record("101", "REMOVE", old=NOTE),
+        _stream_record("102", "INSERT", {**NOTE, "id": "n2"}),
+        _stream_record("103", "INSERT", {**NOTE, "id": "n3"}),
+    ]
+
+    result = publish_changes.handler({"Records": records}, None)
+    assert result == {"batchItemFailures": [{"itemIdentifier": "102"}]}
+    assert events.calls == [3, 1]
+
+    events.calls.clear()
+    assert publish_changes.handler({"Records": records[:2]}, None) == {"batchItemFailures": []}
+    assert events.calls == [1]
@@ -11,8 +11,28 @@ if str(LAMBDA_DIR) not in sys.path:
 
 # Import handlers normally (no sys.modules hacking)
 import handlers.api.post_gratitude_note as post_note  # noqa: E402
+import handlers.api.post_gratitude_notes_bulk as post_bulk  # noqa: E402
 import handlers.api.delete_gratitude_note as del_note  # noqa: E402
 import handlers.api.get_today_gratitude_notes as get_today_notes  # noqa: E402
+import handlers.api.get_gratitude_note_history as note_history  # noqa: E402
+from notes.db import InvalidCursorError, decode_cursor, encode_cursor  # noqa: E402
+from notes.store import DeleteOutcome, InMemoryNotesStore, set_store  # noqa: E402
+from shared.admission import ADMISSION, InMemoryWindowCounters  # noqa: E402
+from shared.cache import LISTING_CACHE, TTLCache  # noqa: E402
+import shared.idempotency as idempotency  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    # An empty store: the listing finds no daily feed and uses the (mocked) query path.
+    store = InMemoryNotesStore()
+    set_store(store)
+    monkeypatch.setattr(ADMISSION, "counters", InMemoryWindowCounters())
+    ADMISSION.reset()
+    monkeypatch.setattr(idempotency, "STORE", idempotency.InMemoryIdempotencyStore())
+    idempotency.RESPONSES.clear()
+    yield store
+    set_store(None)
 
 
 def _create_note(name="Test User", email="test@example.com", gratitude="line one\nline two", note_id=None):
@@ -46,26 +66,17 @@ def _mock_get_note(note_id, gratitude_text="", status="active", owner_token="tok
     return fake_get_note
 
 
-def _noop_publish_note_event(*_args, **_kwargs):
-    """No-op function to disable event publishing in tests."""
-    return None
-
-
 def _mock_get_note_returns_none(_id):
     """Mock get_note that always returns None."""
     return None
 
 
 @pytest.fixture(autouse=True)
-def _disable_event_publishing(monkeypatch):
-    """
-    We don't test EventBridge here. If the handler publishes events, no-op it.
-    If your handler doesn't have this function, the patch is skipped.
-    """
-    if hasattr(post_note, "_publish_note_event"):
-        monkeypatch.setattr(post_note, "_publish_note_event", _noop_publish_note_event, raising=True)
-    if hasattr(del_note, "_publish_deleted_event"):
-        monkeypatch.setattr(del_note, "_publish_deleted_event", _noop_publish_note_event, raising=True)
+def _clear_listing_cache():
+    """Listing responses are cached per container; start every test cold."""
+    LISTING_CACHE.clear()
+    yield
+    LISTING_CACHE.clear()
 
 
 def test_post_creates_note_201(monkeypatch):
@@ -90,51 +101,46 @@ def test_post_update_by_id_returns_200(monkeypatch):
         raising=True
     )
 
-    events_published = []
-    def capture_publish_note_event(note, event_type):
-        events_published.append({"note": note, "eventType": event_type})
-    
-    monkeypatch.setattr(post_note, "_publish_note_event", capture_publish_note_event, raising=True)
-
     resp = post_note.handler(_create_note(gratitude="updated text", note_id="existing-id"), None)
     assert resp["statusCode"] == 200
     assert json.loads(resp["body"]) == {"id": "existing-id", "owner_token": "tok"}
-    # Verify note.updated event was published
-    assert len(events_published) == 1
-    assert events_published[0]["eventType"] == "note.updated"
-    assert events_published[0]["note"]["id"] == "existing-id"
+
+
+def test_post_with_unchanged_text_returns_200(monkeypatch):
+    monkeypatch.setattr(post_note, "create_or_update_note", _mock_create_or_update_note(created=None), raising=True)
+
+    resp = post_note.handler(_create_note(note_id="existing-id"), None)
+    assert resp["statusCode"] == 200
+    assert json.loads(resp["body"]) == {"id": "existing-id", "owner_token": "tok"}
 
 
 def test_delete_note_happy_path(monkeypatch):
-    monkeypatch.setattr(
-        del_note,
-        "get_note",
-        _mock_get_note("n1", status="active", owner_token="tok"),
-        raising=True,
-    )
+    delete_calls = []
 
-    mark_deleted_called = []
-    
-    def fake_mark_deleted(note_id, **kwargs):
-        mark_deleted_called.append(note_id)
-    
-    monkeypatch.setattr(del_note, "mark_deleted", fake_mark_deleted, raising=True)
+    def fake_delete_note_with_token(note_id, token, **kwargs):
+        delete_calls.append((note_id, token))
+        return DeleteOutcome.DELETED, {"id": note_id, "status": "deleted", "date": "2024-01-01"}
 
-    events_published = []
-    def capture_publish_deleted_event(note_id):
-        events_published.append({"noteId": note_id})
-    
-    monkeypatch.setattr(del_note, "_publish_deleted_event", capture_publish_deleted_event, raising=True)
+    monkeypatch.setattr(del_note, "delete_note_with_token", fake_delete_note_with_token, raising=True)
 
     resp = del_note.handler(
-        {"pathParameters": {"id": "n1"}, "queryStringParameters": {"token": "tok"}},
+        {"pathParameters": {"id": "n1"}, "body": json.dumps({"token": "tok"})},
         None,
     )
     assert resp["statusCode"] == 200
-    assert mark_deleted_called == ["n1"]
-    # Verify note.deleted event was published
-    assert len(events_published) == 1
-    assert events_published[0]["noteId"] == "n1"
+    assert delete_calls == [("n1", "tok")]
+
+
+@pytest.mark.parametrize(
+    "outcome, status",
+    [(DeleteOutcome.NOT_FOUND, 404), (DeleteOutcome.ALREADY_DELETED, 404), (DeleteOutcome.BAD_TOKEN, 403)],
+)
+def test_delete_note_maps_outcomes(monkeypatch, outcome, status):
+    monkeypatch.setattr(del_note, "delete_note_with_token", lambda *_a, **_k: (outcome, None), raising=True)
+
+    resp = del_note.handler({"pathParameters": {"id": "n1"}, "body": json.dumps({"token": "tok"})}, None)
+
+    assert resp["statusCode"] == status
 
 
 def test_today_feed_returns_items(monkeypatch):
@@ -143,8 +149,8 @@ def test_today_feed_returns_items(monkeypatch):
         {"id": "a", "name": "Alice", "email": "a@x.com", "gratitude_text": "x", "status": "active", "created_at": 1},
     ]
     
-    def fake_list_notes_for_date(_date):
-        return mock_notes
+    def fake_list_notes_for_date(_date, *, limit=None, cursor=None, since=None):
+        return mock_notes, None
     
     monkeypatch.setattr(
         get_today_notes,
@@ -156,4 +162,233 @@ def test_today_feed_returns_items(monkeypatch):
     resp = get_today_notes.handler({"queryStringParameters": {}}, None)
     assert resp["statusCode"] == 200
     body = json.loads(resp["body"])
-    assert [it["name"] for it in body["items"]] == ["Bob", "Alice"]  # assumes sort desc by created_at
\ No newline at end of file
+    assert [it["name"] for it in body["items"]] == ["Bob", "Alice"]  # assumes sort desc by created_at
+
+
+def test_today_feed_sends_etag_and_honours_if_none_match(monkeypatch):
+    def fake_list_notes_for_date(_date, *, limit=None, cursor=None, since=None):
+        return [{"id": "a", "name": "Alice", "status": "active", "created_at": 1}], None
+
+    monkeypatch.setattr(get_today_notes, "list_notes_for_date", fake_list_notes_for_date, raising=True)
+
+    first = get_today_notes.handler({"queryStringParameters": {}}, None)
+    etag = first["headers"]["ETag"]
+    assert first["statusCode"] == 200 and etag.startswith('"')
+    # Browsers and CDNs revalidate every time: a client's reload after its own write is never served stale.
+    assert first["headers"]["Cache-Control"] == "no-cache"
+
+    # Header names are case-insensitive; weak validators and lists match too.
+    for value in (etag, f"W/{etag}", f'"other", {etag}'):
+        resp = get_today_notes.handler({"queryStringParameters": {}, "headers": {"if-none-match": value}}, None)
+        assert resp["statusCode"] == 304 and resp["body"] == ""
+        assert resp["headers"]["ETag"] == etag
+
+    resp = get_today_notes.handler({"queryStringParameters": {}, "headers": {"If-None-Match": '"stale"'}}, None)
+    assert resp["statusCode"] == 200
+
+
+def test_today_feed_passes_limit_and_cursor(monkeypatch):
+    calls = []
+
+    def fake_list_notes_for_date(date_str, *, limit=None, cursor=None, since=None):
+        calls.append({"limit": limit, "cursor": cursor, "since": since})
+        return [{"id": "a", "name": "Alice", "status": "active", "created_at": 1}], "next-page"
+
+    monkeypatch.setattr(get_today_notes, "list_notes_for_date", fake_list_notes_for_date, raising=True)
+
+    resp = get_today_notes.handler({"queryStringParameters": {"limit": "2", "cursor": "abc"}}, None)
+    assert resp["statusCode"] == 200
+    assert json.loads(resp["body"])["next_cursor"] == "next-page"
+    assert calls == [{"limit": 2, "cursor": "abc", "since": None}]
+
+
+def test_today_feed_since_returns_delta_and_watermark(monkeypatch):
+    calls = []
+
+    def fake_list_notes_for_date(date_str, *, limit=None, cursor=None, since=None):
+        calls.append(since)
+        if since is None:
+            return [{"id": "a", "status": "active", "created_at": 100}], None
+        return [
+            {"id": "c", "status": "deleted", "created_at": 120},
+            {"id": "b", "status": "active", "created_at": 110},
+        ], None
+
+    monkeypatch.setattr(get_today_notes, "list_notes_for_date", fake_list_notes_for_date, raising=True)
+
+    first = json.loads(get_today_notes.handler({"queryStringParameters": None}, None)["body"])
+    assert first["watermark"] == 100
+
+    delta = json.loads(
+        get_today_notes.handler({"queryStringParameters": {"since": str(first["watermark"])}}, None)["body"]
+    )
+    assert [it["id"] for it in delta["items"]] == ["b"]
+    assert delta["watermark"] == 120
+    assert calls == [None, 100]
+
+
+def test_today_feed_rejects_bad_limit():
+    resp = get_today_notes.handler({"queryStringParameters": {"limit": "-1"}}, None)
+    assert resp["statusCode"] == 400
+
+
+def test_cursor_round_trip_is_bound_to_date():
+    key = {"id": "n1", "date": "2024-01-01", "created_at": 1700000000}
+    cursor = encode_cursor(key)
+    assert decode_cursor(cursor, date_str="2024-01-01") == key
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, date_str="2024-01-02")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", date_str="2024-01-01")
+
+
+def test_today_feed_served_from_cache_unless_fresh(monkeypatch):
+    calls = []
+
+    def fake_list_notes_for_date(_date, *, limit=None, cursor=None, since=None):
+        calls.append(_date)
+        return [{"id": "a", "name": "Alice", "status": "active", "created_at": 1}], None
+
+    monkeypatch.setattr(get_today_notes, "list_notes_for_date", fake_list_notes_for_date, raising=True)
+    monkeypatch.setattr(post_note, "create_or_update_note", _mock_create_or_update_note(), raising=True)
+
+    first = get_today_notes.handler({"queryStringParameters": {}}, None)
+    second = get_today_notes.handler({"queryStringParameters": {}}, None)
+    assert second["body"] == first["body"]
+    assert len(calls) == 1
+
+    # A write in another container cannot clear this one's cache; the writer reloads with fresh=1.
+    post_note.handler(_create_note(), None)
+    get_today_notes.handler({"queryStringParameters": {}}, None)
+    assert len(calls) == 1
+    get_today_notes.handler({"queryStringParameters": {"fresh": "1"}}, None)
+    assert len(calls) == 2
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    now = [0.0]
+    cache = TTLCache(ttl_seconds=5, max_entries=2, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    now[0] = 6.0
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+def _history_event(note_id, token, query=None):
+    return {"pathParameters": {"id": note_id}, "headers": {"x-owner-token": token}, "queryStringParameters": query}
+
+
+def test_note_history_lists_the_authors_notes_for_the_owner(memory_store):
+    for day, status in ((1, "deleted"), (2, "active"), (3, "active")):
+        memory_store.put_item({
+            "id": f"n{day}", "name": "Ann", "email": "ann@x.com", "gratitude_text": f"day {day}",
+            "status": status, "date": f"2024-01-0{day}", "created_at": day, "owner_token": f"tok{day}",
+            **({"archived_at": "t"} if status == "deleted" else {}),
+        })
+    memory_store.put_item({"id": "m", "email": "bob@x.com", "date": "2024-01-02", "created_at": 5, "owner_token": "b"})
+
+    resp = note_history.handler(_history_event("n3", "tok3", {"to": "2024-01-02"}), None)
+    assert resp["statusCode"] == 200
+    assert resp["headers"]["Cache-Control"] == "private, no-store"
+    body = json.loads(resp["body"])
+    assert [(it["id"], it["status"]) for it in body["items"]] == [("n2", "active"), ("n1", "archived")]
+    assert "email" not in body["items"][0] and body["next_cursor"] is None
+
+    assert note_history.handler(_history_event("n3", "tok1"), None)["statusCode"] == 403
+    assert note_history.handler(_history_event("missing", "tok3"), None)["statusCode"] == 404
+    assert note_history.handler({"pathParameters": {"id": "n3"}}, None)["statusCode"] == 400
+    bad_range = _history_event("n3", "tok3", {"from": "2024-01-03", "to": "2024-01-01"})
+    assert note_history.handler(bad_range, None)["statusCode"] == 400
+    assert note_history.handler(_history_event("n3", "tok3", {"from": "Jan 1"}), None)["statusCode"] == 400
+
+
+def test_post_rejects_a_client_over_its_rate_with_429(monkeypatch):
+    monkeypatch.setattr(post_note, "create_or_update_note", _mock_create_or_update_note(), raising=True)
+    event = {**_create_note(), "requestContext": {"identity": {"sourceIp": "198.51.100.7"}}}
+
+    limit = ADMISSION.rules["email"].limit
+    statuses = [post_note.handler(event, None)["statusCode"] for _ in range(limit + 1)]
+    assert statuses == [201] * limit + [429]
+
+    resp = post_note.handler(event, None)
+    assert resp["statusCode"] == 429
+    assert int(resp["headers"]["Retry-After"]) >= 1
+    assert "Retry-After" in resp["headers"]["Access-Control-Expose-Headers"]
+
+
+def test_post_with_idempotency_key_replays_the_first_response(monkeypatch):
+    calls = []
+
+    def create(*args, **kwargs):
+        calls.append(args)
+        return {"id": f"n{len(calls)}", "owner_token": "tok"}, True
+
+    monkeypatch.setattr(post_note, "create_or_update_note", create, raising=True)
+    event = {**_create_note(), "headers": {"Idempotency-Key": "retry-1"}}
+
+    first = post_note.handler(event, None)
+    assert first["statusCode"] == 201
+    # Warm container answers from its LRU; a cold one from the stored record.
+    for clear in (False, True):
+        if clear:
+            idempotency.RESPONSES.clear()
+        replay = post_note.handler(event, None)
+        assert replay["statusCode"] == 201 and replay["body"] == first["body"]
+        assert replay["headers"]["Idempotent-Replayed"] == "true"
+    assert len(calls) == 1
+
+    # Reordered keys are the same body; a different body is a misuse of the key.
+    same = {**event, "body": json.dumps(dict(reversed(list(json.loads(event["body"]).items()))))}
+    assert post_note.handler(same, None)["statusCode"] == 201
+    other = {**_create_note(gratitude="something else"), "headers": {"Idempotency-Key": "retry-1"}}
+    assert post_note.handler(other, None)["statusCode"] == 422
+    assert len(calls) == 1
+
+    # Without the header every request runs.
+    post_note.handler(_create_note(), None)
+    assert len(calls) == 2
+
+
+def test_bulk_post_validates_each_note_and_reports_per_item(monkeypatch, memory_store):
+    notes = [
+        {"name": "A", "email": "a@example.com", "gratitudeText": "one"},
+        {"name": "B", "email": "not-an-email", "gratitudeText": "two"},
+        "not an object",
+        {"name": "C", "email": "C@Example.com", "gratitudeText": " three "},
+    ]
+    resp = post_bulk.handler({"body": json.dumps({"notes": notes})}, None)
+    assert resp["statusCode"] == 207
+    body = json.loads(resp["body"])
+    assert body["created"] == 2
+    assert [r["status"] for r in body["results"]] == ["created", "invalid", "invalid", "created"]
+    assert body["results"][1]["message"] == "Invalid email format."
+
+    created = [r["id"] for r in body["results"] if r["status"] == "created"]
+    stored = memory_store.get_item(created[1])
+    assert stored["email"] == "c@example.com" and stored["gratitude_text"] == "three"
+    assert stored["owner_token"] == body["results"][3]["owner_token"]
+
+    resp = post_bulk.handler({"body": json.dumps({"notes": notes[:1]})}, None)
+    assert resp["statusCode"] == 201
+    for bad in ({"notes": []}, {"notes": notes[1:3]}, {"notes": [notes[0]] * 101}, [notes[0]]):
+        assert post_bulk.handler({"body": json.dumps(bad)}, None)["statusCode"] == 400
+
+
+def test_bulk_post_costs_one_admission_token_per_note(monkeypatch, memory_store):
+    ip = {"identity": {"sourceIp": "203.0.113.9"}}
+
+    def bulk(emails):
+        notes = [{"name": "A", "email": e, "gratitudeText": f"note {n}"} for n, e in enumerate(emails)]
+        return post_bulk.handler({"body": json.dumps({"notes": notes}), "requestContext": ip}, None)
+
+    # Eleven notes for one email are more than that email may write in a window.
+    assert bulk(["same@example.com"] * 11)["statusCode"] == 429
+    # Twenty notes use twenty of the IP's thirty tokens; the next twenty do not fit.
+    assert bulk([f"u{n}@example.com" for n in range(20)])["statusCode"] == 201
+    resp = bulk([f"v{n}@example.com" for n in range(20)])
+    assert resp["statusCode"] == 429 and int(resp["headers"]["Retry-After"]) > 0
+    assert len(memory_store) == 20
@@ -0,0 +1,83 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from botocore.exceptions import ClientError
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+from notes.archive import run_archive  # noqa: E402
+
+
+def _throttle_error():
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "UpdateItem")
+
+
+def _pages(*pages):
+    """Build a fetch_page function serving the given pages in order."""
+    def fetch_page(start_key):
+        index = start_key["page"] if start_key else 0
+        next_key = {"page": index + 1} if index + 1 < len(pages) else None
+        return pages[index], next_key
+    return fetch_page
+
+
+def test_archive_skips_deleted_and_reports_pages():
+    archived_ids = []
+    lock = threading.Lock()
+
+    def archive_one(note_id):
+        with lock:
+            archived_ids.append(note_id)
+
+    report = run_archive(
+        "2024-01-01",
+        fetch_page=_pages(
+            [{"id": "a", "status": "active"}, {"id": "b", "status": "deleted"}],
+            [{"id": "c", "status": "active"}],
+        ),
+        archive_one=archive_one,
+        max_workers=4,
+    )
+
+    assert report.archived == 2
+    assert sorted(archived_ids) == ["a", "c"]
+    assert [p.items for p in report.pages] == [2, 1]
+    assert [p.archived for p in report.pages] == [1, 1]
+
+
+def test_archive_retries_throttled_updates(monkeypatch):
+    monkeypatch.setattr("notes.archive.time.sleep", lambda _s: None)
+    attempts = {"a": 0}
+
+    def archive_one(note_id):
+        attempts[note_id] += 1
+        if attempts[note_id] < 3:
+            raise _throttle_error()
+
+    report = run_archive(
+        "2024-01-01",
+        fetch_page=_pages([{"id": "a", "status": "active"}]),
+        archive_one=archive_one,
+        max_workers=2,
+    )
+
+    assert report.archived == 1
+    assert report.throttle_retries == 2
+
+
+def test_archive_propagates_non_throttle_errors():
+    def archive_one(_note_id):
+        raise ClientError({"Error": {"Code": "ValidationException", "Message": "bad"}}, "UpdateItem")
+
+    with pytest.raises(ClientError):
+        run_archive(
+            "2024-01-01",
+            fetch_page=_pages([{"id": "a", "status": "active"}]),
+            archive_one=archive_one,
+            max_workers=2,
+        )
@@ -0,0 +1,228 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+import handlers.api.get_today_gratitude_notes as get_today_notes  # noqa: E402
+import handlers.events.step_update_daily_feed as step_feed  # noqa: E402
+import notes.db as db  # noqa: E402
+import notes.store as store_module  # noqa: E402
+from notes.feed import apply_note_changes, feed_id, read_feed_page, rebuild_feed  # noqa: E402
+from notes.store import DynamoNotesStore, FeedUpdate, InMemoryNotesStore, UpdateOutcome, set_store  # noqa: E402
+from shared.cache import LISTING_CACHE  # noqa: E402
+
+DAY = "2024-01-01"
+
+
+def _note(note_id, *, date=DAY, created_at=100, status="active"):
+    return {
+        "id": note_id,
+        "name": "N",
+        "email": "a@x.com",
+        "gratitude_text": f"text {note_id}",
+        "status": status,
+        "date": date,
+        "created_at": created_at,
+        "owner_token": "secret",
+        "ttl": 10_000,
+    }
+
+
+@pytest.fixture()
+def store():
+    mem = InMemoryNotesStore(clock=lambda: 0.0)
+    set_store(mem)
+    LISTING_CACHE.clear()
+    yield mem
+    set_store(None)
+    LISTING_CACHE.clear()
+
+
+def test_rebuild_keeps_active_public_fields_outside_the_indexes(store):
+    store.put_item(_note("a", created_at=1))
+    store.put_item(_note("b", created_at=2, status="deleted"))
+
+    assert rebuild_feed(DAY) is True
+    document = store.get_item(feed_id(DAY))
+    assert document["complete"] is True
+    assert document["notes"]["b"] == {"revision": 0, "deleted": True}
+    assert "owner_token" not in document["notes"]["a"]
+    assert [i["id"] for i in read_feed_page(DAY, limit=10)[0]] == ["a"]
+    # The feed has no date/created_at/email of its own, so listings never see it.
+    assert [i["id"] for i in store.query_date(DAY)[0]] == ["a", "b"]
+
+
+def test_events_are_applied_per_date_in_any_order(store):
+    store.put_item(_note("a", created_at=1))
+    assert apply_note_changes(["a"]) == {DAY: "rebuilt"}
+
+    store.put_item(_note("b", created_at=2))
+    store.put_item(_note("c", created_at=3))
+    store.update_fields("a", {"status": "deleted"})
+    # A stale duplicate of the "a" event and out-of-order ids converge on the stored state.
+    assert apply_note_changes(["c", "a", "b", "a"]) == {DAY: "applied"}
+
+    items, next_cursor, watermark = read_feed_page(DAY, limit=10)
+    assert [i["id"] for i in items] == ["c", "b"]
+    assert next_cursor is None and watermark == 3
+    assert store.get_item(feed_id(DAY))["version"] == 3
+
+
+def test_a_stale_execution_cannot_undo_a_later_change(store, monkeypatch):
+    store.put_item(_note("a", created_at=1))
+    assert apply_note_changes(["a"]) == {DAY: "rebuilt"}
+    # One execution read "a" while it was active; "a" is then deleted and that change applied first.
+    stale = store.get_item("a")
+    store.update_fields("a", {"status": "deleted"})
+    assert apply_note_changes(["a"]) == {DAY: "applied"}
+
+    get_item = store.get_item
+    monkeypatch.setattr(store, "get_item", lambda note_id, **kw: stale if note_id == "a" else get_item(note_id, **kw))
+    assert apply_note_changes(["a"]) == {DAY: "applied"}
+    monkeypatch.undo()
+
+    assert read_feed_page(DAY, limit=10)[0] == []
+    assert store.get_item(feed_id(DAY))["notes"]["a"] == {"revision": 1, "deleted": True}
+
+
+def test_feed_page_cursor_continues_on_the_query_path(store):
+    for i in range(4):
+        store.put_item(_note(f"n{i}", created_at=10 + i))
+    rebuild_feed(DAY)
+
+    items, next_cursor, _ = read_feed_page(DAY, limit=2)
+    assert [i["id"] for i in items] == ["n3", "n2"]
+    rest, _ = db.list_notes_for_date(DAY, limit=10, cursor=next_cursor)
+    assert [i["id"] for i in rest] == ["n1", "n0"]
+
+
+def test_oversized_feed_is_marked_incomplete(store, monkeypatch):
+    monkeypatch.setattr(store_module, "MAX_ITEM_BYTES", 600)
+    store.put_item(_note("a", created_at=1))
+    assert apply_note_changes(["a"]) == {DAY: "rebuilt"}
+
+    for i in range(5):
+        store.put_item(_note(f"n{i}", created_at=10 + i))
+    assert apply_note_changes([f"n{i}" for i in range(5)]) == {DAY: "oversized"}
+    assert read_feed_page(DAY, limit=10) is None
+    # Later events leave the oversized marker alone rather than rebuilding each time.
+    assert apply_note_changes(["a"]) == {DAY: "oversized"}
+
+
+def test_feed_documents_are_not_notes(store):
+    store.put_item(_note("a"))
+    rebuild_feed(DAY)
+
+    assert db.get_note(feed_id(DAY)) is None
+    assert db.update_note_text(feed_id(DAY), "x") == (UpdateOutcome.NOT_FOUND, None)
+    assert db.delete_note_with_token(feed_id(DAY), "tok")[0].value == "not_found"
+
+
+def test_step_handler_takes_single_events_and_batches(store):
+    store.put_item(_note("a", created_at=1))
+    store.put_item(_note("b", created_at=2))
+
+    single = step_feed.handler({"eventType": "note.created", "noteId": "a"}, None)
+    assert single == {"status": "updated", "dates": {DAY: "rebuilt"}}
+
+    batch = {
+        "eventType": "note.batch",
+        "events": [{"eventType": "note.created", "noteId": "b"}, {"eventType": "archive.nightly"}],
+        "record": {"status": "recorded"},
+    }
+    assert step_feed.handler(batch, None) == {"status": "updated", "dates": {DAY: "applied"}}
+    assert step_feed.handler({"eventType": "archive.nightly"}, None)["status"] == "skipped"
+
+
+def test_today_listing_is_served_from_the_feed(store, monkeypatch):
+    today = get_today_notes.datetime.now(get_today_notes.timezone.utc).strftime("%Y-%m-%d")
+    store.put_item(_note("a", date=today, created_at=1))
+    store.put_item(_note("b", date=today, created_at=2))
+    rebuild_feed(today)
+
+    def no_query(*_args, **_kwargs):
+        raise AssertionError("listing should come from the feed")
+
+    monkeypatch.setattr(get_today_notes, "DAILY_FEED_ENABLED", True)
+    monkeypatch.setattr(get_today_notes, "list_notes_for_date", no_query)
+    body = json.loads(get_today_notes.handler({"queryStringParameters": {}}, None)["body"])
+    assert [it["id"] for it in body["items"]] == ["b", "a"]
+    assert body["watermark"] == 2 and body["next_cursor"] is None
+
+    # A reload after the client's own write skips the feed and the container cache.
+    store.update_fields("b", {"status": "deleted"})
+    monkeypatch.setattr(get_today_notes, "list_notes_for_date", db.list_notes_for_date)
+    body = json.loads(get_today_notes.handler({"queryStringParameters": {"fresh": "1"}}, None)["body"])
+    assert [it["id"] for it in body["items"]] == ["a"]
+
+    monkeypatch.setattr(get_today_notes, "DAILY_FEED_ENABLED", False)
+    monkeypatch.setattr(get_today_notes, "list_notes_for_date", lambda *_a, **_k: ([], None))
+    LISTING_CACHE.clear()
+    body = json.loads(get_today_notes.handler({"queryStringParameters": {}}, None)["body"])
+    assert body["items"] == []
+
+
+class _FakeClient:
+    def __init__(self, failures=()):
+        self.calls = []
+        self.failures = list(failures)
+
+    def update_item(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.failures:
+            error = self.failures.pop(0)
+            raise store_module.ClientError(error, "UpdateItem")
+        return {}
+
+
+class _FakeTable:
+    name = "notes"
+
+    def __init__(self, client):
+        self.meta = type("Meta", (), {"client": client})()
+
+
+def _stored_feed(revisions):
+    notes = {note_id: {"M": {"revision": {"N": str(rev)}}} for note_id, rev in revisions.items()}
+    return {
+        "Error": {"Code": "ConditionalCheckFailedException"},
+        "Item": {"id": {"S": "feed#d"}, "complete": {"BOOL": True}, "notes": {"M": notes}},
+    }
+
+
+def test_dynamo_update_feed_writes_only_entries_that_are_not_older():
+    client = _FakeClient()
+    store = DynamoNotesStore(table_factory=lambda: _FakeTable(client))
+    entries = {"a": {"id": "a", "revision": 2}, "b": {"revision": 3, "deleted": True}}
+
+    assert store.update_feed("feed#d", entries) is FeedUpdate.APPLIED
+    call = client.calls[0]
+    assert call["UpdateExpression"] == "SET #notes.#e0 = :e0, #notes.#e1 = :e1 ADD #version :one"
+    assert call["ConditionExpression"] == (
+        "attribute_exists(id) AND #complete = :true"
+        " AND (attribute_not_exists(#notes.#e0.#rev) OR #notes.#e0.#rev <= :r0)"
+        " AND (attribute_not_exists(#notes.#e1.#rev) OR #notes.#e1.#rev <= :r1)"
+    )
+    assert call["ExpressionAttributeNames"]["#e1"] == "b" and call["ExpressionAttributeValues"][":r1"] == 3
+
+    # "b" is already stored at a newer revision: the retry writes "a" alone.
+    client.calls.clear()
+    client.failures = [_stored_feed({"b": 4})]
+    assert store.update_feed("feed#d", entries) is FeedUpdate.APPLIED
+    assert len(client.calls) == 2 and client.calls[1]["ExpressionAttributeNames"]["#e0"] == "a"
+    assert "#e1" not in client.calls[1]["ExpressionAttributeNames"]
+
+    client.calls.clear()
+    client.failures = [_stored_feed({"a": 5, "b": 4})]
+    assert store.update_feed("feed#d", entries) is FeedUpdate.APPLIED and len(client.calls) == 1
+
+    client.failures = [{"Error": {"Code": "ConditionalCheckFailedException"}}]
+    assert store.update_feed("feed#d", entries) is FeedUpdate.MISSING
+    client.failures = [{"Error": {"Code": "ValidationException", "Message": "Item size has exceeded the maximum allowed size"}}]
+    assert store.update_feed("feed#d", entries) is FeedUpdate.TOO_LARGE
@@ -0,0 +1,122 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+import handlers.api.get_gratitude_notes_range as get_range  # noqa: E402
+import notes.db as db  # noqa: E402
+import notes.range as range_module  # noqa: E402
+from notes.range import date_span, fetch_range_page  # noqa: E402
+from notes.store import InMemoryNotesStore, set_store  # noqa: E402
+
+
+@pytest.fixture()
+def store():
+    mem = InMemoryNotesStore(clock=lambda: 0.0)
+    set_store(mem)
+    yield mem
+    set_store(None)
+
+
+def _put(store, note_id, date, created_at, status="active"):
+    store.put_item({
+        "id": note_id, "name": "N", "email": "a@x.com", "gratitude_text": "t", "status": status,
+        "date": date, "created_at": created_at, "owner_token": "secret",
+    })
+
+
+def test_date_span_is_inclusive_and_newest_first():
+    assert date_span("2024-02-28", "2024-03-01") == ["2024-03-01", "2024-02-29", "2024-02-28"]
+
+
+def test_pages_merge_partitions_by_created_at():
+    # Overlapping clocks across partitions still come out in one created_at order.
+    partitions = {
+        "d1": [{"id": "a", "created_at": 9}, {"id": "b", "created_at": 5}, {"id": "c", "created_at": 1}],
+        "d2": [{"id": "x", "created_at": 8}, {"id": "y", "created_at": 7}],
+    }
+    calls = []
+
+    def fetch_page(d, start_key, limit):
+        calls.append((d, start_key, limit))
+        items = partitions[d]
+        if start_key:
+            items = [it for it in items if it["created_at"] < start_key["created_at"]]
+        return items[:limit], ({"id": items[limit - 1]["id"]} if len(items) > limit else None)
+
+    items, positions = fetch_range_page(dict.fromkeys(partitions), limit=3, fetch_page=fetch_page, max_workers=2)
+    assert [it["id"] for it in items] == ["a", "x", "y"]
+    # d2 was read to its end; d1 resumes after its last taken note.
+    assert positions == {"d1": {"id": "a", "date": "d1", "created_at": 9}}
+    # Each partition is asked for its share of the page, not the whole page.
+    assert sorted(calls) == [("d1", None, 2), ("d2", None, 2)]
+
+    items, positions = fetch_range_page(positions, limit=3, fetch_page=fetch_page, max_workers=2)
+    assert [it["id"] for it in items] == ["b", "c"] and positions == {}
+
+
+def test_a_busy_partition_is_read_again_for_only_what_the_page_needs():
+    partitions = {f"d{n}": [] for n in range(4)}
+    partitions["d0"] = [{"id": f"a{n}", "created_at": 100 - n} for n in range(10)]
+    partitions["d3"] = [{"id": "old", "created_at": 1}]
+    calls = []
+
+    def fetch_page(d, start_key, limit):
+        calls.append((d, limit))
+        items = partitions[d]
+        if start_key:
+            items = [it for it in items if it["created_at"] < start_key["created_at"]]
+        last = items[limit - 1] if len(items) > limit else None
+        return items[:limit], ({"id": last["id"], "created_at": last["created_at"]} if last else None)
+
+    items, positions = fetch_range_page(dict.fromkeys(partitions), limit=8, fetch_page=fetch_page, max_workers=4)
+    assert [it["id"] for it in items] == [f"a{n}" for n in range(8)]
+    assert sorted(calls) == [("d0", 2), ("d0", 6), ("d1", 2), ("d2", 2), ("d3", 2)]
+    assert set(positions) == {"d0", "d3"} and positions["d3"] is None
+    assert sum(limit for _, limit in calls) == 14
+
+
+def test_pools_are_kept_per_size():
+    assert range_module._pool(2) is range_module._pool(2)
+    assert range_module._pool(3)._max_workers == 3
+
+
+def test_cursor_walks_the_whole_range_once(store):
+    for day in range(1, 4):
+        for n in range(3):
+            _put(store, f"d{day}-{n}", f"2024-01-0{day}", day * 100 + n)
+    _put(store, "outside", "2024-01-04", 999)
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = db.list_notes_for_range("2024-01-01", "2024-01-03", limit=4, cursor=cursor)
+        seen.extend(it["id"] for it in items)
+        if cursor is None:
+            break
+    expected = [f"d{day}-{n}" for day in (3, 2, 1) for n in (2, 1, 0)]
+    assert seen == expected
+
+    _, cursor = db.list_notes_for_range("2024-01-01", "2024-01-03", limit=1)
+    with pytest.raises(db.InvalidCursorError):
+        db.list_notes_for_range("2024-01-01", "2024-01-02", limit=1, cursor=cursor)
+
+
+def test_range_handler_validates_and_skips_deleted(store):
+    _put(store, "a", "2024-01-01", 1)
+    _put(store, "b", "2024-01-02", 2, status="deleted")
+
+    resp = get_range.handler({"queryStringParameters": {"from": "2024-01-01", "to": "2024-01-02"}}, None)
+    assert resp["statusCode"] == 200
+    body = json.loads(resp["body"])
+    assert [(it["id"], it["date"]) for it in body["items"]] == [("a", "2024-01-01")]
+    assert body["next_cursor"] is None
+
+    for query in ({"from": "2024-01-01"}, {"from": "2024-01-02", "to": "2024-01-01"},
+                  {"from": "2024-01-01", "to": "2024-03-01"}, {"from": "2024-01-01", "to": "2024-01-02", "cursor": "x"}):
+        assert get_range.handler({"queryStringParameters": query}, None)["statusCode"] == 400
@@ -0,0 +1,305 @@
+import json
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+import notes.db as db  # noqa: E402
+from notes.store import (  # noqa: E402
+    DeleteOutcome,
+    DynamoNotesStore,
+    InMemoryNotesStore,
+    NoteAlreadyExistsError,
+    UpdateOutcome,
+    set_store,
+)
+
+
+def _note(note_id, *, date="2024-01-01", created_at=100, email="a@x.com", **extra):
+    return {
+        "id": note_id,
+        "name": "N",
+        "email": email,
+        "gratitude_text": "text",
+        "status": "active",
+        "date": date,
+        "created_at": created_at,
+        "owner_token": "secret",
+        "ttl": 10_000,
+        **extra,
+    }
+
+
+@pytest.fixture()
+def store():
+    mem = InMemoryNotesStore(clock=lambda: 0.0)
+    set_store(mem)
+    yield mem
+    set_store(None)
+
+
+def test_put_is_conditional_and_numbers_come_back_as_decimal(store):
+    store.put_item(_note("a"))
+    with pytest.raises(NoteAlreadyExistsError):
+        store.put_item(_note("a"))
+    assert store.get_item("a")["created_at"] == Decimal(100)
+    with pytest.raises(TypeError):
+        store.put_item(_note("b", created_at=1.5))
+
+
+def test_query_date_paginates_newest_first_with_since(store):
+    for i in range(5):
+        store.put_item(_note(f"n{i}", created_at=100 + i))
+    store.put_item(_note("other", date="2024-01-02"))
+
+    items, last_key = store.query_date("2024-01-01", limit=2, newest_first=True)
+    assert [it["id"] for it in items] == ["n4", "n3"]
+    items, last_key = store.query_date("2024-01-01", limit=2, newest_first=True, start_key=last_key)
+    assert [it["id"] for it in items] == ["n2", "n1"]
+    items, last_key = store.query_date("2024-01-01", limit=2, newest_first=True, start_key=last_key)
+    assert [it["id"] for it in items] == ["n0"]
+    assert last_key is None
+
+    items, _ = store.query_date("2024-01-01", since=102, attributes=("id",))
+    assert items == [{"id": "n3"}, {"id": "n4"}]
+
+
+def test_query_date_splits_pages_at_size_limit():
+    mem = InMemoryNotesStore(max_page_bytes=300)
+    for i in range(4):
+        mem.put_item(_note(f"n{i}", created_at=100 + i, gratitude_text="x" * 100))
+    items, last_key = mem.query_date("2024-01-01")
+    assert 0 < len(items) < 4
+    assert last_key is not None
+
+
+def test_query_email_respects_date_bounds(store):
+    store.put_item(_note("d1", date="2024-01-01"))
+    store.put_item(_note("d2", date="2024-01-02"))
+    store.put_item(_note("d3", date="2024-01-03"))
+    store.put_item(_note("x", date="2024-01-02", email="b@x.com"))
+
+    items, _ = store.query_email("a@x.com", date_from="2024-01-02", date_to="2024-01-03", newest_first=True)
+    assert [it["id"] for it in items] == ["d3", "d2"]
+
+
+def test_ttl_sweep_removes_expired_items():
+    now = [0.0]
+    mem = InMemoryNotesStore(clock=lambda: now[0], ttl_sweep_seconds=1)
+    mem.put_item(_note("old", ttl=5))
+    mem.put_item(_note("new", ttl=50))
+    now[0] = 10.0
+    mem.put_item(_note("later", created_at=200, ttl=100))  # writes trigger the periodic sweep
+    assert mem.get_item("old") is None
+    assert [it["id"] for it in mem.query_date("2024-01-01")[0]] == ["new", "later"]
+
+
+def test_db_listing_runs_on_memory_backend(store):
+    for i in range(3):
+        store.put_item(_note(f"n{i}", created_at=100 + i))
+
+    items, cursor = db.list_notes_for_date("2024-01-01", limit=2)
+    assert [it["id"] for it in items] == ["n2", "n1"]
+    assert "owner_token" not in items[0]
+    items, cursor = db.list_notes_for_date("2024-01-01", limit=2, cursor=cursor)
+    assert [it["id"] for it in items] == ["n0"]
+    assert cursor is None
+
+    assert db.archive_notes_by_date("2024-01-01") == 3
+    assert store.get_item("n0")["status"] == "deleted"
+
+
+def test_update_by_id_is_a_single_conditional_write(store):
+    store.put_item(_note("a"))
+    store.put_item(_note("gone", status="deleted"))
+
+    item, created = db.create_or_update_note({"gratitude_text": "new"}, date_str="2024-01-01", note_id="a",
+                                             now_iso="t1")
+    assert not created
+    assert item["gratitude_text"] == "new" and item["updated_at_iso"] == "t1" and item["name"] == "N"
+
+    outcome, unchanged = db.update_note_text("a", "new", now_iso="t2")
+    assert outcome is UpdateOutcome.UNCHANGED and unchanged["updated_at_iso"] == "t1"
+    _, created = db.create_or_update_note({"gratitude_text": "new"}, date_str="2024-01-01", note_id="a")
+    assert created is None
+
+    with pytest.raises(ValueError, match="not found"):
+        db.create_or_update_note({"gratitude_text": "x"}, date_str="2024-01-01", note_id="missing")
+    with pytest.raises(ValueError, match="is deleted"):
+        db.create_or_update_note({"gratitude_text": "x"}, date_str="2024-01-01", note_id="gone")
+    assert "missing" not in {i["id"] for i in store.query_date("2024-01-01")[0]}
+
+
+def test_list_notes_for_email_pages_one_authors_range(store):
+    for day in range(1, 6):
+        store.put_item(_note(f"a{day}", date=f"2024-01-0{day}", email="a@x.com"))
+    store.put_item(_note("other", date="2024-01-03", email="b@x.com"))
+
+    items, cursor = db.list_notes_for_email("a@x.com", date_from="2024-01-02", date_to="2024-01-04", limit=2)
+    assert [i["date"] for i in items] == ["2024-01-04", "2024-01-03"]
+    assert "owner_token" not in items[0] and "ttl" not in items[0]
+    rest, cursor = db.list_notes_for_email("a@x.com", date_from="2024-01-02", date_to="2024-01-04", limit=2, cursor=cursor)
+    assert [i["id"] for i in rest] == ["a2"] and cursor is None
+
+    _, cursor = db.list_notes_for_email("a@x.com", limit=1)
+    with pytest.raises(db.InvalidCursorError):
+        db.list_notes_for_email("b@x.com", cursor=cursor)
+
+
+class _FakeClient:
+    def __init__(self, error_item=None):
+        self.calls = []
+        self.error_item = error_item
+
+    def update_item(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.error_item is not None:
+            raise ClientError(
+                {"Error": {"Code": "ConditionalCheckFailedException"}, "Item": self.error_item},
+                "UpdateItem",
+            )
+        return {"Attributes": {"id": kwargs["Key"]["id"], "gratitude_text": "new"}}
+
+
+class _FakeTable:
+    name = "notes"
+
+    def __init__(self, client):
+        self.meta = type("Meta", (), {"client": client})()
+
+
+def test_dynamo_update_active_maps_condition_failures():
+    client = _FakeClient()
+    store = DynamoNotesStore(table_factory=lambda: _FakeTable(client))
+
+    outcome, item = store.update_active("a", {"gratitude_text": "new"}, unless_equal=("gratitude_text",))
+    assert outcome is UpdateOutcome.UPDATED and item["gratitude_text"] == "new"
+    call = client.calls[0]
+    assert call["ReturnValues"] == "ALL_NEW" and call["ReturnValuesOnConditionCheckFailure"] == "ALL_OLD"
+    assert call["ConditionExpression"].startswith("attribute_exists(id) AND #status <> :deleted AND (")
+
+    client.error_item = {"id": {"S": "a"}, "status": {"S": "deleted"}, "created_at": {"N": "5"}}
+    outcome, item = store.update_active("a", {"gratitude_text": "new"})
+    assert outcome is UpdateOutcome.DELETED and item["created_at"] == Decimal(5)
+
+    client.error_item = {}
+    assert store.update_active("a", {"gratitude_text": "new"}) == (UpdateOutcome.NOT_FOUND, None)
+
+
+def test_delete_with_token_outcomes(store):
+    store.put_item(_note("a", owner_token="tok"))
+
+    assert db.delete_note_with_token("a", "wrong")[0] is DeleteOutcome.BAD_TOKEN
+    outcome, item = db.delete_note_with_token("a", "tok", now_iso="t1")
+    assert outcome is DeleteOutcome.DELETED and item["deleted_at"] == "t1" and item["date"] == "2024-01-01"
+    assert item["revision"] == 1
+    assert db.delete_note_with_token("a", "tok")[0] is DeleteOutcome.ALREADY_DELETED
+    assert db.delete_note_with_token("missing", "tok") == (DeleteOutcome.NOT_FOUND, None)
+
+
+class _FlakyBatchStore(InMemoryNotesStore):
+    """Leaves the last item of every first attempt unprocessed and throttles one call."""
+
+    def __init__(self, *, always_unprocessed=False):
+        super().__init__(clock=lambda: 0.0)
+        self.batches = []
+        self.always_unprocessed = always_unprocessed
+
+    def batch_put(self, items):
+        self.batches.append([it["id"] for it in items])
+        if len(self.batches) == 2:
+            raise ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "BatchWriteItem")
+        if self.always_unprocessed:
+            return list(items)
+        if len(items) > 1:
+            super().batch_put(items[:-1])
+            return list(items[-1:])
+        return super().batch_put(items)
+
+
+def test_create_notes_batch_chunks_and_retries_unprocessed():
+    store = _FlakyBatchStore()
+    set_store(store)
+    try:
+        notes = [{"name": "N", "email": f"u{n}@x.com", "gratitude_text": f"t{n}"} for n in range(60)]
+        results = db.create_notes_batch(notes, date_str="2024-01-01", base_delay=0)
+    finally:
+        set_store(None)
+
+    assert [item["email"] for item, _ in results] == [n["email"] for n in notes]
+    assert all(ok for _, ok in results) and len(store) == 60
+    assert max(len(batch) for batch in store.batches) == 25
+    # The throttled call and every unprocessed leftover were retried.
+    assert store.batches[1] == store.batches[2] == store.batches[0][-1:]
+    assert [len(batch) for batch in store.batches] == [25, 1, 1, 25, 1, 10, 1]
+
+
+def test_create_notes_batch_reports_items_left_after_max_attempts():
+    store = _FlakyBatchStore(always_unprocessed=True)
+    set_store(store)
+    try:
+        results = db.create_notes_batch(
+            [{"name": "N", "email": "a@x.com", "gratitude_text": "t"}], date_str="2024-01-01",
+            max_attempts=3, base_delay=0,
+        )
+    finally:
+        set_store(None)
+    assert [ok for _, ok in results] == [False] and len(store.batches) == 3
+
+
+def test_dynamo_batch_put_returns_unprocessed_items():
+    class BatchClient:
+        def __init__(self):
+            self.calls = []
+
+        def batch_write_item(self, **kwargs):
+            self.calls.append(kwargs)
+            requests = kwargs["RequestItems"]["notes"]
+            return {"UnprocessedItems": {"notes": requests[1:]}}
+
+    client = BatchClient()
+    store = DynamoNotesStore(table_factory=lambda: _FakeTable(client))
+    left = store.batch_put([_note("a"), _note("b")])
+    assert [it["id"] for it in left] == ["b"]
+    assert client.calls[0]["RequestItems"]["notes"][0] == {"PutRequest": {"Item": _note("a")}}
+    assert store.batch_put([]) == [] and len(client.calls) == 1
+
+
+class _Raw:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **_kwargs):
+        yield self.body
+
+
+def test_dynamo_queries_go_through_the_thread_safe_client():
+    requests = []
+
+    def reply(request, **_kwargs):
+        requests.append(json.loads(request.body))
+        body = {"Items": [{"id": {"S": "n1"}, "created_at": {"N": "5"}}], "Count": 1}
+        return AWSResponse(request.url, 200, {}, _Raw(json.dumps(body).encode()))
+
+    # A session of its own, clear of hooks other tests install on the default one.
+    resource = boto3.session.Session().resource(
+        "dynamodb", region_name="eu-west-1", aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    resource.meta.client.meta.events.register("before-send", reply)
+    table = resource.Table("notes")
+    table.query = None  # the resource is not thread-safe; range pages must not use it
+
+    items, last_key = DynamoNotesStore(table_factory=lambda: table).query_date("2024-01-01", limit=2)
+    assert items == [{"id": "n1", "created_at": 5}] and last_key is None
+    sent = requests[0]
+    assert sent["TableName"] == "notes" and sent["Limit"] == 2
+    assert sent["ExpressionAttributeValues"] == {":v0": {"S": "2024-01-01"}}
@@ -0,0 +1,157 @@
+import sys
+from pathlib import Path
+
+import pytest
+from botocore.exceptions import ClientError
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+from shared.admission import (  # noqa: E402
+    AdmissionController,
+    DynamoWindowCounters,
+    InMemoryWindowCounters,
+    Rule,
+)
+
+
+class _CountingCounters(InMemoryWindowCounters):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def reserve(self, key, amount, limit, expires_at, *, minimum=1):
+        self.calls += 1
+        return super().reserve(key, amount, limit, expires_at, minimum=minimum)
+
+
+@pytest.fixture()
+def now():
+    return [1000.0]
+
+
+def _controller(now, counters, limit=3, window=60, lease=1):
+    return AdmissionController(
+        {"ip": Rule(limit, window)}, counters=counters, lease_tokens=lease, clock=lambda: now[0]
+    )
+
+
+def test_shared_counter_limits_and_rejections_are_cached(now):
+    counters = _CountingCounters()
+    shared = _controller(now, counters)
+    # Another container: same shared counters, its own local state.
+    other = _controller(now, counters)
+
+    assert [shared.check(ip="a").allowed for _ in range(2)] == [True, True]
+    assert other.check(ip="a").allowed
+    decision = other.check(ip="a")
+    assert not decision.allowed and decision.scope == "ip" and decision.retry_after == 20
+    calls = counters.calls
+
+    # Retries inside the window are rejected without touching the counters.
+    assert not other.check(ip="a").allowed
+    assert counters.calls == calls
+    assert shared.check(ip="b").allowed
+
+    now[0] = 1200.0  # next window
+    assert other.check(ip="a").allowed
+
+
+def test_leases_admit_locally_and_never_exceed_the_shared_limit(now):
+    counters = _CountingCounters()
+    first = _controller(now, counters, limit=10, lease=4)
+    second = _controller(now, counters, limit=10, lease=4)
+
+    assert all(first.check(ip="a").allowed for _ in range(4))
+    assert all(second.check(ip="a").allowed for _ in range(4))
+    assert counters.calls == 2
+    # 8 of 10 are leased: a lease of 4 no longer fits, so single tokens are handed out.
+    assert first.check(ip="a").allowed and first.check(ip="a").allowed
+    assert not first.check(ip="a").allowed
+    assert not second.check(ip="a").allowed
+    assert counters.calls == 6
+
+
+def test_local_bucket_rejects_bursts_before_the_counter(now):
+    counters = _CountingCounters()
+    controller = _controller(now, counters, limit=2, window=10, lease=5)
+
+    assert controller.check(ip="a").allowed and controller.check(ip="a").allowed
+    decision = controller.check(ip="a")
+    assert not decision.allowed and decision.retry_after == 5
+    # One lease of both tokens covered the two admitted requests.
+    assert counters.calls == 1
+    # Unknown scopes and missing values are not limited.
+    assert controller.check(email="x@y.z", ip=None).allowed
+
+
+def test_costly_requests_take_that_many_tokens(now):
+    counters = _CountingCounters()
+    controller = AdmissionController(
+        {"ip": Rule(10, 60), "email": Rule(3, 60)}, counters=counters, lease_tokens=2, clock=lambda: now[0]
+    )
+
+    assert controller.charge([("ip", "a", 6), ("email", "x", 2), ("email", "y", 1)]).allowed
+    decision = controller.charge([("ip", "a", 5)])
+    assert not decision.allowed and decision.scope == "ip"
+    # A costly rejection is not cached: a smaller request still fits.
+    assert controller.charge([("ip", "a", 4)]).allowed
+    assert not controller.charge([("email", "x", 4)]).allowed
+    assert controller.check(email="x").allowed
+
+
+def test_a_rejection_refunds_the_scopes_already_charged(now):
+    counters = _CountingCounters()
+    controller = AdmissionController(
+        {"ip": Rule(10, 60), "email": Rule(3, 60)}, counters=counters, lease_tokens=1, clock=lambda: now[0]
+    )
+    assert controller.charge([("email", "y", 2)]).allowed
+
+    # x passes, y has one token left: the request is turned away and x keeps all three.
+    decision = controller.charge([("email", "x", 3), ("email", "y", 2), ("ip", "a", 5)])
+    assert not decision.allowed and decision.scope == "email"
+    # The same goes when the IP rejects after every email passed.
+    assert not controller.charge([("email", "z", 2), ("ip", "a", 11)]).allowed
+    calls = counters.calls
+
+    # The refunded tokens come back from this container's lease, without another reservation.
+    assert controller.charge([("email", "x", 3), ("email", "z", 2), ("ip", "a", 5)]).allowed
+    assert counters.calls == calls + 1  # only the IP, which had not been charged before
+
+
+def test_counter_errors_fail_open(now):
+    class Broken(InMemoryWindowCounters):
+        def reserve(self, key, amount, limit, expires_at, *, minimum=1):
+            raise RuntimeError("table unavailable")
+
+    controller = _controller(now, Broken(), limit=1)
+    assert controller.check(ip="a").allowed
+
+
+def test_dynamo_counter_leases_with_one_conditional_add():
+    class FakeTable:
+        def __init__(self):
+            self.calls = []
+            self.failures = 0
+
+        def update_item(self, **kwargs):
+            self.calls.append(kwargs)
+            if self.failures:
+                self.failures -= 1
+                raise ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem")
+
+    table = FakeTable()
+    counters = DynamoWindowCounters(table_factory=lambda: table)
+    assert counters.reserve("admission#ip#abc#960", 5, 30, 1080) == 5
+    call = table.calls[0]
+    assert call["UpdateExpression"] == "ADD #n :n SET #ttl = if_not_exists(#ttl, :ttl)"
+    assert call["ConditionExpression"] == "attribute_not_exists(#n) OR #n <= :room"
+    assert call["ExpressionAttributeValues"] == {":n": 5, ":room": 25, ":ttl": 1080}
+
+    table.failures = 1
+    assert counters.reserve("admission#ip#abc#960", 5, 30, 1080) == 1
+    assert table.calls[-1]["ExpressionAttributeValues"][":room"] == 29
+    table.failures = 2
+    assert counters.reserve("admission#ip#abc#960", 5, 30, 1080) == 0
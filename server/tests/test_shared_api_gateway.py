@@ -0,0 +1,74 @@
+import base64
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+from shared import api_gateway  # noqa: E402
+from shared.api_gateway import json_response, load_json_body, negotiate_encoding  # noqa: E402
+from shared.cache import COMPRESSED_BODIES  # noqa: E402
+
+BIG_BODY = {"items": [{"gratitude_text": "Grateful for sunny mornings " * 4, "n": i} for i in range(50)]}
+
+
+@pytest.fixture(autouse=True)
+def _gzip_only(monkeypatch):
+    monkeypatch.setattr(api_gateway, "brotli", None)
+    COMPRESSED_BODIES.clear()
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("GZIP;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+        ("br", None),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_large_body_is_gzipped_with_weak_etag():
+    event = {"headers": {"accept-encoding": "gzip, br", "accept": "application/json"}}
+    resp = json_response(200, BIG_BODY, {"ETag": '"abc"'}, event=event)
+
+    assert resp["isBase64Encoded"] is True
+    assert resp["headers"]["Content-Encoding"] == "gzip"
+    assert resp["headers"]["Vary"] == "Accept, Accept-Encoding"
+    assert resp["headers"]["ETag"] == 'W/"abc"'
+    raw = gzip.decompress(base64.b64decode(resp["body"]))
+    assert json.loads(raw) == BIG_BODY
+    assert len(resp["body"]) < len(json.dumps(BIG_BODY)) / 3
+
+
+def test_small_or_unaccepted_bodies_stay_plain():
+    accepted = {"headers": {"Accept-Encoding": "gzip", "Accept": "application/json"}}
+    small = json_response(200, {"ok": True}, event=accepted)
+    assert "isBase64Encoded" not in small and "Content-Encoding" not in small["headers"]
+
+    plain = json_response(200, BIG_BODY, event={"headers": {}})
+    assert json.loads(plain["body"]) == BIG_BODY
+    assert plain["headers"]["Vary"] == "Accept, Accept-Encoding"
+
+    # API Gateway would pass the base64 text through for */*, so only the JSON client gets compression.
+    for accept in ("*/*", "text/html, application/json"):
+        resp = json_response(200, BIG_BODY, event={"headers": {"Accept-Encoding": "gzip", "Accept": accept}})
+        assert "isBase64Encoded" not in resp and json.loads(resp["body"]) == BIG_BODY
+
+
+def test_base64_request_body_is_decoded():
+    body = base64.b64encode(b'{"feedback": "hi"}').decode("ascii")
+    assert load_json_body({"body": body, "isBase64Encoded": True}) == {"feedback": "hi"}
+    assert load_json_body({"body": "%%%", "isBase64Encoded": True}) == {}
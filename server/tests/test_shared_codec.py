@@ -0,0 +1,43 @@
+import json
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+from shared import codec  # noqa: E402
+from shared.api_gateway import load_json_body  # noqa: E402
+
+
+def _backends():
+    backends = [codec._stdlib_dumps]
+    if codec.orjson is not None:
+        backends.append(codec._orjson_dumps)
+    return backends
+
+
+@pytest.mark.parametrize("dumps", _backends())
+def test_decimals_encode_as_numbers(dumps):
+    item = {"created_at": Decimal("1700000000"), "ttl": Decimal("1700604800"), "score": Decimal("0.5")}
+    assert json.loads(dumps(item)) == {"created_at": 1700000000, "ttl": 1700604800, "score": 0.5}
+
+
+@pytest.mark.parametrize("dumps", _backends())
+def test_backends_produce_identical_output(dumps):
+    value = {"b": [1, "é", None, True], "a": {"n": Decimal("3")}}
+    assert dumps(value, sort_keys=True) == '{"a":{"n":3},"b":[1,"é",null,true]}'
+
+
+def test_unserializable_values_raise_type_error():
+    with pytest.raises(TypeError):
+        codec.dumps({"x": object()})
+
+
+def test_invalid_body_is_treated_as_empty():
+    assert load_json_body({"body": "{not json"}) == {}
+    assert load_json_body({"body": '{"name": "Ann"}'}) == {"name": "Ann"}
@@ -0,0 +1,72 @@
+import json
+import sys
+from pathlib import Path
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+from shared import event_bus  # noqa: E402
+from shared.event_bus import EventPublisher  # noqa: E402
+from shared.invocation import invocation  # noqa: E402
+
+
+class FakeEventsClient:
+    """Records PutEvents calls; fail_first marks that many entries of the first call as throttled."""
+
+    def __init__(self, fail_first=0):
+        self.calls = []
+        self.fail_first = fail_first
+
+    def put_events(self, Entries):
+        self.calls.append([json.loads(e["Detail"])["n"] for e in Entries])
+        failed, self.fail_first = self.fail_first, 0
+        statuses = [
+            {"ErrorCode": "ThrottlingException"} if i < failed else {"EventId": f"e{i}"}
+            for i in range(len(Entries))
+        ]
+        return {"FailedEntryCount": failed, "Entries": statuses}
+
+
+def _publisher(client):
+    return EventPublisher(client_factory=lambda: client, bus_name="bus", base_delay=0)
+
+
+def test_flush_sends_batches_of_ten():
+    client = FakeEventsClient()
+    publisher = _publisher(client)
+    for n in range(23):
+        publisher.publish("gratitude.note.created", {"n": n})
+
+    result = publisher.flush()
+
+    assert [len(c) for c in client.calls] == [10, 10, 3]
+    assert result.sent == 23 and result.calls == 3 and not result.failed
+    assert publisher.pending() == 0
+
+
+def test_only_failed_entries_are_retried():
+    client = FakeEventsClient(fail_first=2)
+    publisher = _publisher(client)
+    for n in range(5):
+        publisher.publish("gratitude.note.created", {"n": n})
+
+    result = publisher.flush()
+
+    assert client.calls == [[0, 1, 2, 3, 4], [0, 1]]
+    assert result.sent == 5 and result.retried == 2 and not result.failed
+
+
+def test_invocation_end_flushes_shared_publisher(monkeypatch):
+    client = FakeEventsClient()
+    monkeypatch.setattr(event_bus.PUBLISHER, "_client", lambda: client)
+
+    @invocation
+    def handler(event, _context):
+        event_bus.PUBLISHER.publish("gratitude.note.deleted", {"n": event["n"]})
+        assert client.calls == []
+        return {"statusCode": 200}
+
+    assert handler({"n": 7}, None) == {"statusCode": 200}
+    assert client.calls == [[7]]
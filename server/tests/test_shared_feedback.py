@@ -0,0 +1,89 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from botocore.exceptions import ClientError
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+import handlers.api.email_feedback as email_feedback  # noqa: E402
+import handlers.events.send_feedback as send_feedback  # noqa: E402
+import shared.feedback as feedback  # noqa: E402
+from shared.admission import ADMISSION, InMemoryWindowCounters  # noqa: E402
+
+
+def _throttled():
+    return ClientError({"Error": {"Code": "Throttling", "Message": "Maximum sending rate exceeded."}}, "SendEmail")
+
+
+class _Outbox:
+    def __init__(self, failures=()):
+        self.sent = []
+        self.failures = list(failures)
+
+    def __call__(self, html, text):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((html, text))
+
+
+@pytest.fixture()
+def queue(monkeypatch):
+    mem = feedback.InMemoryFeedbackQueue()
+    monkeypatch.setattr(feedback, "QUEUE", mem)
+    monkeypatch.setattr(email_feedback, "SENDER_EMAIL", "dev@example.com")
+    monkeypatch.setattr(send_feedback, "SENDER_EMAIL", "dev@example.com")
+    monkeypatch.setattr(ADMISSION, "counters", InMemoryWindowCounters())
+    ADMISSION.reset()
+    return mem
+
+
+def test_feedback_is_accepted_with_202_and_sent_as_one_digest(monkeypatch, queue):
+    outbox = _Outbox()
+    monkeypatch.setattr(send_feedback, "SENDER", feedback.FeedbackSender(send=outbox, base_delay=0))
+    monkeypatch.setattr(send_feedback, "FEEDBACK_DIGEST", True)
+
+    for text in ("first <b>idea</b>", "second idea"):
+        resp = email_feedback.handler({"body": json.dumps({"feedback": text})}, None)
+        assert resp["statusCode"] == 202
+    assert email_feedback.handler({"body": json.dumps({"feedback": " "})}, None)["statusCode"] == 400
+    assert outbox.sent == []
+
+    result = send_feedback.handler({"Records": queue.drain()}, None)
+    assert result == {"batchItemFailures": []}
+    assert len(outbox.sent) == 1
+    html, text = outbox.sent[0]
+    assert "New Feedback (2)" in html and "first &lt;b&gt;idea&lt;/b&gt;" in html
+    assert "first <b>idea</b>" in text and "second idea" in text
+
+
+def test_throttled_sends_back_off_and_leftovers_are_redelivered(queue):
+    submissions = [feedback.Submission(f"m{n}", f"text {n}", "t") for n in range(3)]
+
+    outbox = _Outbox([_throttled(), _throttled()])
+    report = feedback.FeedbackSender(send=outbox, max_attempts=3, base_delay=0).deliver(submissions, digest=False)
+    assert report.emails == 3 and report.throttle_retries == 2 and report.failed == []
+
+    # Still throttled after max_attempts: that email and every later one go back to the queue.
+    outbox = _Outbox([_throttled()] * 3)
+    sender = feedback.FeedbackSender(send=outbox, max_attempts=3, base_delay=0)
+    assert sender.deliver(submissions, digest=False).failed == ["m0", "m1", "m2"]
+    assert sender.deliver(submissions, digest=True).failed == []
+
+    outbox = _Outbox([ClientError({"Error": {"Code": "MessageRejected"}}, "SendEmail")])
+    report = feedback.FeedbackSender(send=outbox, base_delay=0).deliver(submissions, digest=True)
+    assert report.failed == ["m0", "m1", "m2"] and report.throttle_retries == 0
+
+
+def test_worker_reports_failures_and_drops_malformed_messages(monkeypatch, queue):
+    outbox = _Outbox([_throttled()] * 2)
+    monkeypatch.setattr(send_feedback, "SENDER", feedback.FeedbackSender(send=outbox, max_attempts=2, base_delay=0))
+    feedback.enqueue_feedback("hello", "t")
+    records = queue.drain() + [{"messageId": "bad", "body": "not json"}]
+
+    result = send_feedback.handler({"Records": records}, None)
+    assert result == {"batchItemFailures": [{"itemIdentifier": records[0]["messageId"]}]}
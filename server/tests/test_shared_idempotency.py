@@ -0,0 +1,106 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from botocore.exceptions import ClientError
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+import shared.idempotency as idempotency  # noqa: E402
+from shared.idempotency import (  # noqa: E402
+    COMPLETED,
+    PENDING,
+    DynamoIdempotencyStore,
+    InMemoryIdempotencyStore,
+    idempotent,
+)
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    mem = InMemoryIdempotencyStore()
+    monkeypatch.setattr(idempotency, "STORE", mem)
+    idempotency.RESPONSES.clear()
+    yield mem
+    idempotency.RESPONSES.clear()
+
+
+def _event(key, body):
+    return {"headers": {"idempotency-key": key}, "body": json.dumps(body)}
+
+
+def test_failed_requests_release_the_key():
+    statuses = iter([500, 201])
+
+    @idempotent("test")
+    def handler(event, _context):
+        return {"statusCode": next(statuses), "headers": {}, "body": "{}"}
+
+    assert handler(_event("k", {"a": 1}), None)["statusCode"] == 500
+    assert handler(_event("k", {"a": 1}), None)["statusCode"] == 201
+    assert handler(_event("k", {"a": 1}), None)["headers"]["Idempotent-Replayed"] == "true"
+
+
+def test_in_flight_claims_conflict_until_their_lock_lapses(store):
+    store.claim("idem#x", "fp", now=1000)
+    assert store.claim("idem#x", "fp", now=1001)["state"] == PENDING
+    # The first invocation died; its claim lapses after the lock.
+    assert store.claim("idem#x", "fp", now=1000 + idempotency.IDEMPOTENCY_LOCK_SECONDS + 1) is None
+    store.complete("idem#x", "fp", 201, "{}", now=1100)
+    assert store.claim("idem#x", "fp", now=1200)["state"] == COMPLETED
+    # An expired record is claimable again, whether or not it was swept yet.
+    assert store.claim("idem#x", "fp", now=1100 + idempotency.IDEMPOTENCY_TTL_SECONDS + 1) is None
+
+
+def test_replays_return_the_owner_tokens_of_the_first_response(store):
+    @idempotent("test")
+    def handler(event, _context):
+        body = {"id": "n1", "owner_token": "tok", "results": [{"id": "n2", "owner_token": "tok2"}]}
+        return {"statusCode": 201, "headers": {}, "body": json.dumps(body)}
+
+    first = handler(_event("k", {"a": 1}), None)
+    idempotency.RESPONSES.clear()
+    replay = handler(_event("k", {"a": 1}), None)
+    assert replay["headers"]["Idempotent-Replayed"] == "true"
+    assert json.loads(replay["body"]) == json.loads(first["body"])
+
+
+def test_pending_key_answers_409_and_long_keys_400(store):
+    @idempotent("test")
+    def handler(event, _context):
+        return {"statusCode": 201, "headers": {}, "body": "{}"}
+
+    event = _event("k", {"a": 1})
+    store.claim(f"idem#test#{idempotency._digest('k')}", idempotency.body_fingerprint(event), now=10**10)
+    resp = handler(event, None)
+    assert resp["statusCode"] == 409 and resp["headers"]["Retry-After"] == "1"
+    assert handler(_event("x" * 256, {"a": 1}), None)["statusCode"] == 400
+
+
+def test_dynamo_claim_returns_the_existing_record_without_a_read():
+    class FakeTable:
+        def __init__(self):
+            self.calls = []
+
+        def put_item(self, **kwargs):
+            self.calls.append(kwargs)
+            if len(self.calls) > 1:
+                raise ClientError(
+                    {
+                        "Error": {"Code": "ConditionalCheckFailedException"},
+                        "Item": {"id": {"S": "idem#x"}, "state": {"S": COMPLETED}, "status_code": {"N": "201"}},
+                    },
+                    "PutItem",
+                )
+
+    table = FakeTable()
+    store = DynamoIdempotencyStore(table_factory=lambda: table)
+    assert store.claim("idem#x", "fp", now=1000) is None
+    assert table.calls[0]["ReturnValuesOnConditionCheckFailure"] == "ALL_OLD"
+    assert "#ttl < :now" in table.calls[0]["ConditionExpression"]
+    existing = store.claim("idem#x", "fp", now=1001)
+    assert existing["state"] == COMPLETED and existing["status_code"] == 201
@@ -0,0 +1,73 @@
+import json
+import logging
+import sys
+from pathlib import Path
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+from shared import instrumentation  # noqa: E402
+from shared.instrumentation import RECORDER, instrument_client, timed  # noqa: E402
+from shared.invocation import invocation  # noqa: E402
+
+
+class _Raw:
+    def stream(self, **_kwargs):
+        yield b"{}"
+
+
+def _stubbed_client():
+    client = boto3.client(
+        "dynamodb", region_name="eu-west-1", aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    client.meta.events.register("before-send", lambda request, **_: AWSResponse(request.url, 200, {}, _Raw()))
+    return instrument_client(client)
+
+
+def _timing_records(caplog):
+    records = [json.loads(r.getMessage()) for r in caplog.records]
+    return [r for r in records if r["action"] == "invocation_timing"]
+
+
+def test_disabled_timing_is_a_shared_noop(monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+    monkeypatch.setattr(RECORDER, "enabled", False)
+    assert timed("store") is timed("validation")
+
+    client = _stubbed_client()
+    RECORDER.start()
+    client.describe_limits()
+    RECORDER.flush()
+    assert _timing_records(caplog) == []
+
+
+def test_one_record_per_invocation_with_aws_calls_and_sections(monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+    monkeypatch.setattr(RECORDER, "enabled", False)
+    instrumentation.enable()
+    client = _stubbed_client()
+
+    @invocation
+    def handler(_event, _context):
+        with timed("validation"):
+            pass
+        with timed("store"):
+            client.describe_limits()
+            client.describe_limits()
+        return {"statusCode": 200}
+
+    handler({}, None)
+    handler({}, None)
+
+    records = _timing_records(caplog)
+    assert len(records) == 2
+    record = records[-1]
+    count, total_ms, max_ms = record["aws"]["dynamodb.DescribeLimits"]
+    assert count == 2 and max_ms <= total_ms
+    assert set(record["sections"]) == {"validation", "store"}
+    assert record["total_ms"] >= record["sections"]["store"] >= total_ms
@@ -0,0 +1,79 @@
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+from shared import logging as shared_logging  # noqa: E402
+from shared.invocation import invocation  # noqa: E402
+from shared.logging import log_event  # noqa: E402
+
+
+def _actions(caplog):
+    return [json.loads(r.getMessage())["action"] for r in caplog.records]
+
+
+def test_disabled_event_skips_scrub(monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+
+    def explode(_value):
+        raise AssertionError("scrubbed a disabled event")
+
+    monkeypatch.setattr(shared_logging, "_scrub", explode)
+    log_event("step_prepare_event", {"normalized": {"noteId": "n1"}})
+    assert caplog.records == []
+
+
+def test_event_levels_and_overrides(monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+    monkeypatch.setitem(shared_logging._state.event_levels, "get_today_notes_cache", logging.INFO)
+
+    log_event("get_today_notes_cache", {"hit": True})
+    log_event("get_note_dynamo_error", {"id": "n1", "error": "boom"})
+
+    assert [(r.levelno, json.loads(r.getMessage())["action"]) for r in caplog.records] == [
+        (logging.INFO, "get_today_notes_cache"),
+        (logging.ERROR, "get_note_dynamo_error"),
+    ]
+
+
+def test_unsampled_invocation_keeps_errors_only(monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+    monkeypatch.setattr(shared_logging._state, "sampled", False)
+
+    log_event("delete_note_success", {"id": "n1"})
+    log_event("delete_note_update_error", {"id": "n1", "error": "boom"})
+
+    assert _actions(caplog) == ["delete_note_update_error"]
+
+
+def test_parse_levels_ignores_unknown_names():
+    assert shared_logging._parse_levels("a=debug, b=LOUD,=INFO,c=warning") == {
+        "a": logging.DEBUG,
+        "c": logging.WARNING,
+    }
+
+
+def test_rollup_writes_one_summary_per_invocation(monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+    monkeypatch.setattr(shared_logging._state, "rollup", True)
+
+    @invocation
+    def handler(_event, _context):
+        log_event("delete_note_success", {"id": "n1", "email": "a@example.com"})
+        log_event("delete_note_update_error", {"id": "n2"})
+        assert caplog.records == []
+        return {"statusCode": 200}
+
+    handler({}, None)
+
+    assert len(caplog.records) == 1
+    record = caplog.records[0]
+    summary = json.loads(record.getMessage())
+    assert record.levelno == logging.ERROR
+    assert summary["action"] == "invocation_summary" and summary["count"] == 2
+    assert summary["events"][0] == {"action": "delete_note_success", "id": "n1", "email": "[redacted]"}
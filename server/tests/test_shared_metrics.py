@@ -0,0 +1,72 @@
+import json
+import sys
+from pathlib import Path
+
+# Make Lambda-style imports work (handlers/, notes/, shared/ as top-level)
+LAMBDA_DIR = Path(__file__).resolve().parents[1] / "lambdas"
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+import handlers.events.step_record_note_event as step_record  # noqa: E402
+from shared import metrics  # noqa: E402
+from shared.metrics import MetricsBuffer  # noqa: E402
+
+
+class FakeCloudWatch:
+    def __init__(self):
+        self.calls = []
+
+    def put_metric_data(self, **kwargs):
+        self.calls.append(kwargs)
+
+
+def test_emf_aggregates_per_dimension_set():
+    records = []
+    buffer = MetricsBuffer("Test", mode="emf", writer=records.append, clock=lambda: 1.5)
+    buffer.put("NoteCreated", dimensions={"EventType": "note.created"})
+    buffer.put("NoteCreated", dimensions={"EventType": "note.created"})
+    buffer.put("NoteDeleted", dimensions={"EventType": "note.deleted"})
+
+    assert buffer.flush() == 2
+    assert buffer.pending() == 0
+    created = next(r for r in records if r["EventType"] == "note.created")
+    assert created["NoteCreated"] == 2
+    assert created["_aws"] == {
+        "Timestamp": 1500,
+        "CloudWatchMetrics": [
+            {"Namespace": "Test", "Dimensions": [["EventType"]], "Metrics": [{"Name": "NoteCreated", "Unit": "Count"}]}
+        ],
+    }
+
+
+def test_api_mode_sends_one_put_metric_data():
+    client = FakeCloudWatch()
+    buffer = MetricsBuffer("Test", mode="api", client_factory=lambda: client)
+    for _ in range(3):
+        buffer.put("NoteUpdated", dimensions={"EventType": "note.updated"})
+
+    buffer.flush()
+
+    assert client.calls == [{
+        "Namespace": "Test",
+        "MetricData": [{
+            "MetricName": "NoteUpdated",
+            "Value": 3,
+            "Unit": "Count",
+            "Dimensions": [{"Name": "EventType", "Value": "note.updated"}],
+        }],
+    }]
+
+
+def test_record_note_event_emits_emf_without_api_calls(monkeypatch, capsys):
+    client = FakeCloudWatch()
+    monkeypatch.setattr(metrics.METRICS, "mode", "emf")
+    monkeypatch.setattr(metrics.METRICS, "_client", lambda: client)
+
+    result = step_record.handler({"eventType": "note.deleted", "noteId": "n1"}, None)
+
+    assert result["status"] == "recorded"
+    assert client.calls == []
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    emf = [line for line in lines if "_aws" in line]
+    assert len(emf) == 1 and emf[0]["NoteDeleted"] == 1